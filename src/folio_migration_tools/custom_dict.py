@@ -1,7 +1,83 @@
 import csv
+from collections.abc import Mapping
 
 
-class InsensitiveDictReader(csv.DictReader):
+class LegacyRow(Mapping):
+    """A read-only row from a CSV or TSV file, with dict style access to the values
+
+    The rows of a file share one map of header names to column positions, and only keep
+    their list of values, instead of a dict with every header name per row.
+    """
+
+    __slots__ = ("field_index", "values_list")
+
+    def __init__(self, field_index: dict, values_list: list):
+        self.field_index = field_index
+        self.values_list = values_list
+
+    def __getitem__(self, key):
+        return self.values_list[self.field_index[key]]
+
+    def get(self, key, default=None):
+        index = self.field_index.get(key)
+        return default if index is None else self.values_list[index]
+
+    def __contains__(self, key):
+        return key in self.field_index
+
+    def __iter__(self):
+        return iter(self.field_index)
+
+    def __len__(self):
+        return len(self.field_index)
+
+    def keys(self):
+        return self.field_index.keys()
+
+    def items(self):
+        values_list = self.values_list
+        return [(key, values_list[index]) for key, index in self.field_index.items()]
+
+    def values(self):
+        values_list = self.values_list
+        return [values_list[index] for index in self.field_index.values()]
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class LegacyRowReader(csv.DictReader):
+    """A csv.DictReader that reads the rows as LegacyRows
+
+    Rows with more or fewer values than there are header names are read as dicts, like
+    csv.DictReader reads them.
+    """
+
+    field_index = None
+
+    def __next__(self):
+        if self.line_num == 0:
+            # Used only for its side effect.
+            self.fieldnames
+        row = next(self.reader)
+        self.line_num = self.reader.line_num
+        while row == []:
+            row = next(self.reader)
+        if self.field_index is None:
+            self.field_index = {name: index for index, name in enumerate(self.fieldnames)}
+            self.field_count = len(self.fieldnames)
+        if len(row) != self.field_count:
+            d = dict(zip(self.fieldnames, row))
+            if self.field_count < len(row):
+                d[self.restkey] = row[self.field_count :]
+            else:
+                for key in self.fieldnames[len(row) :]:
+                    d[key] = self.restval
+            return d
+        return LegacyRow(self.field_index, row)
+
+
+class InsensitiveDictReader(LegacyRowReader):
     # This class overrides the csv.fieldnames property, which converts all
     # fieldnames without leading and trailing
     # spaces and to lower case.
@@ -97,6 +97,9 @@ class FolderStructure:
         )
 
         self.migration_reports_file = self.reports_folder / f"report{self.file_template}.md"
+        self.migration_report_snapshot_path = (
+            self.reports_folder / f"report{self.file_template}.json"
+        )
 
         self.srs_records_path = (
             self.results_folder / f"folio_srs_{object_type_string}{self.file_template}.json"
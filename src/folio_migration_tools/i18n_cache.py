@@ -0,0 +1,35 @@
+import functools
+
+import i18n
+
+TRANSLATION_CACHE_SIZE = 10000
+
+
+@functools.lru_cache(maxsize=TRANSLATION_CACHE_SIZE)
+def translate(locale: str, key: str, placeholders: tuple) -> str:
+    return i18n.t(key, locale=locale, **{name: value for name, _, value in placeholders})
+
+
+def t(key: str, **kwargs) -> str:
+    """A cached i18n.t, for the migration report keys that are translated for every record
+
+    i18n.t looks the key up through the translation loaders on every call, and searches
+    the translation files again for keys that are not translated. The translations are
+    cached by locale, key and placeholder values, so they must not be used before the
+    i18n configuration is loaded. Placeholder values that can not be hashed are translated
+    by i18n.t every time.
+
+    Args:
+        key (str): The key, or English text, to translate
+        kwargs: The placeholder values, and optionally the locale
+
+    Returns:
+        str: The translation
+    """
+    locale = kwargs.pop("locale", None) or i18n.get("locale")
+    # The type is part of the key, so that 1 and True are translated separately
+    placeholders = tuple((name, type(value), value) for name, value in sorted(kwargs.items()))
+    try:
+        return translate(locale, key, placeholders)
+    except TypeError:
+        return i18n.t(key, locale=locale, **kwargs)
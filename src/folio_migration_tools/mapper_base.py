@@ -7,11 +7,11 @@ import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
-import i18n
 from folio_uuid.folio_namespaces import FOLIONamespaces
 from folio_uuid.folio_uuid import FolioUUID
 from folioclient import FolioClient
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import (
     TransformationFieldMappingError,
     TransformationProcessError,
@@ -23,6 +23,7 @@ from folio_migration_tools.mapping_file_transformation.ref_data_mapping import (
     RefDataMapping,
 )
 from folio_migration_tools.migration_report import MigrationReport
+from folio_migration_tools.ref_data_index import RefDataIndex
 
 
 class MapperBase:
@@ -44,6 +45,8 @@ class MapperBase:
 
         self.mapped_folio_fields: dict = {}
         self.migration_report: MigrationReport = MigrationReport()
+        # Shared with the conditions and the MARC file processor of the task
+        self.ref_data_index = RefDataIndex()
         self.num_criticalerrors = 0
         self.num_exeptions = 0
         self.mapped_legacy_fields: dict = {}
@@ -101,6 +104,32 @@ class MapperBase:
         index_or_id,
         prevent_default=False,
     ):
+        # Each distinct combination of legacy values is mapped once, and then looked up
+        fieldvalues = tuple(legacy_object.get(k) for k in ref_data_mapping.mapped_legacy_keys)
+        resolution_key = ("name", prevent_default, fieldvalues)
+        resolution = ref_data_mapping.resolved.get(resolution_key)
+        if resolution is None:
+            resolution = self.resolve_mapped_name(
+                ref_data_mapping, legacy_object, index_or_id, prevent_default
+            )
+            ref_data_mapping.resolved[resolution_key] = resolution
+        self.migration_report.add(ref_data_mapping.blurb_id, resolution[0])
+        return resolution[1]
+
+    def resolve_mapped_name(
+        self,
+        ref_data_mapping: RefDataMapping,
+        legacy_object,
+        index_or_id,
+        prevent_default=False,
+    ) -> tuple:
+        """Maps legacy values to a name, like get_mapped_name
+
+        Errors are raised, and not resolved, so that they fail every record they occur in.
+
+        Returns:
+            tuple: The migration report measure for the mapping, and the name
+        """
         try:
             # Get the values in the fields that will be used for mapping
             fieldvalues = [legacy_object.get(k) for k in ref_data_mapping.mapped_legacy_keys]
@@ -111,30 +140,27 @@ class MapperBase:
 
             if not right_mapping:
                 raise StopIteration()
-            self.migration_report.add(
-                ref_data_mapping.blurb_id,
+            return (
                 (
                     f'{" - ".join(fieldvalues)} '
                     f'-> {right_mapping[f"folio_{ref_data_mapping.key_type}"]}'
                 ),
+                next(v for k, v in right_mapping.items() if k.startswith("folio_")),
             )
-            return next(v for k, v in right_mapping.items() if k.startswith("folio_"))
 
         except StopIteration:
             if prevent_default:
-                self.migration_report.add(
-                    ref_data_mapping.blurb_id,
+                return (
                     (f"Not to be mapped. " f'(No default) -- {" - ".join(fieldvalues)} -> ""'),
+                    "",
                 )
-                return ""
-            self.migration_report.add(
-                ref_data_mapping.blurb_id,
+            return (
                 (
                     f"Unmapped (Default value was set) -- "
                     f'{" - ".join(fieldvalues)} -> {ref_data_mapping.default_name}'
                 ),
+                ref_data_mapping.default_name,
             )
-            return ref_data_mapping.default_name
         except IndexError as exception:
             raise TransformationRecordFailedError(
                 index_or_id,
@@ -170,6 +196,54 @@ class MapperBase:
         folio_property_name="",
         prevent_default=False,
     ):
+        # Each distinct combination of legacy values is mapped once, and then looked up
+        fieldvalues = tuple(legacy_object.get(k) for k in ref_data_mapping.mapped_legacy_keys)
+        resolution_key = ("id", prevent_default, fieldvalues)
+        resolution = ref_data_mapping.resolved.get(resolution_key)
+        if resolution is None:
+            resolution = self.resolve_mapped_ref_data_value(
+                ref_data_mapping, legacy_object, index_or_id, prevent_default
+            )
+            ref_data_mapping.resolved[resolution_key] = resolution
+        self.migration_report.add(ref_data_mapping.blurb_id, resolution[0])
+        return resolution[1]
+
+    def pre_resolve_mapped_values(self, ref_data_mapping: RefDataMapping, fieldvalues: tuple):
+        """Resolves a combination of legacy values before the records are mapped, like
+        get_mapped_ref_data_value and get_mapped_name do for the first record that has it
+
+        Combinations that fail to resolve are left for the records to fail on.
+
+        Args:
+            ref_data_mapping (RefDataMapping): The mapping
+            fieldvalues (tuple): The values of the mapped legacy fields, as in the records
+        """
+        legacy_object = dict(zip(ref_data_mapping.mapped_legacy_keys, fieldvalues))
+        for kind, resolve in [
+            ("id", self.resolve_mapped_ref_data_value),
+            ("name", self.resolve_mapped_name),
+        ]:
+            try:
+                ref_data_mapping.resolved[(kind, False, fieldvalues)] = resolve(
+                    ref_data_mapping, legacy_object, "Pre-resolution"
+                )
+            except (TransformationRecordFailedError, TransformationProcessError):
+                pass
+
+    def resolve_mapped_ref_data_value(
+        self,
+        ref_data_mapping: RefDataMapping,
+        legacy_object,
+        index_or_id,
+        prevent_default=False,
+    ) -> tuple:
+        """Maps legacy values to a FOLIO UUID, like get_mapped_ref_data_value
+
+        Errors are raised, and not resolved, so that they fail every record they occur in.
+
+        Returns:
+            tuple: The migration report measure for the mapping, and the UUID
+        """
         # Gets mapped value from mapping file, translated to the right FOLIO UUID
         try:
             # Get the values in the fields that will be used for mapping
@@ -184,29 +258,26 @@ class MapperBase:
 
             if not right_mapping:
                 raise StopIteration()
-            self.migration_report.add(
-                ref_data_mapping.blurb_id,
+            return (
                 (
                     f'{" - ".join(fieldvalues)} '
                     f'-> {right_mapping[f"folio_{ref_data_mapping.key_type}"]}'
                 ),
+                right_mapping["folio_id"],
             )
-            return right_mapping["folio_id"]
         except StopIteration:
             if prevent_default:
-                self.migration_report.add(
-                    ref_data_mapping.blurb_id,
+                return (
                     (f"Not to be mapped. " f'(No default) -- {" - ".join(fieldvalues)} -> ""'),
+                    "",
                 )
-                return ""
-            self.migration_report.add(
-                ref_data_mapping.blurb_id,
+            return (
                 (
                     f"Unmapped (Default value was set) -- "
                     f'{" - ".join(fieldvalues)} -> {ref_data_mapping.default_name}'
                 ),
+                ref_data_mapping.default_id,
             )
-            return ref_data_mapping.default_id
         except IndexError as exception:
             raise TransformationRecordFailedError(
                 index_or_id,
@@ -229,10 +300,10 @@ class MapperBase:
         self.migration_report.add("FieldMappingErrors", error)
         error.id = error.id or index_or_id
         error.log_it()
-        self.migration_report.add_general_statistics(i18n.t("Field Mapping Errors found"))
+        self.migration_report.add_general_statistics(i18n_cache.t("Field Mapping Errors found"))
 
     def handle_transformation_process_error(self, idx, error: TransformationProcessError):
-        self.migration_report.add_general_statistics(i18n.t("Transformation process error"))
+        self.migration_report.add_general_statistics(i18n_cache.t("Transformation process error"))
         logging.critical("%s\t%s", idx, error)
         print(f"\n{error.message}: {error.data_value}")
         sys.exit(1)
@@ -241,7 +312,7 @@ class MapperBase:
         self, records_processed: int, error: TransformationRecordFailedError
     ):
         self.migration_report.add(
-            "GeneralStatistics", i18n.t("FAILED Records failed due to an error")
+            "GeneralStatistics", i18n_cache.t("FAILED Records failed due to an error")
         )
         error.index_or_id = error.index_or_id or records_processed
         error.log_it()
@@ -319,7 +390,7 @@ class MapperBase:
             for id_string in legacy_map.values():
                 legacy_map_file.write(f"{json.dumps(id_string)}\n")
                 self.migration_report.add(
-                    "GeneralStatistics", i18n.t("Unique ID:s written to legacy map")
+                    "GeneralStatistics", i18n_cache.t("Unique ID:s written to legacy map")
                 )
         logging.info("Wrote legacy id map to %s", path)
 
@@ -374,7 +445,7 @@ class MapperBase:
     def add_legacy_id_to_admin_note(self, folio_record: dict, legacy_id: str):
         if not legacy_id:
             raise TransformationFieldMappingError(
-                legacy_id, i18n.t("Legacy id is empty"), legacy_id
+                legacy_id, i18n_cache.t("Legacy id is empty"), legacy_id
             )
         if "administrativeNotes" not in folio_record:
             folio_record["administrativeNotes"] = []
@@ -445,7 +516,9 @@ class MapperBase:
                 )
                 if bound_with_holding.get("hrid", ""):
                     bound_with_holding["hrid"] = f'{bound_with_holding["hrid"]}_bw_{bwidx}'
-            self.migration_report.add_general_statistics(i18n.t("Bound-with holdings created"))
+            self.migration_report.add_general_statistics(
+                i18n_cache.t("Bound-with holdings created")
+            )
             yield bound_with_holding
 
     def generate_boundwith_holding_uuid(self, holding_uuid, instance_uuid):
@@ -0,0 +1,68 @@
+import os
+from pathlib import Path
+from typing import Iterator
+from typing import Optional
+
+from folio_migration_tools.custom_dict import LegacyRowReader
+
+
+class DelimitedFileReader:
+    """Reads the rows of a CSV or TSV file as LegacyRows, counting the rows while they are
+    read
+
+    The file is read once. The row counts include rows that only have delimiters, which
+    are counted as empty rows, and are complete once all rows have been read.
+
+    Args:
+        source_file: The open source file
+        file_name (Path): The name of the file. Files ending with tsv are tab delimited.
+    """
+
+    def __init__(self, source_file, file_name: Path):
+        self.delimiter = "\t" if str(file_name).endswith("tsv") else ","
+        self.total_rows = -1  # Do not count header row
+        self.empty_rows = 0
+        self.bytes_read = 0
+        try:
+            self.file_size: Optional[int] = os.fstat(source_file.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            # Like in-memory files
+            self.file_size = None
+        # The rows are measured in bytes, like the file size. Encoded one by one in
+        # utf-8-sig, each row would get a byte order mark.
+        encoding = getattr(source_file, "encoding", None) or "utf-8"
+        self.encoding = "utf-8" if encoding.lower().replace("_", "-") == "utf-8-sig" else encoding
+        if self.delimiter == "\t":
+            self.dict_reader = LegacyRowReader(self.count_lines(source_file), dialect="tsv")
+        else:
+            self.dict_reader = LegacyRowReader(self.count_lines(source_file))
+
+    def count_lines(self, source_file) -> Iterator[str]:
+        for line in source_file:
+            if line.isascii():
+                self.bytes_read += len(line)
+            else:
+                self.bytes_read += len(line.encode(self.encoding, errors="replace"))
+            if not line.strip().strip(self.delimiter):  # check for empty rows
+                self.empty_rows += 1
+            self.total_rows += 1
+            yield line
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.dict_reader)
+
+    @property
+    def line_num(self) -> int:
+        return self.dict_reader.line_num
+
+    @property
+    def estimated_rows(self) -> Optional[int]:
+        """Estimates the number of rows in the file from the length of the rows read so far
+
+        Returns:
+            Optional[int]: The estimate, or None if the file size is not known or no rows
+                have been read
+        """
+        if not self.file_size or self.total_rows < 1:
+            return None
+        return round(self.total_rows * self.file_size / self.bytes_read)
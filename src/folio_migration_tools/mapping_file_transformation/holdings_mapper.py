@@ -1,9 +1,9 @@
 import ast
 
-import i18n
 from folio_uuid.folio_uuid import FOLIONamespaces
 from folioclient import FolioClient
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.library_configuration import (
     FileDefinition,
@@ -65,7 +65,7 @@ class HoldingsMapper(MappingFileMapperBase):
         folio_record["discoverySuppress"] = file_def.discovery_suppressed
         self.migration_report.add(
             "Suppression",
-            i18n.t("Suppressed from discovery") + f' = {folio_record["discoverySuppress"]}',
+            i18n_cache.t("Suppressed from discovery") + f' = {folio_record["discoverySuppress"]}',
         )
 
     def get_prop(self, legacy_item, folio_prop_name, index_or_id, schema_default_value):
@@ -92,7 +92,7 @@ class HoldingsMapper(MappingFileMapperBase):
     def get_call_number(self, legacy_value):
         if legacy_value.startswith("[") and len(legacy_value.split(",")) > 1:
             self.migration_report.add_general_statistics(
-                i18n.t("Bound-with items callnumber identified")
+                i18n_cache.t("Bound-with items callnumber identified")
             )
             self.migration_report.add(
                 "BoundWithMappings",
@@ -121,7 +121,9 @@ class HoldingsMapper(MappingFileMapperBase):
             return self.get_mapped_ref_data_value(
                 self.call_number_mapping, legacy_item, id_or_index, folio_prop_name
             )
-        self.migration_report.add("CallNumberTypeMapping", i18n.t("No Call Number Type Mapping"))
+        self.migration_report.add(
+            "CallNumberTypeMapping", i18n_cache.t("No Call Number Type Mapping")
+        )
         return ""
 
     def get_instance_ids(self, legacy_value: str, index_or_id: str):
@@ -130,7 +132,7 @@ class HoldingsMapper(MappingFileMapperBase):
         legacy_bib_ids = self.get_legacy_bib_ids(legacy_value, index_or_id)
         self.migration_report.add(
             "BoundWithMappings",
-            i18n.t("Number of bib records referenced in item") + f": {len(legacy_bib_ids)}",
+            i18n_cache.t("Number of bib records referenced in item") + f": {len(legacy_bib_ids)}",
         )
         for legacy_instance_id in legacy_bib_ids:
             new_legacy_value = (
@@ -143,13 +145,13 @@ class HoldingsMapper(MappingFileMapperBase):
                 and legacy_instance_id not in self.instance_id_map
             ):
                 self.migration_report.add_general_statistics(
-                    i18n.t("Records not matched to Instances")
+                    i18n_cache.t("Records not matched to Instances")
                 )
                 s = "Bib id not in instance id map."
                 raise TransformationRecordFailedError(index_or_id, s, new_legacy_value)
             else:
                 self.migration_report.add_general_statistics(
-                    i18n.t("Records matched to Instances")
+                    i18n_cache.t("Records matched to Instances")
                 )
                 entry = self.instance_id_map.get(new_legacy_value, "") or self.instance_id_map.get(
                     legacy_instance_id
@@ -170,11 +172,11 @@ class HoldingsMapper(MappingFileMapperBase):
             new_value_len = len(new_legacy_values)
             if new_value_len > 1:
                 self.migration_report.add_general_statistics(
-                    i18n.t("Bound-with items identified by bib id")
+                    i18n_cache.t("Bound-with items identified by bib id")
                 )
                 self.migration_report.add(
                     "GeneralStatistics",
-                    i18n.t("Bib ids referenced in bound-with items"),
+                    i18n_cache.t("Bib ids referenced in bound-with items"),
                     new_value_len,
                 )
             return new_legacy_values
@@ -5,10 +5,10 @@ from datetime import datetime, timezone
 from typing import Set
 from uuid import uuid4
 
-import i18n
 from folio_uuid.folio_uuid import FOLIONamespaces
 from folioclient import FolioClient
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import (
     TransformationProcessError,
     TransformationRecordFailedError,
@@ -125,7 +125,7 @@ class ItemMapper(MappingFileMapperBase):
         folio_record["discoverySuppress"] = file_def.discovery_suppressed
         self.migration_report.add(
             "Suppression",
-            i18n.t("Suppressed from discovery") + f' = {folio_record["discoverySuppress"]}',
+            i18n_cache.t("Suppressed from discovery") + f' = {folio_record["discoverySuppress"]}',
         )
 
     def setup_status_mapping(self, item_statuses_map):
@@ -229,7 +229,7 @@ class ItemMapper(MappingFileMapperBase):
             normalized_barcode = barcode.strip().lower()
             if normalized_barcode and normalized_barcode in self.unique_barcodes:
                 Helper.log_data_issue(index_or_id, "Duplicate barcode", mapped_value)
-                self.migration_report.add_general_statistics(i18n.t("Duplicate barcodes"))
+                self.migration_report.add_general_statistics(i18n_cache.t("Duplicate barcodes"))
                 return f"{barcode}-{uuid4()}"
             else:
                 if normalized_barcode:
@@ -241,7 +241,7 @@ class ItemMapper(MappingFileMapperBase):
             elif f"{self.bib_id_template}{mapped_value}" in self.holdings_id_map:
                 return self.holdings_id_map[f"{self.bib_id_template}{mapped_value}"][1]
             self.migration_report.add_general_statistics(
-                i18n.t("Records failed because of failed holdings"),
+                i18n_cache.t("Records failed because of failed holdings"),
             )
             s = (
                 "Holdings id referenced in legacy item "
@@ -261,7 +261,7 @@ class ItemMapper(MappingFileMapperBase):
             )
         self.migration_report.add(
             "CallNumberTypeMapping",
-            i18n.t("Mapping not setup"),
+            i18n_cache.t("Mapping not setup"),
         )
         return ""
 
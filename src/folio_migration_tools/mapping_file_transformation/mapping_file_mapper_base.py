@@ -6,27 +6,32 @@ import re
 import uuid
 from functools import reduce
 from pathlib import Path
-from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Set
 from uuid import UUID
 
-import i18n
 from folio_uuid.folio_uuid import FOLIONamespaces
 from folio_uuid.folio_uuid import FolioUUID
 from folioclient import FolioClient
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationFieldMappingError
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.library_configuration import LibraryConfiguration
 from folio_migration_tools.mapper_base import MapperBase
+from folio_migration_tools.mapping_file_transformation.delimited_file_reader import (
+    DelimitedFileReader,
+)
+from folio_migration_tools.mapping_file_transformation.mapping_plan import MappingPlan
+from folio_migration_tools.mapping_file_transformation.mapping_plan import empty_vals
 from folio_migration_tools.mapping_file_transformation.ref_data_mapping import (
     RefDataMapping,
 )
 from folio_migration_tools.migration_report import MigrationReport
 
-empty_vals = ["Not mapped", None, ""]
+ESTIMATE_ROWS_AFTER = 10000
 
 
 class MappingFileMapperBase(MapperBase):
@@ -48,9 +53,9 @@ class MappingFileMapperBase(MapperBase):
 
         self.total_records = 0
         self.record_map = record_map
-        self.ref_data_dicts: Dict = {}
         self.empty_vals = empty_vals
-        self.folio_keys = self.get_mapped_folio_properties_from_map(self.record_map)
+        self.mapping_plan = MappingPlan(self.record_map["data"])
+        self.folio_keys = list(self.mapping_plan.folio_keys)
         self.field_map = self.setup_field_map(ignore_legacy_identifier)
         self.validate_map()
         try:
@@ -82,9 +87,7 @@ class MappingFileMapperBase(MapperBase):
             ):
                 clean_folio_field = re.sub(r"\[\d+\]", "", k["folio_field"])
                 self.legacy_record_mappings[k["folio_field"]] = list(
-                    self.get_map_entries_by_folio_prop_name(
-                        clean_folio_field, self.record_map["data"]
-                    )
+                    self.mapping_plan.get_map_entries(clean_folio_field)
                 )
                 legacy_fields.add(k["legacy_field"])
                 if not self.mapped_from_legacy_data.get(k["folio_field"]):
@@ -162,16 +165,7 @@ class MappingFileMapperBase(MapperBase):
 
     @staticmethod
     def get_mapped_folio_properties_from_map(the_map):
-        return [
-            k["folio_field"]
-            for k in the_map["data"]
-            if (
-                k["legacy_field"] not in empty_vals
-                # and k["folio_field"] != "legacyIdentifier"
-                or k.get("value", "") not in empty_vals
-                or isinstance(k.get("value", ""), bool)
-            )
-        ]
+        return list(MappingPlan(the_map["data"]).folio_keys)
 
     @staticmethod
     def get_mapped_legacy_properties_from_map(the_map):
@@ -230,6 +224,66 @@ class MappingFileMapperBase(MapperBase):
             legacy_id,
         )
 
+    def get_ref_data_mappings(self) -> List[RefDataMapping]:
+        return [m for m in vars(self).values() if isinstance(m, RefDataMapping)]
+
+    def log_ref_data_mapping_statistics(self):
+        for ref_data_mapping in self.get_ref_data_mappings():
+            ref_data_mapping.log_cache_statistics()
+
+    def pre_resolve_ref_data_file(self, file_path: Path):
+        """Reads a CSV or TSV source file and pre-resolves its reference data values, like
+        pre_resolve_ref_data_mappings
+
+        Args:
+            file_path (Path): The source file
+        """
+        with open(file_path, encoding="utf-8-sig") as source_file:
+            self.pre_resolve_ref_data_mappings(DelimitedFileReader(source_file, file_path))
+
+    def pre_resolve_ref_data_mappings(self, legacy_objects: Iterable):
+        """Resolves the distinct legacy values of the reference data mappings in a source
+        file, and logs the ones that are not in the maps, before the records are mapped
+
+        Most files only have a few distinct values for the mapped fields. Once they are
+        resolved, the records only look up the mapped values, and the unmapped ones can be
+        fixed in the maps without waiting for the migration report.
+
+        Args:
+            legacy_objects (Iterable): The legacy records, like from get_objects
+        """
+        ref_data_mappings = [m for m in self.get_ref_data_mappings() if m.mapped_legacy_keys]
+        distinct_values: List[Set[tuple]] = [set() for _ in ref_data_mappings]
+        for legacy_object in legacy_objects:
+            for ref_data_mapping, values in zip(ref_data_mappings, distinct_values):
+                fieldvalues = tuple(
+                    legacy_object.get(k) for k in ref_data_mapping.mapped_legacy_keys
+                )
+                # Missing fields are reported, or failed, when the record is mapped
+                if all(isinstance(v, str) for v in fieldvalues):
+                    values.add(fieldvalues)
+        for ref_data_mapping, values in zip(ref_data_mappings, distinct_values):
+            for fieldvalues in values:
+                self.pre_resolve_mapped_values(ref_data_mapping, fieldvalues)
+            stripped_values = {tuple(v.strip() for v in fieldvalues) for fieldvalues in values}
+            unmapped = sorted(
+                " - ".join(v) for v in stripped_values if not ref_data_mapping.find_mapping(v)
+            )
+            logging.info(
+                "%s mapping: %s distinct legacy values, %s of them not in the map",
+                ref_data_mapping.name,
+                len(stripped_values),
+                len(unmapped),
+            )
+            if unmapped:
+                logging.warning(
+                    "%s mapping: these legacy values are not in the map, and will be mapped "
+                    "to the default (%s) unless the default is prevented: %s",
+                    ref_data_mapping.name,
+                    ref_data_mapping.default_name,
+                    unmapped,
+                )
+
     def get_statistical_code(self, legacy_item: dict, folio_prop_name: str, index_or_id):
         if self.statistical_codes_mapping:
             return self.get_mapped_ref_data_value(
@@ -241,22 +295,18 @@ class MappingFileMapperBase(MapperBase):
             )
         self.migration_report.add(
             "StatisticalCodeMapping",
-            i18n.t("Mapping not setup"),
+            i18n_cache.t("Mapping not setup"),
         )
         return ""
 
     def get_prop(self, legacy_object, folio_prop_name, index_or_id, schema_default_value):
         legacy_item_keys = self.mapped_from_legacy_data.get(folio_prop_name, [])
-        map_entries = list(
-            MappingFileMapperBase.get_map_entries_by_folio_prop_name(
-                folio_prop_name, self.record_map["data"]
-            )
-        )
+        map_entries = self.mapping_plan.get_map_entries(folio_prop_name)
         if not any(map_entries):
             return ""
         elif len(map_entries) > 1:
             self.migration_report.add(
-                "Details", i18n.t("%{props} were concatenated", props=legacy_item_keys)
+                "Details", i18n_cache.t("%{props} were concatenated", props=legacy_item_keys)
             )
             return " ".join(
                 MappingFileMapperBase.get_legacy_value(
@@ -281,7 +331,7 @@ class MappingFileMapperBase(MapperBase):
             else:
                 self.migration_report.add(
                     "FolioDefaultValuesAdded",
-                    i18n.t(
+                    i18n_cache.t(
                         "%{schema_value} added to %{prop_name}",
                         schema_value=schema_default_value,
                         prop_name=folio_prop_name,
@@ -376,7 +426,7 @@ class MappingFileMapperBase(MapperBase):
             value_mapped_value = mapping_file_entry.get("value")
             migration_report.add(
                 "DefaultValuesAdded",
-                i18n.t(
+                i18n_cache.t(
                     "%{value} added to %{entry}",
                     value=value_mapped_value,
                     entry=mapping_file_entry.get("folio_field", ""),
@@ -519,7 +569,8 @@ class MappingFileMapperBase(MapperBase):
         i = 0
         while True:
             keys_to_map = {
-                k.rsplit(".", 1)[0] for k in self.folio_keys if k.startswith(f"{prop_name}[{i}")
+                k.rsplit(".", 1)[0]
+                for k in self.mapping_plan.get_folio_keys_starting_with(f"{prop_name}[{i}")
             }
             if not any(keys_to_map):
                 break
@@ -532,7 +583,7 @@ class MappingFileMapperBase(MapperBase):
                     if not p.get("folio:isVirtual", False)
                 ):
                     prop_path = f"{prop_name}[{i}].{sub_prop_name}"
-                    if prop_path in self.folio_keys:
+                    if prop_path in self.mapping_plan.folio_key_set:
                         # We have reached the end of the prop path?
                         res = self.get_prop(
                             legacy_object,
@@ -574,7 +625,9 @@ class MappingFileMapperBase(MapperBase):
                         in ["string", "number", "integer"]
                     ):
                         # We have not reached the end of the prop path
-                        for array_path in [p for p in self.folio_keys if p.startswith(prop_path)]:
+                        for array_path in self.mapping_plan.get_folio_keys_starting_with(
+                            prop_path
+                        ):
                             res = self.get_prop(
                                 legacy_object,
                                 array_path,
@@ -630,9 +683,8 @@ class MappingFileMapperBase(MapperBase):
         return res
 
     def map_string_array_props(self, legacy_object, prop, folio_object, index_or_id):
-        keys_to_map = [k for k in self.folio_keys if k.startswith(prop)]
-        for prop_name in keys_to_map:
-            if prop_name in self.folio_keys and self.has_property(legacy_object, prop_name):
+        for prop_name in self.mapping_plan.get_folio_keys_starting_with(prop):
+            if self.has_property(legacy_object, prop_name):
                 if mapped_prop := self.get_prop(legacy_object, prop_name, index_or_id, ""):
                     self.add_values_to_string_array(
                         prop,
@@ -679,56 +731,32 @@ class MappingFileMapperBase(MapperBase):
                 folio_object[property_name] = mapped_prop
             self.report_legacy_mapping(self.legacy_basic_property(property_name), True, True)
 
-    @staticmethod
-    def _get_delimited_file_reader(source_file, file_name: Path):
-        """
-            First, let's count:
-            * The total number of rows in the source file
-            * The total number of empty rows in the source file
-
-            Then, we'll return those counts and a csv.DictReader
-
-        Args:
-            source_file (_type_): _description_
-            file_name (Path): _description_
-
-        Returns:
-            (int, int, DictReader): total rows, empty rows, dict reader
-        """
-        empty_rows = 0
-        total_rows = -1  # Do not count header row
-        if str(file_name).endswith("tsv"):
-            delimiter = "\t"
-        else:
-            delimiter = ","
-        for line in source_file:
-            if not "".join(line.strip().split(delimiter)):  # check for empty rows
-                empty_rows += 1
-            total_rows += 1
-        source_file.seek(0)  # Set file position back to start
-        if str(file_name).endswith("tsv"):
-            dict_reader = csv.DictReader(source_file, dialect="tsv")
-        else:
-            dict_reader = csv.DictReader(source_file)
-        return total_rows, empty_rows, dict_reader
-
     def get_objects(self, source_file, file_name: Path):
-        total_rows, empty_rows, reader = self._get_delimited_file_reader(source_file, file_name)
-        logging.info("Source data file contains %d rows", total_rows)
-        logging.info("Source data file contains %d empty rows", empty_rows)
-        self.migration_report.set(
-            "GeneralStatistics", "Number of rows in {}".format(file_name.name), total_rows
-        )
-        self.migration_report.set(
-            "GeneralStatistics",
-            "Number of empty rows in {}".format(file_name.name),
-            empty_rows,
-        )
+        reader = DelimitedFileReader(source_file, file_name)
         try:
-            yield from reader
+            for idx, row in enumerate(reader):
+                if idx == ESTIMATE_ROWS_AFTER and reader.estimated_rows:
+                    logging.info(
+                        "Source data file contains an estimated %d rows", reader.estimated_rows
+                    )
+                yield row
         except Exception as exception:
             logging.error("%s at row %s", exception, reader.line_num)
             raise exception from exception
+        finally:
+            # If the rows are not all read, the counts are for the rows that were
+            logging.info("Source data file contains %d rows", reader.total_rows)
+            logging.info("Source data file contains %d empty rows", reader.empty_rows)
+            self.migration_report.set(
+                "GeneralStatistics",
+                "Number of rows in {}".format(file_name.name),
+                reader.total_rows,
+            )
+            self.migration_report.set(
+                "GeneralStatistics",
+                "Number of empty rows in {}".format(file_name.name),
+                reader.empty_rows,
+            )
 
     def has_property(self, legacy_object, folio_prop_name: str):
         legacy_keys = self.field_map.get(folio_prop_name, [])
@@ -739,7 +767,7 @@ class MappingFileMapperBase(MapperBase):
         )
 
     def has_basic_property(self, legacy_object, folio_prop_name):
-        if folio_prop_name not in self.folio_keys:
+        if folio_prop_name not in self.mapping_plan.folio_key_set:
             return False
         if folio_prop_name in self.mapped_from_values:
             return True
@@ -751,27 +779,10 @@ class MappingFileMapperBase(MapperBase):
 
     @staticmethod
     def get_map_entries_by_folio_prop_name(folio_prop_name, data):
-        return (
-            k
-            for k in data
-            if k["folio_field"] == folio_prop_name
-            and any(
-                [
-                    is_set_or_bool_or_numeric(k.get("value", "")),
-                    is_set_or_bool_or_numeric(k.get("legacy_field", "")),
-                    is_set_or_bool_or_numeric(k.get("fallback_legacy_field", "")),
-                    is_set_or_bool_or_numeric(k.get("fallback_value", "")),
-                ]
-            )
-        )
+        return MappingPlan(data).get_map_entries(folio_prop_name)
 
     def legacy_basic_property(self, folio_prop):
-        if folio_prop not in self.folio_keys:
-            return ""
-        return next(
-            (k["legacy_field"] for k in self.record_map["data"] if k["folio_field"] == folio_prop),
-            "",
-        )
+        return self.mapping_plan.get_legacy_field(folio_prop)
 
     def verify_legacy_record(self, legacy_object, idx):
         if idx == 0:
@@ -796,12 +807,7 @@ class MappingFileMapperBase(MapperBase):
         return self.get_ref_data_tuple(ref_data, ref_name, name, "name")
 
     def get_ref_data_tuple(self, ref_data, ref_name, key_value, key_type):
-        dict_key = f"{ref_name}{key_type}"
-        if ref_object := self.ref_data_dicts.get(dict_key, {}).get(key_value.lower().strip(), ()):
-            return ref_object
-        d = {r[key_type].lower(): (r["id"], r["name"]) for r in ref_data}
-        self.ref_data_dicts[dict_key] = d
-        return self.ref_data_dicts.get(dict_key, {}).get(key_value.lower().strip(), ())
+        return self.ref_data_index.get_ref_data_tuple(ref_data, key_type, key_value.strip())
 
     def validate_enums(
         self,
@@ -970,7 +976,3 @@ def in_deep(dictionary, keys):
         keys.split("."),
         dictionary,
     )
-
-
-def is_set_or_bool_or_numeric(any_value):
-    return any(isinstance(any_value, t) for t in [int, bool, float, complex]) or any_value.strip()
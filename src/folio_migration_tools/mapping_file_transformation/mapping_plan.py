@@ -0,0 +1,91 @@
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+empty_vals = ["Not mapped", None, ""]
+
+
+class MappingPlan:
+    """The mapping file entries, indexed for the lookups made for every legacy record
+
+    The mappers look up the entries for a FOLIO property, the legacy field it is mapped
+    from, and the mapped FOLIO properties under an array or object path, for every
+    property in the schema and every record. The plan answers these from dictionaries
+    built from the mapping file instead of scanning it each time.
+
+    Each mapper compiles the plan for its mapping file when it is created.
+    """
+
+    def __init__(self, data: List[dict]):
+        self.folio_keys: List[str] = [
+            k["folio_field"]
+            for k in data
+            if (
+                k["legacy_field"] not in empty_vals
+                or k.get("value", "") not in empty_vals
+                or isinstance(k.get("value", ""), bool)
+            )
+        ]
+        self.folio_key_set = set(self.folio_keys)
+        self.entries_by_folio_field: Dict[str, List[dict]] = {}
+        for entry in data:
+            self.entries_by_folio_field.setdefault(entry["folio_field"], []).append(entry)
+        self.map_entries: Dict[str, Tuple[dict, ...]] = {}
+        self.folio_keys_by_prefix: Dict[str, Tuple[str, ...]] = {}
+
+    def get_map_entries(self, folio_prop_name: str) -> Tuple[dict, ...]:
+        """Gets the entries that map a FOLIO property from a value or a legacy field
+
+        Args:
+            folio_prop_name (str): The FOLIO property, like "notes[0].note"
+
+        Returns:
+            Tuple[dict, ...]: The mapping file entries, in mapping file order
+        """
+        if (map_entries := self.map_entries.get(folio_prop_name)) is None:
+            # Checked on first use, so that broken entries fail the record like before
+            map_entries = self.map_entries[folio_prop_name] = tuple(
+                k
+                for k in self.entries_by_folio_field.get(folio_prop_name, [])
+                if any(
+                    [
+                        is_set_or_bool_or_numeric(k.get("value", "")),
+                        is_set_or_bool_or_numeric(k.get("legacy_field", "")),
+                        is_set_or_bool_or_numeric(k.get("fallback_legacy_field", "")),
+                        is_set_or_bool_or_numeric(k.get("fallback_value", "")),
+                    ]
+                )
+            )
+        return map_entries
+
+    def get_legacy_field(self, folio_prop_name: str) -> str:
+        """Gets the legacy field of the first entry for a mapped FOLIO property
+
+        Args:
+            folio_prop_name (str): The FOLIO property
+
+        Returns:
+            str: The legacy field, or an empty string if the property is not mapped
+        """
+        if folio_prop_name not in self.folio_key_set:
+            return ""
+        return self.entries_by_folio_field[folio_prop_name][0]["legacy_field"]
+
+    def get_folio_keys_starting_with(self, prefix: str) -> Tuple[str, ...]:
+        """Gets the mapped FOLIO properties that start with a path, like "notes[0"
+
+        Args:
+            prefix (str): The start of the property path
+
+        Returns:
+            Tuple[str, ...]: The mapped FOLIO properties, in mapping file order
+        """
+        if (folio_keys := self.folio_keys_by_prefix.get(prefix)) is None:
+            folio_keys = self.folio_keys_by_prefix[prefix] = tuple(
+                k for k in self.folio_keys if k.startswith(prefix)
+            )
+        return folio_keys
+
+
+def is_set_or_bool_or_numeric(any_value):
+    return any(isinstance(any_value, t) for t in [int, bool, float, complex]) or any_value.strip()
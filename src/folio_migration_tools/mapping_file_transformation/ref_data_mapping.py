@@ -1,11 +1,19 @@
 import json
 import logging
 import sys
+from collections import OrderedDict
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
 
 from folioclient import FolioClient
 
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 
+REF_DATA_MAPPING_CACHE_SIZE = 50000
+NOT_CACHED = object()
+
 
 class RefDataMapping(object):
     def __init__(
@@ -18,7 +26,9 @@ class RefDataMapping(object):
         blurb_id,
     ):
         self.name = array_name
-        self.cache: dict = {}
+        self.cache = BoundedCache(REF_DATA_MAPPING_CACHE_SIZE)
+        # What the mappers resolved each distinct combination of legacy values to
+        self.resolved = BoundedCache(REF_DATA_MAPPING_CACHE_SIZE)
         self.blurb_id = blurb_id
         logging.info("%s reference data mapping. Initializing", self.name)
         logging.info("Fetching %s reference data from FOLIO", self.name)
@@ -28,6 +38,8 @@ class RefDataMapping(object):
         self.key_type = key_type
         self.hybrid_mappings = []
         self.mapped_legacy_keys = []
+        self.regular_index = MappingIndex([], [])
+        self.hybrid_index = MappingIndex([], [])
         self.default_id = ""
         self.default_name = ""
         self.cached_dict = {}
@@ -86,6 +98,8 @@ class RefDataMapping(object):
                 ) from ee
 
         self.post_validate_map()
+        self.regular_index = MappingIndex(self.regular_mappings, self.mapped_legacy_keys)
+        self.hybrid_index = MappingIndex(self.hybrid_mappings, self.mapped_legacy_keys)
         logging.info(
             f"Loaded {len(self.regular_mappings)} mappings for {len(self.ref_data)} {self.name} "
             "in FOLIO"
@@ -97,41 +111,45 @@ class RefDataMapping(object):
 
     def get_hybrid_mapping(self, legacy_object):
         obj_key = "_".join(legacy_object[k].strip() for k in self.mapped_legacy_keys)
-        if obj_key in self.cache:
-            return self.cache[obj_key]
-        highest_match = None
-        highest_match_number = 0
-
-        prepped_props = {k: legacy_object[k].strip() for k in self.mapped_legacy_keys}
-        for mapping in self.hybrid_mappings:
-            mismatch = 0
-            match_numbers = []
-            for k in self.mapped_legacy_keys:
-                if mapping[k] == prepped_props[k]:
-                    match_numbers.append(10)
-                elif mapping[k] == "*":
-                    match_numbers.append(1)
-                else:
-                    mismatch += 1
-            summa = sum(match_numbers)
-
-            if mismatch < 1 and summa > highest_match_number and min(match_numbers) > 0:
-                highest_match_number = summa
-                highest_match = mapping
+        if (cached := self.cache.get(obj_key, NOT_CACHED)) is not NOT_CACHED:
+            return cached
+        prepped_values = tuple(legacy_object[k].strip() for k in self.mapped_legacy_keys)
+        highest_match = self.hybrid_index.get_most_specific_match(prepped_values)
         self.cache[obj_key] = highest_match
         return highest_match
 
+    def find_mapping(self, legacy_values: tuple) -> Optional[dict]:
+        """Finds the map row for legacy values, like get_ref_data_mapping and then
+        get_hybrid_mapping, without caching it
+
+        Args:
+            legacy_values (tuple): The stripped values of the mapped legacy fields
+
+        Returns:
+            Optional[dict]: The row, or None if the values get the default
+        """
+        if mapping := self.regular_index.get_match(legacy_values):
+            return mapping
+        return self.hybrid_index.get_most_specific_match(legacy_values)
+
     def get_ref_data_mapping(self, legacy_object):
         obj_key = "_".join(legacy_object[k].strip() for k in self.mapped_legacy_keys)
-        if obj_key in self.cache:
-            return self.cache[obj_key]
-        prepped_props = {k: legacy_object[k].strip() for k in self.mapped_legacy_keys}
-        for mapping in self.regular_mappings:
-            match_number = sum(prepped_props[k] == mapping[k] for k in self.mapped_legacy_keys)
-            if match_number == len(self.mapped_legacy_keys):
-                self.cache[obj_key] = mapping
-                return mapping
-        return None
+        if (cached := self.cache.get(obj_key, NOT_CACHED)) is not NOT_CACHED:
+            return cached
+        prepped_values = tuple(legacy_object[k].strip() for k in self.mapped_legacy_keys)
+        mapping = self.regular_index.get_match(prepped_values)
+        if mapping:
+            self.cache[obj_key] = mapping
+        return mapping
+
+    def log_cache_statistics(self):
+        logging.info(
+            "%s mapping cache: %s hits, %s misses, %s cached",
+            self.name,
+            self.cache.hits,
+            self.cache.misses,
+            len(self.cache),
+        )
 
     def is_hybrid_default_mapping(self, mapping):
         legacy_values = [value for key, value in mapping.items() if key in self.mapped_legacy_keys]
@@ -219,3 +237,112 @@ def get_mapped_legacy_keys(mapping):
             "folio_feeFineType",
         ]
     ]
+
+
+def score_hybrid_mappings(hybrid_mappings, mapped_legacy_keys, prepped_props: dict):
+    highest_match = None
+    highest_match_number = 0
+    for mapping in hybrid_mappings:
+        mismatch = 0
+        match_numbers = []
+        for k in mapped_legacy_keys:
+            if mapping[k] == prepped_props[k]:
+                match_numbers.append(10)
+            elif mapping[k] == "*":
+                match_numbers.append(1)
+            else:
+                mismatch += 1
+        summa = sum(match_numbers)
+
+        if mismatch < 1 and summa > highest_match_number and min(match_numbers) > 0:
+            highest_match_number = summa
+            highest_match = mapping
+    return highest_match
+
+
+class MappingIndex:
+    """The rows of a reference data map, indexed by their legacy values
+
+    Rows are indexed by all their legacy values, for exact matches, and by the values
+    that are not * for each combination of * columns, for hybrid matches.
+    """
+
+    def __init__(self, mappings: List[dict], mapped_legacy_keys: List[str]):
+        self.mappings = mappings
+        self.mapped_legacy_keys = mapped_legacy_keys
+        self.exact_matches: Dict[tuple, dict] = {}
+        patterns: Dict[tuple, Dict[tuple, Tuple[int, dict]]] = {}
+        for row_number, mapping in enumerate(mappings):
+            values = tuple(mapping[k] for k in mapped_legacy_keys)
+            self.exact_matches.setdefault(values, mapping)
+            wildcards = tuple(i for i, value in enumerate(values) if value == "*")
+            patterns.setdefault(wildcards, {}).setdefault(
+                tuple(value for value in values if value != "*"), (row_number, mapping)
+            )
+        # The fewer * a row has, the more specific, and the higher scored, it is
+        self.patterns = sorted(patterns.items(), key=lambda pattern: len(pattern[0]))
+
+    def get_match(self, legacy_values: tuple) -> Optional[dict]:
+        """Gets the first row with exactly the legacy values"""
+        return self.exact_matches.get(legacy_values)
+
+    def get_most_specific_match(self, legacy_values: tuple) -> Optional[dict]:
+        """Gets the row that matches the legacy values with the fewest *
+
+        Args:
+            legacy_values (tuple): The stripped legacy values
+
+        Returns:
+            Optional[dict]: The row. Of equally specific rows, the first one in the map.
+        """
+        if "*" in legacy_values:
+            # A legacy * matches a * in the map exactly, which the index does not score
+            return score_hybrid_mappings(
+                self.mappings,
+                self.mapped_legacy_keys,
+                dict(zip(self.mapped_legacy_keys, legacy_values)),
+            )
+        best_match = None
+        best_wildcard_count = 0
+        for wildcards, rows in self.patterns:
+            if best_match and len(wildcards) > best_wildcard_count:
+                break
+            match = rows.get(
+                tuple(value for i, value in enumerate(legacy_values) if i not in wildcards)
+            )
+            if match and (not best_match or match[0] < best_match[0]):
+                best_match = match
+                best_wildcard_count = len(wildcards)
+        return best_match[1] if best_match else None
+
+
+class BoundedCache:
+    """A least recently used cache, that counts its hits and misses"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
@@ -8,6 +8,7 @@ from dateutil.parser import parse
 from folio_uuid.folio_namespaces import FOLIONamespaces
 from folioclient import FolioClient
 
+from folio_migration_tools.custom_dict import LegacyRowReader
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.mapping_file_transformation.mapping_file_mapper_base import (
@@ -119,13 +120,13 @@ class UserMapper(MappingFileMapperBase):
     def get_users(self, source_file, file_format: str):
         csv.register_dialect("tsv", delimiter="\t")
         if file_format == "tsv":
-            reader = csv.DictReader(source_file, dialect="tsv")
+            reader = LegacyRowReader(source_file, dialect="tsv")
         else:  # Assume csv
-            reader = csv.DictReader(source_file)
+            reader = LegacyRowReader(source_file)
         for idx, row in enumerate(reader):
             if len(row.keys()) < 3:
                 raise TransformationProcessError(
-                    idx, "something is wrong source file row", json.dumps(row)
+                    idx, "something is wrong source file row", json.dumps(dict(row))
                 )
             yield row
 
@@ -0,0 +1,231 @@
+import json
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+
+class CompiledRule:
+    """A MARC-to-FOLIO mapping rule, with everything the mapper needs from it worked out
+
+    The mapping rules are fetched as JSON from the tenant. Parsing that JSON for every field
+    of every record is expensive, so each rule is parsed once into one of these: the target
+    is split, the condition types are parsed and bound to the condition functions, and the
+    subfield delimiter groups are worked out.
+    """
+
+    __slots__ = (
+        "mapping",
+        "target",
+        "target_key",
+        "entity",
+        "entity_parent",
+        "entity_per_repeated_subfield",
+        "alternative",
+        "ignore_subsequent_subfields",
+        "ignore_subsequent_fields",
+        "has_conditions",
+        "has_value_to_add",
+        "value",
+        "conditions",
+        "parameter",
+        "subfields",
+        "any_subfields",
+        "delimited_subfields",
+        "apply_rules_on_concatenated_data",
+        "subfield_split",
+        "field_replacement_by_3_digits",
+        "field_replacements",
+    )
+
+    def __init__(self, mapping: dict, conditions):
+        self.mapping = mapping
+        self.target: str = mapping.get("target", "")
+        self.target_key = self.target.split(".")[-1]
+        self.entity: Optional[Tuple[CompiledRule, ...]] = None
+        self.entity_parent = ""
+        if "entity" in mapping:
+            self.entity = tuple(CompiledRule(m, conditions) for m in mapping["entity"])
+            self.entity_parent = self.entity[0].target.split(".")[0] if self.entity else ""
+        self.entity_per_repeated_subfield = bool(mapping.get("entityPerRepeatedSubfield", False))
+        self.alternative = (
+            CompiledRule(mapping["alternativeMapping"], conditions)
+            if "alternativeMapping" in mapping
+            else None
+        )
+        self.ignore_subsequent_subfields = bool(mapping.get("ignoreSubsequentSubfields", False))
+        self.ignore_subsequent_fields = bool(mapping.get("ignoreSubsequentFields", False))
+
+        rules = mapping.get("rules") or []
+        first_rule = rules[0] if rules else {}
+        self.has_conditions = bool(first_rule.get("conditions"))
+        self.has_value_to_add = bool(first_rule.get("value", ""))
+        value = first_rule.get("value", "")
+        # Avoid bool("false") == True
+        self.value = True if value == "true" else False if value == "false" else value
+        self.conditions: List[Tuple[str, Optional[Callable]]] = []
+        self.parameter: dict = {}
+        if self.has_conditions:
+            condition = first_rule["conditions"][0]
+            self.conditions = [
+                (condition_type, getattr(conditions, f"condition_{condition_type}", None))
+                for condition_type in map(str.strip, condition["type"].split(","))
+            ]
+            self.parameter = ConditionParameter(condition.get("parameter", {}))
+
+        self.subfields: List[str] = mapping.get("subfield") or []
+        self.any_subfields = any(self.subfields)
+        self.delimited_subfields = self.get_delimited_subfields(
+            self.subfields, mapping.get("subFieldDelimiter")
+        )
+        self.apply_rules_on_concatenated_data = bool(
+            mapping.get("applyRulesOnConcatenatedData", "")
+        )
+        self.subfield_split = bool(mapping.get("subFieldSplit", ""))
+
+        self.field_replacement_by_3_digits = bool(mapping.get("fieldReplacementBy3Digits", False))
+        self.field_replacements: Dict[str, str] = {}
+        for replacement in mapping.get("fieldReplacementRule", []):
+            self.field_replacements.setdefault(
+                replacement["sourceDigits"], replacement.get("targetField", "")
+            )
+
+    @staticmethod
+    def get_delimited_subfields(
+        subfields: List[str], custom_delimiters: Optional[List[dict]]
+    ) -> Optional[List[Tuple[str, List[str]]]]:
+        """Groups the subfields by the delimiter to join them with
+
+        Returns:
+            Optional[List[Tuple[str, List[str]]]]: A delimiter and its subfields per custom
+                delimiter, or None if the rule has no custom delimiters
+        """
+        if not subfields or not custom_delimiters:
+            return None
+        delimiter_map = {subfield: " " for subfield in subfields}
+        for custom_delimiter in custom_delimiters:
+            delimiter_map.update(
+                {subfield: custom_delimiter["value"] for subfield in custom_delimiter["subfields"]}
+            )
+        return [
+            (
+                custom_delimiter["value"],
+                [
+                    subfield
+                    for subfield in subfields
+                    if custom_delimiter["subfields"]
+                    and delimiter_map[subfield] == custom_delimiter["value"]
+                ],
+            )
+            for custom_delimiter in custom_delimiters
+        ]
+
+
+class ConditionParameter(dict):
+    """The parameter of the conditions of a rule, hashable so that the results of pure
+    conditions can be cached by it. It must not be changed after it is created."""
+
+    __slots__ = ("frozen",)
+
+    def __init__(self, parameter: dict):
+        super().__init__(parameter)
+        self.frozen = json.dumps(parameter, sort_keys=True, default=str)
+
+    def __hash__(self):
+        return hash(self.frozen)
+
+
+class CompiledTagRules:
+    """The compiled mapping rules for a MARC tag
+
+    Keeps the rule list it was compiled from, and the conditions it was bound to, so that
+    the mapper can tell when the rules need to be compiled again.
+    """
+
+    __slots__ = ("mappings", "conditions", "rules", "ignore_subsequent_fields")
+
+    def __init__(self, mappings: List[dict], conditions):
+        self.mappings = mappings
+        self.conditions = conditions
+        self.rules = tuple(CompiledRule(mapping, conditions) for mapping in mappings)
+        self.ignore_subsequent_fields = any(rule.ignore_subsequent_fields for rule in self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+
+class TargetStep:
+    """One level of a mapping target, like identifiers or value in identifiers.value, with
+    the shape of its schema property worked out"""
+
+    __slots__ = (
+        "name",
+        "in_schema",
+        "is_string",
+        "is_array_of_strings",
+        "is_array_of_objects",
+        "item_property_count",
+        "is_string_in_array_of_objects",
+    )
+
+    def __init__(self, name: str, schema_property: Optional[dict], schema_parent: Optional[dict]):
+        self.name = name
+        self.in_schema = schema_property is not None
+        schema_property = schema_property or {}
+        is_array = schema_property.get("type", "") == "array"
+        items = schema_property.get("items", {})
+        self.is_string = schema_property.get("type", "") == "string"
+        self.is_array_of_strings = is_array and items.get("type", "") == "string"
+        self.is_array_of_objects = is_array and items.get("type", "") == "object"
+        self.item_property_count = (
+            len(items.get("properties", {})) if self.is_array_of_objects else -1
+        )
+        self.is_string_in_array_of_objects = (
+            schema_parent is not None
+            and is_array_of_objects(schema_parent)
+            and schema_property.get("type", "string") == "string"
+        )
+
+
+def resolve_target(schema: dict, target_string: str) -> Tuple[TargetStep, ...]:
+    """Walks the schema along a mapping target, like identifiers.value
+
+    A first level target that is not in the schema resolves to a step that is not in the
+    schema. Nested targets that are not in the schema raise a KeyError.
+
+    Args:
+        schema (dict): The JSON schema of the FOLIO record
+        target_string (str): The target, with the levels separated by dots
+
+    Returns:
+        Tuple[TargetStep, ...]: The levels of the target
+    """
+    targets = target_string.split(".")
+    schema_properties = schema["properties"]
+    if len(targets) == 1:
+        return (TargetStep(target_string, schema_properties.get(target_string), None),)
+    steps = []
+    schema_parent = None
+    schema_property = schema_properties
+    for target in targets:
+        if target in schema_property:
+            schema_property = schema_property[target]
+        else:
+            schema_property = schema_parent["items"]["properties"][target]
+        steps.append(TargetStep(target, schema_property, schema_parent))
+        schema_parent = schema_property
+    return tuple(steps)
+
+
+def is_array_of_strings(schema_property):
+    sc_prop_type = schema_property.get("type", "string")
+    return sc_prop_type == "array" and schema_property["items"]["type"] == "string"
+
+
+def is_array_of_objects(schema_property):
+    sc_prop_type = schema_property.get("type", "string")
+    return sc_prop_type == "array" and schema_property["items"]["type"] == "object"
@@ -1,11 +1,14 @@
+import functools
 import logging
 import re
+from typing import Callable
+from typing import Set
 
-import i18n
 import pymarc
 from folioclient import FolioClient
 from pymarc import field
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import (
     TransformationFieldMappingError,
     TransformationProcessError,
@@ -13,12 +16,32 @@ from folio_migration_tools.custom_exceptions import (
 )
 from folio_migration_tools.helper import Helper
 from folio_migration_tools.library_configuration import FolioRelease
+from folio_migration_tools.marc_rules_transformation.compiled_rules import (
+    ConditionParameter,
+)
 from folio_migration_tools.marc_rules_transformation.rules_mapper_base import (
     RulesMapperBase,
 )
 
 # flake8: noqa: s
 
+NON_ALPHANUMERIC = re.compile(r"[^A-Za-z0-9 ]+")
+INITIAL_WITH_PERIOD = re.compile(r"^(.*?)\s.[.]$")
+INITIAL_WITH_COMMA_AND_PERIOD = re.compile(r"^(.*?)\s.,[.]$")
+
+PURE_CONDITIONS: Set[str] = set()
+PURE_CONDITION_CACHE_SIZE = 20000
+
+
+def pure_condition(condition: Callable) -> Callable:
+    """Declares a condition to be a function of its value and parameter only
+
+    The results of pure conditions are cached, so a pure condition must not use the legacy
+    id or the MARC field, add to the migration report or change any state.
+    """
+    PURE_CONDITIONS.add(condition.__name__[len("condition_") :])
+    return condition
+
 
 class Conditions:
     holdings_type_map = {
@@ -53,6 +76,8 @@ class Conditions:
             self.setup_reference_data_for_all()
             self.setup_reference_data_for_items_and_holdings(default_call_number_type_name)
         self.condition_cache: dict = {}
+        for condition_name in PURE_CONDITIONS:
+            setattr(self, f"condition_{condition_name}", self.memoize_condition(condition_name))
 
     def setup_reference_data_for_bibs(self):
         logging.info("Setting up reference data for bib transformation")
@@ -166,26 +191,76 @@ class Conditions:
             self.condition_cache[name] = attr
             return attr(legacy_id, value, parameter, marc_field)
 
+    def memoize_condition(self, name: str) -> Callable:
+        """Wraps a pure condition in a bounded LRU cache of its results
+
+        Results are cached by the value and the parameter, for parameters that come from
+        compiled mapping rules. Other parameters are not hashable, and the condition is
+        called without the cache.
+
+        Args:
+            name (str): The name of the condition, without the condition_ prefix
+
+        Returns:
+            Callable: The condition, with the cache statistics in its cache_info()
+        """
+        condition = getattr(self, f"condition_{name}")
+
+        @functools.lru_cache(maxsize=PURE_CONDITION_CACHE_SIZE)
+        def cached_condition(value, parameter):
+            return condition("", value, parameter, None)
+
+        def memoized_condition(legacy_id, value, parameter=None, marc_field=None):
+            if isinstance(parameter, dict) and not isinstance(parameter, ConditionParameter):
+                return condition(legacy_id, value, parameter, marc_field)
+            return cached_condition(value, parameter)
+
+        memoized_condition.cache_info = cached_condition.cache_info
+        return memoized_condition
+
+    def get_memoization_statistics(self) -> dict:
+        """Gets the cache hits and misses of the pure conditions
+
+        Returns:
+            dict: A functools cache_info tuple per pure condition that has been called
+        """
+        statistics = {}
+        for condition_name in sorted(PURE_CONDITIONS):
+            cache_info = getattr(self, f"condition_{condition_name}").cache_info()
+            if cache_info.hits or cache_info.misses:
+                statistics[condition_name] = cache_info
+        return statistics
+
+    def log_memoization_statistics(self):
+        for condition_name, cache_info in self.get_memoization_statistics().items():
+            logging.info(
+                "Condition %s: %s cached results used, %s computed",
+                condition_name,
+                cache_info.hits,
+                cache_info.misses,
+            )
+
+    @pure_condition
     def condition_trim_punctuation(self, legacy_id, value, parameter, marc_field: field.Field):
         """
         Strip leading and trailing whitespace, as well as any trailing commas or periods, unless
         the period is preceded by a single alpha character (eg. "John D."). Also preserves any
         trailing "-" (eg. "1981-"). This condition was introduced in Poppy.
         """
-        pattern1 = re.compile(r"^(.*?)\s.[.]$")
-        pattern2 = re.compile(r"^(.*?)\s.,[.]$")
         value = value.strip()
-        if pattern1.match(value) or value.endswith("-"):
+        if INITIAL_WITH_PERIOD.match(value) or value.endswith("-"):
             return value
-        elif pattern2.match(value):
+        elif INITIAL_WITH_COMMA_AND_PERIOD.match(value):
             return value.rstrip(",")
         elif value.endswith(".") or value.endswith(","):
             return value[:-1]
         return value
 
+    @pure_condition
     def condition_trim_period(self, legacy_id, value, parameter, marc_field: field.Field):
         return value.strip().rstrip(".").rstrip(",")
 
+    @pure_condition
     def condition_trim(self, legacy_id, value, parameter, marc_field: field.Field):
         return value.strip()
 
@@ -194,7 +269,7 @@ class Conditions:
     ):
         contributor_code_subfield = parameter.get("contributorCodeSubfield", "4")
         for subfield in marc_field.get_subfields(contributor_code_subfield):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = NON_ALPHANUMERIC.sub("", subfield.strip())
             t = self.get_ref_data_tuple_by_code(
                 self.folio.contributor_types, "contrib_types_c", normalized_subfield
             )
@@ -215,7 +290,7 @@ class Conditions:
                 self.mapper.migration_report.add(
                     "ContributorTypeMapping",
                     (
-                        i18n.t(
+                        i18n_cache.t(
                             'Contributor type code "%{code}" found for $%{code_subfield}',
                             code=t[1],
                             code_subfield=contributor_code_subfield,
@@ -227,7 +302,7 @@ class Conditions:
         fallback_name_field = "j" if marc_field.tag in ["111", "711"] else "e"
         contributor_name_subfield = parameter.get("contributorNameSubfield", fallback_name_field)
         for subfield in marc_field.get_subfields(contributor_name_subfield):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = NON_ALPHANUMERIC.sub("", subfield.strip())
             t = self.get_ref_data_tuple_by_name(
                 self.folio.contributor_types, "contrib_types_n", normalized_subfield
             )
@@ -257,7 +332,9 @@ class Conditions:
         return ""
 
     def condition_set_holdings_type_id(self, legacy_id, value, parameter, marc_field: field.Field):
-        self.mapper.migration_report.add("HoldingsTypeMapping", i18n.t("Condition in rules hit"))
+        self.mapper.migration_report.add(
+            "HoldingsTypeMapping", i18n_cache.t("Condition in rules hit")
+        )
         return ""
 
     def condition_concat_subfields_by_name(
@@ -282,12 +359,13 @@ class Conditions:
             return value.strip()
         self.mapper.migration_report.add(
             "AddedValueFromParameter",
-            i18n.t(
+            i18n_cache.t(
                 "Tag: %{tag}. Added value: %{value}", tag=marc_field.tag, value=parameter["value"]
             ),
         )
         return parameter["value"]
 
+    @pure_condition
     def condition_remove_ending_punc(self, legacy_id, value, parameter, marc_field: field.Field):
         v = value
         chars = ".;:,/+=- "
@@ -306,13 +384,13 @@ class Conditions:
             )
             self.mapper.migration_report.add(
                 "InstanceFormat",
-                i18n.t("Successful match") + f'  - "{value}"->{t[1]}',
+                i18n_cache.t("Successful match") + f'  - "{value}"->{t[1]}',
             )
             return t[0]
         except Exception:
             self.mapper.migration_report.add(
                 "InstanceFormat",
-                i18n.t('Code from 338$b NOT found in FOLIO: "%{value}"', value=value),
+                i18n_cache.t('Code from 338$b NOT found in FOLIO: "%{value}"', value=value),
             )
 
             return ""
@@ -329,12 +407,15 @@ class Conditions:
         num_take = int(ind2)
         return re.sub(reg_str, "", value[num_take:])
 
+    @pure_condition
     def condition_capitalize(self, legacy_id, value, parameter, marc_field: field.Field):
         return value.capitalize()
 
+    @pure_condition
     def condition_clean_isbn(self, legacy_id, value, parameter, marc_field: field.Field):
         return value
 
+    @pure_condition
     def condition_set_issuance_mode_id(self, legacy_id, value, parameter, marc_field: field.Field):
         # mode of issuance is handled elsewhere in the mapping.
         return ""
@@ -390,7 +471,7 @@ class Conditions:
         if not my_id:
             raise TransformationFieldMappingError(
                 legacy_id,
-                i18n.t("no matching identifier_types in %{names}", names=parameter["names"]),
+                i18n_cache.t("no matching identifier_types in %{names}", names=parameter["names"]),
                 marc_field,
             )
         return my_id
@@ -460,13 +541,14 @@ class Conditions:
                 parameter.get("name", ""),
             )
 
+    @pure_condition
     def condition_char_select(self, legacy_id, value, parameter, marc_field: field.Field):
         return value[parameter["from"] : parameter["to"]]
 
     def condition_set_receipt_status(self, legacy_id, value, parameter, marc_field: field.Field):
         if len(value) < 7:
             self.mapper.migration_report.add(
-                "ReceiptStatusMapping", i18n.t("008 is too short") + f": {value}"
+                "ReceiptStatusMapping", i18n_cache.t("008 is too short") + f": {value}"
             )
             return ""
         try:
@@ -482,7 +564,7 @@ class Conditions:
             mapped_value = status_map[value[6]]
             self.mapper.migration_report.add(
                 "ReceiptStatusMapping",
-                i18n.t(
+                i18n_cache.t(
                     "%{value} mapped to %{mapped_value}", value=value[6], mapped_value=mapped_value
                 ),
             )
@@ -490,7 +572,7 @@ class Conditions:
             return
         except Exception:
             self.mapper.migration_report.add(
-                "ReceiptStatusMapping", i18n.t("%{value} not found in map.", value=value)
+                "ReceiptStatusMapping", i18n_cache.t("%{value} not found in map.", value=value)
             )
             return "Unknown"
 
@@ -546,14 +628,14 @@ class Conditions:
         self, legacy_id, value, parameter, marc_field: field.Field
     ):
         for subfield in marc_field.get_subfields("4"):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = NON_ALPHANUMERIC.sub("", subfield.strip())
             t = self.get_ref_data_tuple_by_code(
                 self.folio.contributor_types, "contrib_types_c", normalized_subfield
             )
             if not t:
                 self.mapper.migration_report.add(
                     "ContributorTypeMapping",
-                    i18n.t(
+                    i18n_cache.t(
                         'Mapping failed for %{tag} "%{subfield}" (%{normalized_subfield})',
                         tag="$4",
                         subfield=subfield,
@@ -568,7 +650,7 @@ class Conditions:
             else:
                 self.mapper.migration_report.add(
                     "ContributorTypeMapping",
-                    i18n.t(
+                    i18n_cache.t(
                         'Contributor type code "%{code}" found for $%{code_subfield}',
                         code=t[1],
                         code_subfield="4",
@@ -579,7 +661,7 @@ class Conditions:
                 return t[0]
         subfield_code = "j" if marc_field.tag in ["111", "711"] else "e"
         for subfield in marc_field.get_subfields(subfield_code):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = NON_ALPHANUMERIC.sub("", subfield.strip())
             t = self.get_ref_data_tuple_by_name(
                 self.folio.contributor_types, "contrib_types_n", normalized_subfield
             )
@@ -587,7 +669,7 @@ class Conditions:
             if not t:
                 self.mapper.migration_report.add(
                     "ContributorTypeMapping",
-                    i18n.t(
+                    i18n_cache.t(
                         'Mapping failed for %{tag} "%{subfield}" (Normalized: %{normalized_subfield})',
                         tag=f"{marc_field.tag} $e",
                         subfield=subfield,
@@ -602,7 +684,7 @@ class Conditions:
             else:
                 self.mapper.migration_report.add(
                     "ContributorTypeMapping",
-                    i18n.t(
+                    i18n_cache.t(
                         "Contributor type name %{name} found for %{tag}",
                         name=t[1],
                         tag=marc_field.tag,
@@ -646,7 +728,9 @@ class Conditions:
         if marc_field.indicator1 == "7" and "2" in marc_field:
             self.mapper.migration_report.add(
                 "CallNumberTypeMapping",
-                i18n.t("Unhandled call number type in $2 (ind1 == 7)" + str(marc_field["2"])),
+                i18n_cache.t(
+                    "Unhandled call number type in $2 (ind1 == 7)" + str(marc_field["2"])
+                ),
             )
             return self.default_call_number_type["id"]
 
@@ -656,7 +740,7 @@ class Conditions:
             self.mapper.migration_report.add(
                 "CallNumberTypeMapping",
                 (
-                    i18n.t(
+                    i18n_cache.t(
                         'Unhandled call number type in ind1: "%{ind1}".\n Returning default Callnumber type: %{type}',
                         ind1=marc_field.indicator1,
                         type=self.default_call_number_type["name"],
@@ -670,7 +754,7 @@ class Conditions:
         if t:
             self.mapper.migration_report.add(
                 "CallNumberTypeMapping",
-                i18n.t("Mapped from Indicator 1") + f" {marc_field.indicator1} -> {t[1]}",
+                i18n_cache.t("Mapped from Indicator 1") + f" {marc_field.indicator1} -> {t[1]}",
             )
             return t[0]
 
@@ -688,7 +772,7 @@ class Conditions:
         self, legacy_id, value, parameter, marc_field: field.Field
     ):
         for subfield in marc_field.get_subfields("4", "e"):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = NON_ALPHANUMERIC.sub("", subfield.strip())
             for cont_type in self.folio.contributor_types:
                 if normalized_subfield in [cont_type["code"], cont_type["name"]]:
                     return cont_type["name"]
@@ -762,13 +846,14 @@ class Conditions:
             mapped_code = self.ref_data_dicts["legacy_locations"].get("*", "").strip()
             if mapped_code:
                 self.mapper.migration_report.add(
-                    "LocationMapping", i18n.t("Fallback mapping") + f": {value}->{mapped_code}"
+                    "LocationMapping",
+                    i18n_cache.t("Fallback mapping") + f": {value}->{mapped_code}",
                 )
         # Get the FOLIO UUID for the code and return it
         t = self.get_ref_data_tuple_by_code(self.folio.locations, "locations", mapped_code)
         if not t:
             self.mapper.migration_report.add(
-                "LocationMapping", i18n.t("Unmapped code") + f": '{value}'"
+                "LocationMapping", i18n_cache.t("Unmapped code") + f": '{value}'"
             )
             raise TransformationRecordFailedError(
                 legacy_id, "Could not map location from legacy code", value
@@ -783,17 +868,9 @@ class Conditions:
         return self.get_ref_data_tuple(ref_data, ref_name, name, "name")
 
     def get_ref_data_tuple(self, ref_data, ref_name, key_value, key_type):
-        dict_key = f"{ref_name}{key_type}"
-        # Try get the object from the cache
-        ref_object = self.ref_data_dicts.get(dict_key, {}).get(key_value.lower(), ())
-        if ref_object:
-            return ref_object
-
-        # No cache, we need to add it to the cache.
-        d = {r[key_type].lower(): (r["id"], r["name"]) for r in ref_data}
-        self.ref_data_dicts[dict_key] = d
-        return self.ref_data_dicts.get(dict_key, {}).get(key_value.lower(), ())
+        return self.mapper.ref_data_index.get_ref_data_tuple(ref_data, key_type, key_value)
 
+    @pure_condition
     def condition_remove_substring(self, legacy_id, value, parameter, marc_field: field.Field):
         return value.replace(parameter["substring"], "")
 
@@ -845,7 +922,7 @@ class Conditions:
         self.mapper.migration_report.add(
             "StaffOnlyViaIndicator",
             f"{marc_field.tag} indicator1: {ind1} ("
-            + i18n.t("1 is public, all other values are Staff only")
+            + i18n_cache.t("1 is public, all other values are Staff only")
             + ")",
         )
         if ind1 == "0":
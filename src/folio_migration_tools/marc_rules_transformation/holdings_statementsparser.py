@@ -4,9 +4,9 @@ import logging
 import re
 from typing import List
 
-import i18n
 from pymarc import Field, Record
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationFieldMappingError
 
 
@@ -48,7 +48,7 @@ class HoldingsStatementsParser:
             if "8" not in pattern_field:
                 raise TransformationFieldMappingError(
                     legacy_ids,
-                    i18n.t(
+                    i18n_cache.t(
                         "%{tag} subfield %{subfield} not in field",
                         tag=pattern_tag,
                         subfield="8",
@@ -78,7 +78,7 @@ class HoldingsStatementsParser:
                     except KeyError:
                         raise TransformationFieldMappingError(
                             legacy_ids,
-                            i18n.t(
+                            i18n_cache.t(
                                 "subfield present in %{linked_value_tag} but not in %{pattern_field}",
                                 pattern_field=pattern_field,
                                 linked_value_tag=linked_value_field,
@@ -169,7 +169,7 @@ class HoldingsStatementsParser:
             if "a" not in codes and "z" not in codes and "x" not in codes:
                 raise TransformationFieldMappingError(
                     legacy_ids,
-                    i18n.t(
+                    i18n_cache.t(
                         "%{field} subfields a, x, and z missing from field", field=field_textual
                     ),
                     f,
@@ -181,7 +181,7 @@ class HoldingsStatementsParser:
             ):
                 raise TransformationFieldMappingError(
                     legacy_ids,
-                    i18n.t("%{field} a,x and z are all empty", field=field_textual),
+                    i18n_cache.t("%{field} a,x and z are all empty", field=field_textual),
                     f,
                 )
             return_dict["statements"].append(
@@ -1,6 +1,9 @@
 import json
 import logging
+from typing import List
+from typing import Optional
 from typing import Set
+from typing import Tuple
 
 import httpx
 import i18n
@@ -10,11 +13,14 @@ from pymarc import Field
 from pymarc import Record
 from pymarc import Subfield
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.helper import Helper
 from folio_migration_tools.library_configuration import HridHandling
 from folio_migration_tools.migration_report import MigrationReport
 
+DEFERRED_HRID_PREFIX = "@@deferred-hrid-"
+
 
 class HRIDHandler:
     def __init__(
@@ -38,6 +44,8 @@ class HRIDHandler:
         self.items_hrid_prefix = self.hrid_settings["items"].get("prefix", "")
         self.items_hrid_counter = self.hrid_settings["items"]["startNumber"]
         self.common_retain_leading_zeroes: bool = self.hrid_settings["commonRetainLeadingZeroes"]
+        # Set to a list in worker processes. See defer_hrids
+        self.deferred_hrids: Optional[List[Tuple[FOLIONamespaces, str]]] = None
         logging.info(f"HRID handling is set to: '{self.handling}'")
 
     def handle_hrid(
@@ -78,7 +86,9 @@ class HRIDHandler:
             marc_record, legacy_ids, self.migration_report, self.deactivate035_from001
         )
         marc_record.add_ordered_field(new_001)
-        self.migration_report.add("HridHandling", i18n.t("Created HRID using default settings"))
+        self.migration_report.add(
+            "HridHandling", i18n_cache.t("Created HRID using default settings")
+        )
 
     def enumerate_hrid(self, marc_record):
         return self.handling == HridHandling.default or "001" not in marc_record
@@ -99,8 +109,23 @@ class HRIDHandler:
             self.holdings_hrid_counter += 1
         else:
             raise TransformationProcessError("", "Unimplemented namespace")
+        if self.deferred_hrids is not None:
+            hrid = f"{DEFERRED_HRID_PREFIX}{len(self.deferred_hrids)}@@"
+            self.deferred_hrids.append((namespace, hrid))
         return hrid
 
+    def defer_hrids(self):
+        """Makes get_next_hrid hand out placeholders instead of HRIDs
+
+        Used by worker processes transforming records in parallel, where the HRIDs must be
+        assigned in file order by the main process. The placeholders handed out for a record
+        are collected in deferred_hrids, for the main process to replace.
+        """
+        self.deferred_hrids = []
+
+    def get_hrid_counters(self) -> Tuple[int, int]:
+        return self.instance_hrid_counter, self.holdings_hrid_counter
+
     def generate_numeric_part(self, counter):
         return str(counter).zfill(11) if self.common_retain_leading_zeroes else str(counter)
 
@@ -116,11 +141,14 @@ class HRIDHandler:
             f_001 = marc_record["001"].value()
             f_003 = marc_record["003"].value().strip() if "003" in marc_record else ""
             migration_report.add(
-                "HridHandling", i18n.t("Values in %{field}", field="003") + f': {f_003 or "Empty"}'
+                "HridHandling",
+                i18n_cache.t("Values in %{field}", field="003") + f': {f_003 or "Empty"}',
             )
 
             if deactivate035_from001:
-                migration_report.add("HridHandling", i18n.t("035 generation from 001 turned off"))
+                migration_report.add(
+                    "HridHandling", i18n_cache.t("035 generation from 001 turned off")
+                )
             else:
                 str_035 = f"({f_003}){f_001}" if f_003 else f"{f_001}"
                 new_035 = Field(
@@ -133,7 +161,7 @@ class HRIDHandler:
                 existing_035 = marc_record.get_fields("035")
                 if not any(compare_fields(new_035, e) for e in existing_035):
                     marc_record.add_ordered_field(new_035)
-                migration_report.add("HridHandling", i18n.t("Added 035 from 001"))
+                migration_report.add("HridHandling", i18n_cache.t("Added 035 from 001"))
             if remove_001:
                 marc_record.remove_fields("001", "003")
 
@@ -143,7 +171,9 @@ class HRIDHandler:
                 migration_report.add("HridHandling", s)
                 Helper.log_data_issue(legacy_ids, s, marc_record["001"])
             else:
-                migration_report.add("HridHandling", i18n.t("Legacy bib records without 001"))
+                migration_report.add(
+                    "HridHandling", i18n_cache.t("Legacy bib records without 001")
+                )
 
     def hrids_not_updated(self):
         return (
@@ -183,7 +213,7 @@ class HRIDHandler:
         self.instance_hrid_counter = 1
         self.migration_report.set(
             "GeneralStatistics",
-            i18n.t("Instances HRID starting number"),
+            i18n_cache.t("Instances HRID starting number"),
             self.instance_hrid_counter,
         )
         self.store_hrid_settings()
@@ -215,7 +245,7 @@ class HRIDHandler:
         if value in self.unique_001s:
             self.migration_report.add(
                 "HridHandling",
-                i18n.t(
+                i18n_cache.t(
                     "Duplicate 001. Creating HRID instead.\n Previous 001 will be stored in a new 035 field"
                 ),
             )
@@ -234,7 +264,7 @@ class HRIDHandler:
         else:
             self.unique_001s.add(value)
             folio_record["hrid"] = value
-            self.migration_report.add("HridHandling", i18n.t("Took HRID from 001"))
+            self.migration_report.add("HridHandling", i18n_cache.t("Took HRID from 001"))
 
 
 def compare_fields(field1: Field, field2: Field) -> bool:
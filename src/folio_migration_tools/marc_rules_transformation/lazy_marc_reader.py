@@ -0,0 +1,213 @@
+import re
+from typing import List
+from typing import Optional
+
+from pymarc import Field
+from pymarc import Indicators
+from pymarc import Leader
+from pymarc import MARCReader
+from pymarc import Record
+from pymarc import Subfield
+from pymarc.exceptions import BaseAddressInvalid
+from pymarc.exceptions import BaseAddressNotFound
+from pymarc.exceptions import EndOfRecordNotFound
+from pymarc.exceptions import FatalReaderError
+from pymarc.exceptions import NoFieldsFound
+from pymarc.exceptions import RecordDirectoryInvalid
+from pymarc.exceptions import RecordLeaderInvalid
+from pymarc.exceptions import RecordLengthInvalid
+from pymarc.exceptions import TruncatedRecord
+
+LEADER_LEN = 24
+DIRECTORY_ENTRY_LEN = 12
+SUBFIELD_INDICATOR = "\x1f"
+END_OF_RECORD = 29
+BAD_SUBFIELD_CODE = re.compile("\x1f[^\x00-\x7f]")
+
+
+class LazyField(Field):
+    """A pymarc data field that splits its subfields out of the field data when they are
+    first used
+
+    Most fields in a record are never looked at by the mapping rules, so splitting them up
+    into Subfield objects is wasted work. The field data is decoded when the record is
+    read, so encoding errors still fail the record like they do in pymarc.
+    """
+
+    def __init__(self, tag: str, indicators: Indicators, subfield_data: str):
+        self.tag = tag
+        self.control_field = False
+        self.data = None
+        self._indicators = indicators
+        self._subfield_data = subfield_data
+        self._subfields: Optional[List[Subfield]] = None
+
+    @property
+    def subfields(self) -> List[Subfield]:
+        if self._subfields is None:
+            self._subfields = [
+                Subfield(code=part[0], value=part[1:])
+                for part in self._subfield_data.split(SUBFIELD_INDICATOR)
+                if part
+            ]
+        return self._subfields
+
+    @subfields.setter
+    def subfields(self, subfields: List[Subfield]):
+        self._subfields = subfields
+
+    def as_dict(self) -> dict:
+        """The field as MARC-in-JSON, without splitting it into Subfield objects"""
+        if self._subfields is None:
+            subfields = [
+                {part[0]: part[1:]}
+                for part in self._subfield_data.split(SUBFIELD_INDICATOR)
+                if part
+            ]
+        else:
+            subfields = [{subfield.code: subfield.value} for subfield in self._subfields]
+        return {
+            self.tag: {
+                "ind1": self.indicator1,
+                "ind2": self.indicator2,
+                "subfields": subfields,
+            }
+        }
+
+
+class LazyRecord(Record):
+    """A pymarc Record whose data fields are LazyFields
+
+    The leader and the directory are decoded when the record is read. Only UTF-8 records
+    are read lazily. MARC-8 records, and fields with broken indicators or subfield codes,
+    are decoded by pymarc, so that they are handled, and warned about, exactly like before.
+    """
+
+    def decode_marc(
+        self,
+        marc,
+        to_unicode: bool = True,
+        force_utf8: bool = False,
+        hide_utf8_warnings: bool = False,
+        utf8_handling: str = "strict",
+        encoding: str = "iso8859-1",
+    ) -> None:
+        if to_unicode and (marc[9:10] == b"a" or force_utf8):
+            try:
+                if self.decode_utf8_marc(marc, utf8_handling):
+                    return
+            except UnicodeDecodeError:
+                pass
+            self.fields = []
+        super().decode_marc(
+            marc, to_unicode, force_utf8, hide_utf8_warnings, utf8_handling, encoding
+        )
+
+    def decode_utf8_marc(self, marc: bytes, utf8_handling: str) -> bool:
+        """Reads the record like pymarc's decode_marc, but with LazyFields for data fields
+
+        Returns:
+            bool: False if there is a field that pymarc needs to decode
+        """
+        leader = marc[0:LEADER_LEN].decode("ascii")
+        if len(leader) != LEADER_LEN:
+            raise RecordLeaderInvalid
+        self.leader = Leader(leader)
+        base_address = int(marc[12:17])
+        if base_address <= 0:
+            raise BaseAddressNotFound
+        if base_address >= len(marc):
+            raise BaseAddressInvalid
+        if len(marc) < int(self.leader[:5]):
+            raise TruncatedRecord
+        # The directory ends with an end of field byte
+        directory = marc[LEADER_LEN : base_address - 1].decode("ascii")
+        if len(directory) % DIRECTORY_ENTRY_LEN != 0:
+            raise RecordDirectoryInvalid
+
+        fields = []
+        for entry_start in range(0, len(directory), DIRECTORY_ENTRY_LEN):
+            tag = directory[entry_start : entry_start + 3]
+            data_start = base_address + int(directory[entry_start + 7 : entry_start + 12])
+            data_end = data_start + int(directory[entry_start + 3 : entry_start + 7]) - 1
+            entry_data = marc[data_start:data_end]
+            if tag < "010" and tag.isdigit():
+                fields.append(Field(tag=tag, data=entry_data.decode("utf-8")))
+                continue
+            text = entry_data.decode("utf-8", utf8_handling)
+            indicators, _, subfield_data = text.partition(SUBFIELD_INDICATOR)
+            if len(indicators) != 2 or not indicators.isascii() or BAD_SUBFIELD_CODE.search(text):
+                return False
+            fields.append(LazyField(tag, Indicators(indicators[0], indicators[1]), subfield_data))
+        if not fields:
+            raise NoFieldsFound
+        self.fields = fields
+        return True
+
+    def as_dict(self) -> dict:
+        """The record as MARC-in-JSON, like pymarc's as_dict, without splitting the
+        subfields of LazyFields that were never used"""
+        fields = []
+        for field in self.fields:
+            if isinstance(field, LazyField):
+                fields.append(field.as_dict())
+            elif field.control_field:
+                fields.append({field.tag: field.data})
+            else:
+                fields.append(
+                    {
+                        field.tag: {
+                            "ind1": field.indicator1,
+                            "ind2": field.indicator2,
+                            "subfields": [{s.code: s.value} for s in field.subfields],
+                        }
+                    }
+                )
+        return {"leader": str(self.leader), "fields": fields}
+
+
+class LazyMARCReader(MARCReader):
+    """A pymarc MARCReader that reads LazyRecords
+
+    Frames the records, and reports broken ones, exactly like MARCReader.
+    """
+
+    def __next__(self):
+        if self._current_exception and isinstance(self._current_exception, FatalReaderError):
+            raise StopIteration
+
+        self._current_chunk = None
+        self._current_exception = None
+
+        self._current_chunk = first5 = self.file_handle.read(5)
+        if not first5:
+            raise StopIteration
+        if len(first5) < 5:
+            self._current_exception = TruncatedRecord()
+            return None
+        try:
+            length = int(first5)
+        except ValueError:
+            self._current_exception = RecordLengthInvalid()
+            return None
+
+        chunk = first5 + self.file_handle.read(length - 5)
+        self._current_chunk = chunk
+        if len(chunk) < length:
+            self._current_exception = TruncatedRecord()
+            return None
+        if chunk[-1] != END_OF_RECORD:
+            self._current_exception = EndOfRecordNotFound()
+            return None
+
+        try:
+            return LazyRecord(
+                chunk,
+                to_unicode=self.to_unicode,
+                force_utf8=self.force_utf8,
+                hide_utf8_warnings=self.hide_utf8_warnings,
+                utf8_handling=self.utf8_handling,
+                file_encoding=self.file_encoding,
+            )
+        except Exception as ex:
+            self._current_exception = ex
@@ -1,15 +1,18 @@
+import io
+import json
 import logging
 import sys
 import time
 import traceback
 from typing import List
+from typing import Optional
 
-import i18n
 from folio_uuid.folio_namespaces import FOLIONamespaces
 from pymarc import Field
 from pymarc import Record
 from pymarc import Subfield
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.folder_structure import FolderStructure
@@ -37,6 +40,7 @@ class MarcFileProcessor:
         self.records_count: int = 0
         self.start: float = time.time()
         self.legacy_ids: set = set()
+        self.ref_data_index = mapper.ref_data_index
         if (
             self.object_type == FOLIONamespaces.holdings
             and self.mapper.task_configuration.create_source_records
@@ -87,7 +91,7 @@ class MarcFileProcessor:
                         )
                 Helper.write_to_file(self.created_objects_file, folio_rec)
                 self.mapper.migration_report.add_general_statistics(
-                    i18n.t("Inventory records written to disk")
+                    i18n_cache.t("Inventory records written to disk")
                 )
                 self.exit_on_too_many_exceptions()
 
@@ -133,6 +137,27 @@ class MarcFileProcessor:
             [file_def.create_source_records, self.mapper.task_configuration.create_source_records]
         ):
             return
+        self.prepare_srs_record(marc_record, folio_rec, legacy_ids, object_type)
+        self.mapper.save_source_record(
+            self.srs_records_file,
+            self.object_type,
+            self.mapper.folio_client,
+            marc_record,
+            folio_rec,
+            legacy_ids,
+            file_def.discovery_suppressed,
+        )
+        self.mapper.migration_report.add_general_statistics(
+            i18n_cache.t("SRS records written to disk")
+        )
+
+    def prepare_srs_record(
+        self,
+        marc_record: Record,
+        folio_rec,
+        legacy_ids: List[str],
+        object_type: FOLIONamespaces,
+    ):
         if object_type in [FOLIONamespaces.holdings]:
             if "008" in marc_record and len(marc_record["008"].data) > 32:
                 remain, rest = (
@@ -142,7 +167,7 @@ class MarcFileProcessor:
                 marc_record["008"].data = remain
                 self.mapper.migration_report.add(
                     "MarcValidation",
-                    i18n.t("008 length invalid. '%{rest}' was stripped out", rest=rest),
+                    i18n_cache.t("008 length invalid. '%{rest}' was stripped out", rest=rest),
                 )
             self.add_mapped_location_code_to_record(marc_record, folio_rec)
             new_004 = Field(tag="004", data=self.parent_hrids[folio_rec["instanceId"]])
@@ -156,26 +181,135 @@ class MarcFileProcessor:
                         subfields=[Subfield(code="a", value=former_id)],
                     )
                     marc_record.add_ordered_field(new_035)
-        self.mapper.save_source_record(
-            self.srs_records_file,
-            self.object_type,
-            self.mapper.folio_client,
-            marc_record,
-            folio_rec,
-            legacy_ids,
-            file_def.discovery_suppressed,
-        )
-        self.mapper.migration_report.add_general_statistics(i18n.t("SRS records written to disk"))
+
+    def transform_record(
+        self, idx: int, marc_record: Record, file_def: FileDefinition
+    ) -> "TransformedRecord":
+        """Transforms a record, and its SRS record, without saving anything
+
+        This is the part of process_record that worker processes run when transforming in
+        parallel. The main process finishes the job with save_transformed_record.
+
+        Args:
+            idx (int): Index in file being parsed
+            marc_record (Record): The MARC record
+            file_def (FileDefinition): The file the record is from
+
+        Returns:
+            TransformedRecord: The serialized records, or the error that made the record fail
+        """
+        transformed = TransformedRecord()
+        folio_recs = []
+        try:
+            legacy_ids = self.mapper.get_legacy_ids(marc_record, idx)
+            if not legacy_ids:
+                raise TransformationRecordFailedError(
+                    f"Index in file: {idx}", "No legacy id found", idx
+                )
+            folio_recs = self.mapper.parse_record(marc_record, file_def, legacy_ids)
+            transformed.legacy_ids = legacy_ids
+            if (
+                folio_recs
+                and file_def.create_source_records
+                and self.mapper.task_configuration.create_source_records
+            ):
+                try:
+                    self.prepare_srs_record(
+                        marc_record, folio_recs[0], legacy_ids, self.object_type
+                    )
+                    srs_record = io.StringIO()
+                    self.mapper.save_source_record(
+                        srs_record,
+                        self.object_type,
+                        self.mapper.folio_client,
+                        marc_record,
+                        folio_recs[0],
+                        legacy_ids,
+                        file_def.discovery_suppressed,
+                    )
+                    transformed.srs_record = srs_record.getvalue()
+                except TransformationRecordFailedError as error:
+                    transformed.srs_error = (error.index_or_id, error.message, error.data_value)
+            transformed.folio_records = [
+                {key: folio_rec[key] for key in ("id", "hrid", "formerIds") if key in folio_rec}
+                for folio_rec in folio_recs
+            ]
+            transformed.record_lines = [json.dumps(folio_rec) for folio_rec in folio_recs]
+        except TransformationRecordFailedError as error:
+            transformed.status = TransformedRecord.FAILED
+            transformed.error = (error.index_or_id, error.message, error.data_value)
+        except TransformationProcessError as tpe:
+            transformed.status = TransformedRecord.PROCESS_FAILED
+            transformed.error = (
+                f"{tpe.index_or_id} in {file_def.file_name}",
+                tpe.message,
+                tpe.data_value,
+            )
+        except Exception as inst:
+            traceback.print_exc()
+            logging.error(type(inst))
+            logging.error(inst.args)
+            logging.error(inst)
+            logging.error(marc_record)
+            logging.error(folio_recs)
+            transformed.status = TransformedRecord.PROCESS_FAILED
+            transformed.error = ("", inst.args, "")
+        return transformed
+
+    def save_transformed_record(self, transformed: "TransformedRecord", file_def: FileDefinition):
+        """Saves a record transformed by transform_record, the way process_record does
+
+        Args:
+            transformed (TransformedRecord): The transformed record
+            file_def (FileDefinition): The file the record is from
+
+        Raises:
+            TransformationRecordFailedError: The record failed transformation, or has
+                duplicate legacy ids
+        """
+        success = True
+        self.records_count += 1
+        try:
+            if transformed.status == TransformedRecord.FAILED:
+                raise TransformationRecordFailedError(*transformed.error)
+            for idx, (folio_rec, record_line) in enumerate(
+                zip(transformed.folio_records, transformed.record_lines)
+            ):
+                if idx == 0:
+                    filtered_legacy_ids = self.get_valid_folio_record_ids(
+                        transformed.legacy_ids, self.legacy_ids, self.mapper.migration_report
+                    )
+                    self.add_legacy_ids_to_map(folio_rec, filtered_legacy_ids)
+                    if transformed.srs_error:
+                        raise TransformationRecordFailedError(*transformed.srs_error)
+                    if transformed.srs_record:
+                        self.srs_records_file.write(transformed.srs_record)
+                        self.mapper.migration_report.add_general_statistics(
+                            i18n_cache.t("SRS records written to disk")
+                        )
+                self.created_objects_file.write(f"{record_line}\n")
+                self.mapper.migration_report.add_general_statistics(
+                    i18n_cache.t("Inventory records written to disk")
+                )
+                self.exit_on_too_many_exceptions()
+        except TransformationRecordFailedError as error:
+            success = False
+            raise TransformationRecordFailedError(
+                f"{error.index_or_id} in {file_def.file_name}", error.message, error.data_value
+            ) from error
+        finally:
+            if not success:
+                self.failed_records_count += 1
+                remove_from_id_map = getattr(self.mapper, "remove_from_id_map", None)
+                for folio_rec in transformed.folio_records:
+                    if callable(remove_from_id_map) and folio_rec.get("formerIds", ""):
+                        self.mapper.remove_from_id_map(folio_rec.get("formerIds", []))
 
     def add_mapped_location_code_to_record(self, marc_record, folio_rec):
-        location_code = next(
-            (
-                location["code"]
-                for location in self.mapper.folio_client.locations
-                if location["id"] == folio_rec["permanentLocationId"]
-            ),
-            None,
+        location = self.ref_data_index.get_ref_data(
+            self.mapper.folio_client.locations, "id", folio_rec["permanentLocationId"]
         )
+        location_code = location["code"] if location else None
         if "852" not in marc_record:
             raise TransformationRecordFailedError(
                 "", "No 852 in record when storing new location code", ""
@@ -185,11 +319,11 @@ class MarcFileProcessor:
         while old_b := first_852.delete_subfield("b"):
             first_852.add_subfield("x", old_b, 0)
             self.mapper.migration_report.add(
-                "LocationMapping", i18n.t("Additional 852$b was moved to 852$x")
+                "LocationMapping", i18n_cache.t("Additional 852$b was moved to 852$x")
             )
         first_852.add_subfield("b", location_code, 0)
         self.mapper.migration_report.add(
-            "LocationMapping", i18n.t("Set 852 to FOLIO location code")
+            "LocationMapping", i18n_cache.t("Set 852 to FOLIO location code")
         )
 
     def exit_on_too_many_exceptions(self):
@@ -212,10 +346,10 @@ class MarcFileProcessor:
                 new_ids.add(legacy_id)
             else:
                 migration_report.add_general_statistics(
-                    i18n.t("Duplicate MARC record identifiers ")
+                    i18n_cache.t("Duplicate MARC record identifiers ")
                 )
         if not any(new_ids):
-            s = i18n.t("Failed records. No unique record identifiers in legacy record")
+            s = i18n_cache.t("Failed records. No unique record identifiers in legacy record")
             migration_report.add_general_statistics(s)
             raise TransformationRecordFailedError(
                 "-".join(legacy_ids),
@@ -235,7 +369,7 @@ class MarcFileProcessor:
         logging.info("%s records processed", self.records_count)
         with open(self.folder_structure.migration_reports_file, "w+") as report_file:
             self.mapper.migration_report.write_migration_report(
-                i18n.t("MFHD records transformation report"),
+                i18n_cache.t("MFHD records transformation report"),
                 report_file,
                 self.mapper.start_datetime,
             )
@@ -266,3 +400,49 @@ class MarcFileProcessor:
                     "Legacy ID already added to Legacy Id map.",
                     ",".join(filtered_legacy_ids),
                 )
+
+
+class TransformedRecord:
+    """A record transformed in a worker process, on its way back to the main process
+
+    The FOLIO records are serialized already. Only the properties needed for the legacy id
+    map are kept as dicts. HRIDs are placeholders until the main process assigns them.
+    """
+
+    OK = "ok"
+    FAILED = "failed"
+    PROCESS_FAILED = "process_failed"
+    PARSING_FAILED = "parsing_failed"
+    VALUE_ERROR = "value_error"
+
+    __slots__ = (
+        "status",
+        "error",
+        "legacy_ids",
+        "folio_records",
+        "record_lines",
+        "srs_record",
+        "srs_error",
+        "deferred_hrids",
+        "hrid_counter_increments",
+        "extradata",
+    )
+
+    def __init__(self, status: str = OK, error: Optional[tuple] = None):
+        self.status: str = status
+        self.error: Optional[tuple] = error
+        self.legacy_ids: List[str] = []
+        self.folio_records: List[dict] = []
+        self.record_lines: List[str] = []
+        self.srs_record: str = ""
+        self.srs_error: Optional[tuple] = None
+        self.deferred_hrids: list = []
+        self.hrid_counter_increments: tuple = (0, 0)
+        self.extradata: List[str] = []
+
+    def replace_hrid(self, placeholder: str, hrid: str):
+        self.record_lines = [line.replace(placeholder, hrid) for line in self.record_lines]
+        self.srs_record = self.srs_record.replace(placeholder, hrid)
+        for folio_record in self.folio_records:
+            if folio_record.get("hrid") == placeholder:
+                folio_record["hrid"] = hrid
@@ -1,16 +1,22 @@
 import logging
 import sys
-import i18n
 from io import IOBase
 from pathlib import Path
 
-from pymarc import MARCReader
+from pymarc import Leader
 from pymarc import Record
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.folder_structure import FolderStructure
 from folio_migration_tools.library_configuration import FileDefinition
+from folio_migration_tools.marc_rules_transformation.lazy_marc_reader import (
+    LazyMARCReader,
+)
+from folio_migration_tools.marc_rules_transformation.marc_record_index import (
+    MarcRecordIndex,
+)
 from folio_migration_tools.migration_report import MigrationReport
 
 
@@ -21,19 +27,33 @@ class MARCReaderWrapper:
         processor,
         failed_records_path: Path,
         folder_structure: FolderStructure,
+        worker_pool=None,
+        start_index: int = 0,
     ):
+        marc_path = folder_structure.legacy_records_folder / file_def.file_name
         try:
+            index = MarcRecordIndex.for_file(marc_path) if worker_pool or start_index else None
             with open(failed_records_path, "ab") as failed_marc_records_file:
-                with open(
-                    folder_structure.legacy_records_folder / file_def.file_name,
-                    "rb",
-                ) as marc_file:
-                    reader = MARCReader(marc_file, to_unicode=True, permissive=True)
+                with open(marc_path, "rb") as marc_file:
+                    if worker_pool:
+                        logging.info(
+                            "Running %s in %s worker processes",
+                            file_def.file_name,
+                            worker_pool.workers,
+                        )
+                        worker_pool.process_file(
+                            file_def, marc_file, failed_marc_records_file, index, start_index
+                        )
+                        return
+                    if start_index:
+                        logging.info("Starting at record %s", start_index)
+                        index.seek(marc_file, start_index)
+                    reader = LazyMARCReader(marc_file, to_unicode=True, permissive=True)
                     reader.hide_utf8_warnings = True
                     reader.force_utf8 = False
                     logging.info("Running %s", file_def.file_name)
                     MARCReaderWrapper.read_records(
-                        reader, file_def, failed_marc_records_file, processor
+                        reader, file_def, failed_marc_records_file, processor, start_index
                     )
         except TransformationProcessError as tpe:
             logging.critical(tpe)
@@ -47,10 +67,12 @@ class MARCReaderWrapper:
         source_file: FileDefinition,
         failed_records_file: IOBase,
         processor,
+        start_index: int = 0,
     ):
-        for idx, record in enumerate(reader):
+        idx = start_index - 1
+        for idx, record in enumerate(reader, start_index):
             processor.mapper.migration_report.add_general_statistics(
-                i18n.t("Records in file before parsing")
+                i18n_cache.t("Records in file before parsing")
             )
             try:
                 # None = Something bad happened
@@ -66,13 +88,13 @@ class MARCReaderWrapper:
                 else:
                     MARCReaderWrapper.set_leader(record, processor.mapper.migration_report)
                     processor.mapper.migration_report.add_general_statistics(
-                        i18n.t("Records successfully decoded from MARC21"),
+                        i18n_cache.t("Records successfully decoded from MARC21"),
                     )
                     processor.process_record(idx, record, source_file)
             except TransformationRecordFailedError as error:
                 error.log_it()
                 processor.mapper.migration_report.add_general_statistics(
-                    i18n.t("Records that failed transformation. Check log for details"),
+                    i18n_cache.t("Records that failed transformation. Check log for details"),
                 )
             except ValueError as error:
                 logging.error(error)
@@ -80,49 +102,52 @@ class MARCReaderWrapper:
 
     @staticmethod
     def set_leader(marc_record: Record, migration_report: MigrationReport):
-        if marc_record.leader[9] != "a":
+        leader = marc_record.leader
+        if not isinstance(leader, Leader):
+            leader = marc_record.leader = Leader(str(leader))
+        if leader[9] != "a":
             migration_report.add(
                 "LeaderManipulation",
-                i18n.t(
+                i18n_cache.t(
                     "Set leader 09 (Character coding scheme) from %{field} to a",
-                    field=marc_record.leader[9],
+                    field=leader[9],
                 ),
             )
-            marc_record.leader = f"{marc_record.leader[:9]}a{marc_record.leader[10:]}"
+            leader[9] = "a"
 
-        if not marc_record.leader.endswith("4500"):
+        if leader[20:] != "4500":
             migration_report.add(
                 "LeaderManipulation",
-                i18n.t("Set leader 20-23 from %{field} to 4500", field=marc_record.leader[-4:]),
+                i18n_cache.t("Set leader 20-23 from %{field} to 4500", field=leader[20:]),
             )
-            marc_record.leader = f"{marc_record.leader[:-4]}4500"
+            leader[20:] = "4500"
 
-        if marc_record.leader[10] != "2":
+        if leader[10] != "2":
             migration_report.add(
                 "LeaderManipulation",
-                i18n.t(
+                i18n_cache.t(
                     "Set leader 10 (Indicator count) from %{field} to 2",
-                    field=marc_record.leader[10],
+                    field=leader[10],
                 ),
             )
-            marc_record.leader = f"{marc_record.leader[:10]}2{marc_record.leader[11:]}"
+            leader[10] = "2"
 
-        if marc_record.leader[11] != "2":
+        if leader[11] != "2":
             migration_report.add(
                 "LeaderManipulation",
-                i18n.t(
+                i18n_cache.t(
                     "Set leader 11 (Subfield code count) from %{record} to 2",
-                    record=marc_record.leader[11],
+                    record=leader[11],
                 ),
             )
-            marc_record.leader = f"{marc_record.leader[:11]}2{marc_record.leader[12:]}"
+            leader[11] = "2"
 
 
 def report_failed_parsing(
     reader, source_file, failed_bibs_file, idx, migration_report: MigrationReport
 ):
     migration_report.add_general_statistics(
-        i18n.t("Records with encoding errors - parsing failed"),
+        i18n_cache.t("Records with encoding errors - parsing failed"),
     )
     failed_bibs_file.write(reader.current_chunk)
     raise TransformationRecordFailedError(
@@ -0,0 +1,190 @@
+import logging
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import BinaryIO
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+
+INDEX_SUFFIX = ".idx"
+INDEX_HEADER = struct.Struct("<8sQQQ")
+INDEX_MAGIC = b"MARCIDX1"
+
+
+def read_raw_records(marc_file: BinaryIO) -> Iterator[bytes]:
+    """Splits an ISO2709 file into records, using the record lengths in the leaders
+
+    Frames the records exactly like pymarc's MARCReader does, without decoding them. Like
+    MARCReader, it stops after a record that has an invalid length or is truncated, and
+    yields that record's bytes so they can be reported as failed.
+
+    Args:
+        marc_file (BinaryIO): The MARC file, opened in binary mode
+
+    Yields:
+        bytes: The records
+    """
+    while first5 := marc_file.read(5):
+        if len(first5) < 5:
+            yield first5
+            return
+        try:
+            length = int(first5)
+        except ValueError:
+            yield first5
+            return
+        chunk = first5 + marc_file.read(length - 5)
+        yield chunk
+        if len(chunk) < length or chunk[-1:] != b"\x1d":
+            return
+
+
+class MarcRecordIndex:
+    """Where each record in an ISO2709 file starts, so records can be read without the
+    ones before them
+
+    The index is built by reading the record length in the leader of each record and
+    skipping ahead to the next one. Nothing is decoded. The records are framed exactly
+    like read_raw_records (and pymarc's MARCReader) frame them, including the last,
+    broken, record of a file that ends in one.
+
+    The index is saved next to the MARC file, as the offsets of all records and the end
+    of the last one, in eight bytes each. It is rebuilt when the MARC file has changed.
+    """
+
+    def __init__(self, offsets: array):
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @staticmethod
+    def index_path(marc_path: Path) -> Path:
+        return marc_path.with_name(marc_path.name + INDEX_SUFFIX)
+
+    @classmethod
+    def for_file(cls, marc_path: Path) -> "MarcRecordIndex":
+        """Loads the index of a MARC file, or builds and saves it if it is missing or stale
+
+        Args:
+            marc_path (Path): Path to the MARC file
+
+        Returns:
+            MarcRecordIndex: The index of the file
+        """
+        index_path = cls.index_path(marc_path)
+        stat = marc_path.stat()
+        if index := cls.load(index_path, stat.st_size, stat.st_mtime_ns):
+            logging.info("Using record index %s", index_path)
+            return index
+        with open(marc_path, "rb") as marc_file:
+            index = cls.build(marc_file)
+        logging.info("Indexed %s records in %s", len(index), marc_path.name)
+        try:
+            index.save(index_path, stat.st_size, stat.st_mtime_ns)
+        except OSError as error:
+            logging.warning("Could not save record index %s: %s", index_path, error)
+        return index
+
+    @classmethod
+    def build(cls, marc_file: BinaryIO) -> "MarcRecordIndex":
+        """Indexes the records in a MARC file by their leader record lengths
+
+        Args:
+            marc_file (BinaryIO): The MARC file, opened in binary mode and seekable
+
+        Returns:
+            MarcRecordIndex: The index of the file
+        """
+        file_size = marc_file.seek(0, os.SEEK_END)
+        offsets = array("Q", [0])
+        offset = 0
+        while offset < file_size:
+            marc_file.seek(offset)
+            first5 = marc_file.read(5)
+            try:
+                length = int(first5)
+            except ValueError:
+                length = None
+            if length is None or len(first5) < 5:
+                offsets.append(offset + len(first5))
+                break
+            # Like read_raw_records, a broken or truncated record is the last one
+            if length < 5 or offset + length > file_size:
+                offsets.append(file_size)
+                break
+            offset += length
+            offsets.append(offset)
+            marc_file.seek(offset - 1)
+            if marc_file.read(1) != b"\x1d":
+                break
+        return cls(offsets)
+
+    @classmethod
+    def load(cls, index_path: Path, file_size: int, mtime_ns: int) -> Optional["MarcRecordIndex"]:
+        """Loads a saved index, if it was built from a file of this size and modification time
+
+        Returns:
+            Optional[MarcRecordIndex]: The index, or None if it is missing or stale
+        """
+        try:
+            with open(index_path, "rb") as index_file:
+                header = index_file.read(INDEX_HEADER.size)
+                if len(header) < INDEX_HEADER.size:
+                    return None
+                magic, indexed_size, indexed_mtime, records = INDEX_HEADER.unpack(header)
+                if (magic, indexed_size, indexed_mtime) != (INDEX_MAGIC, file_size, mtime_ns):
+                    return None
+                offsets = array("Q")
+                offsets.fromfile(index_file, records + 1)
+        except (OSError, EOFError):
+            return None
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        return cls(offsets)
+
+    def save(self, index_path: Path, file_size: int, mtime_ns: int):
+        offsets = self.offsets
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        with open(index_path, "wb") as index_file:
+            index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, file_size, mtime_ns, len(self)))
+            offsets.tofile(index_file)
+
+    def get_byte_range(self, start: int, stop: Optional[int] = None) -> Tuple[int, int]:
+        """Offset and length of the bytes holding records start up to, not including, stop
+
+        Args:
+            start (int): Index of the first record
+            stop (Optional[int]): Index of the record after the last one. Defaults to the
+                end of the file.
+
+        Returns:
+            Tuple[int, int]: The offset and length
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = min(start, stop)
+        return self.offsets[start], self.offsets[stop] - self.offsets[start]
+
+    def seek(self, marc_file: BinaryIO, idx: int):
+        """Moves the file to the start of record idx, so that reading continues from there"""
+        marc_file.seek(self.get_byte_range(idx)[0])
+
+    def read_record(self, marc_file: BinaryIO, idx: int) -> bytes:
+        """Reads the undecoded record at index idx, for example to save a failed record"""
+        offset, length = self.get_byte_range(idx, idx + 1)
+        marc_file.seek(offset)
+        return marc_file.read(length)
+
+    def read_records(
+        self, marc_file: BinaryIO, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Reads the undecoded records from start up to, not including, stop"""
+        self.seek(marc_file, start)
+        offsets = self.offsets
+        for idx in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield marc_file.read(offsets[idx + 1] - offsets[idx])
@@ -0,0 +1,454 @@
+import copy
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import zlib
+from collections import deque
+from typing import BinaryIO
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from folio_migration_tools import i18n_cache
+from folio_migration_tools.custom_exceptions import TransformationProcessError
+from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
+from folio_migration_tools.library_configuration import FileDefinition
+from folio_migration_tools.library_configuration import HridHandling
+from folio_migration_tools.marc_rules_transformation.lazy_marc_reader import (
+    LazyMARCReader,
+)
+from folio_migration_tools.marc_rules_transformation.marc_file_processor import (
+    MarcFileProcessor,
+)
+from folio_migration_tools.marc_rules_transformation.marc_file_processor import (
+    TransformedRecord,
+)
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    MARCReaderWrapper,
+)
+from folio_migration_tools.marc_rules_transformation.marc_record_index import (
+    MarcRecordIndex,
+)
+from folio_migration_tools.marc_rules_transformation.marc_record_index import (
+    read_raw_records,
+)
+from folio_migration_tools.migration_report import MigrationReport
+
+
+def get_raw_001(raw_record: bytes) -> bytes:
+    """Finds the 001 in an undecoded record, by reading the directory
+
+    Args:
+        raw_record (bytes): The record in ISO2709
+
+    Returns:
+        bytes: The undecoded 001, or nothing if the record has none
+    """
+    try:
+        base_address = int(raw_record[12:17])
+        for position in range(24, base_address - 1, 12):
+            if raw_record[position : position + 3] == b"001":
+                length = int(raw_record[position + 3 : position + 7])
+                start = base_address + int(raw_record[position + 7 : position + 12])
+                return raw_record[start : start + length - 1]
+    except ValueError:
+        pass
+    return b""
+
+
+class MarcWorkerPool:
+    """Transforms the records of a MARC file in worker processes
+
+    The main process splits the file into records and hands them out to the workers in
+    chunks. The workers decode and map the records, and build the SRS records. The main
+    process then saves the results in file order, doing everything that depends on the
+    records before: legacy id deduplication, the legacy id map, HRID numbering, and the
+    failed records file. Migration report and mapping statistics from the workers are
+    added to the main process' numbers chunk by chunk. The output is the same as when
+    transforming in a single process.
+
+    With a record index, the workers are handed byte ranges of the file and read the
+    records themselves, and only records that fail to decode are read by the main process.
+    When HRIDs are taken from the 001s, the main process reads the records and sends them
+    to workers by their 001, so that the worker that sees a duplicate 001 has seen the
+    record it duplicates.
+
+    The workers are forked from the main process, and inherit the mapper as it is, with all
+    its reference data. Forking is not available on Windows.
+    """
+
+    def __init__(self, processor: MarcFileProcessor, workers: int, chunk_size: int = 200):
+        self.processor = processor
+        self.mapper = processor.mapper
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.hrid_handler = getattr(self.mapper, "hrid_handler", None)
+        self.route_by_001 = (
+            self.hrid_handler is not None
+            and self.hrid_handler.handling == HridHandling.preserve001
+        )
+        self.context = multiprocessing.get_context("fork")
+        self.processes: list = []
+        self.input_queues: list = []
+        self.output_queue = None
+        self.open_chunks: List[Optional[Chunk]] = []
+        self.pending: deque = deque()
+        self.results: Dict[int, ChunkResult] = {}
+        self.next_chunk_id = 0
+        self.chunks_in_flight = 0
+        self.marc_file: Optional[BinaryIO] = None
+        self.index: Optional[MarcRecordIndex] = None
+
+    @staticmethod
+    def is_available() -> bool:
+        return "fork" in multiprocessing.get_all_start_methods()
+
+    def process_file(
+        self,
+        file_def: FileDefinition,
+        marc_file: BinaryIO,
+        failed_records_file,
+        index: Optional[MarcRecordIndex] = None,
+        start_index: int = 0,
+    ):
+        """Transforms the records in the file
+
+        Args:
+            file_def (FileDefinition): The file definition
+            marc_file (BinaryIO): The MARC file, opened in binary mode
+            failed_records_file: File to write records that could not be decoded to
+            index (Optional[MarcRecordIndex]): The record index of the file, if there is one
+            start_index (int): Index of the first record to transform. Needs the index.
+        """
+        self.marc_file = marc_file
+        self.index = index
+        self.start_workers()
+        try:
+            if index is not None:
+                index.seek(marc_file, start_index)
+            idx = start_index - 1
+            if index is not None and not self.route_by_001:
+                for idx in range(start_index, len(index), self.chunk_size):
+                    self.add_byte_range(idx, min(idx + self.chunk_size, len(index)), file_def)
+                    self.save_records_in_flight(file_def, failed_records_file)
+                idx = len(index) - 1
+            else:
+                for idx, raw_record in enumerate(read_raw_records(marc_file), start_index):
+                    self.add_record(idx, raw_record, file_def)
+                    self.save_records_in_flight(file_def, failed_records_file)
+            while self.pending:
+                self.save_oldest_record(file_def, failed_records_file)
+            logging.info("Done reading %s records from file", idx + 1)
+        finally:
+            self.stop_workers()
+            self.marc_file = None
+            self.index = None
+
+    def save_records_in_flight(self, file_def: FileDefinition, failed_records_file):
+        while self.chunks_in_flight > 2 * self.workers:
+            self.save_oldest_record(file_def, failed_records_file)
+
+    def start_workers(self):
+        self.processor.created_objects_file.flush()
+        if self.mapper.task_configuration.create_source_records:
+            self.processor.srs_records_file.flush()
+        self.output_queue = self.context.Queue()
+        self.input_queues = [self.context.Queue(maxsize=2) for _ in range(self.workers)]
+        self.open_chunks = [None] * self.workers
+        self.processes = [
+            self.context.Process(
+                target=run_worker,
+                args=(self.processor, input_queue, self.output_queue),
+                daemon=True,
+            )
+            for input_queue in self.input_queues
+        ]
+        for process in self.processes:
+            process.start()
+        logging.info("Started %s worker processes", self.workers)
+
+    def stop_workers(self):
+        for input_queue, process in zip(self.input_queues, self.processes):
+            if process.is_alive():
+                try:
+                    input_queue.put(None, timeout=1)
+                except queue.Full:
+                    process.terminate()
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        self.pending.clear()
+        self.results.clear()
+        self.chunks_in_flight = 0
+
+    def add_record(self, idx: int, raw_record: bytes, file_def: FileDefinition):
+        worker = self.get_worker(idx, raw_record)
+        if not self.open_chunks[worker]:
+            self.open_chunks[worker] = Chunk(worker)
+        chunk = self.open_chunks[worker]
+        chunk.records.append((idx, raw_record))
+        self.pending.append((idx, raw_record, chunk))
+        if len(chunk.records) >= self.chunk_size:
+            self.send_chunk(chunk, file_def)
+
+    def add_byte_range(self, start: int, stop: int, file_def: FileDefinition):
+        """Hands records start up to stop to a worker, that reads them from the file"""
+        chunk = Chunk((start // self.chunk_size) % self.workers)
+        offset, length = self.index.get_byte_range(start, stop)
+        chunk.byte_range = (self.marc_file.fileno(), start, offset, length)
+        self.pending.extend((idx, None, chunk) for idx in range(start, stop))
+        self.send_chunk(chunk, file_def)
+
+    def get_worker(self, idx: int, raw_record: bytes) -> int:
+        if self.route_by_001:
+            return zlib.crc32(get_raw_001(raw_record)) % self.workers
+        return (idx // self.chunk_size) % self.workers
+
+    def send_chunk(self, chunk: "Chunk", file_def: FileDefinition):
+        chunk.chunk_id = self.next_chunk_id
+        self.next_chunk_id += 1
+        self.open_chunks[chunk.worker] = None
+        self.chunks_in_flight += 1
+        while True:
+            try:
+                self.input_queues[chunk.worker].put(
+                    (chunk.chunk_id, file_def, chunk.records, chunk.byte_range), timeout=1
+                )
+                return
+            except queue.Full:
+                self.check_workers()
+                self.receive_results()
+
+    def save_oldest_record(self, file_def: FileDefinition, failed_records_file):
+        idx, raw_record, chunk = self.pending.popleft()
+        if chunk.chunk_id is None:
+            self.send_chunk(chunk, file_def)
+        while chunk.chunk_id not in self.results:
+            self.receive_results(timeout=1)
+        chunk_result = self.results[chunk.chunk_id]
+        transformed = chunk_result.records.popleft()
+        self.save_record(idx, raw_record, transformed, file_def, failed_records_file)
+        if not chunk_result.records:
+            del self.results[chunk.chunk_id]
+            self.chunks_in_flight -= 1
+            self.add_worker_statistics(chunk_result)
+
+    def receive_results(self, timeout: float = 0):
+        try:
+            chunk_id, records, statistics = (
+                self.output_queue.get(timeout=timeout)
+                if timeout
+                else self.output_queue.get_nowait()
+            )
+        except queue.Empty:
+            self.check_workers()
+            return
+        if records is None:
+            raise TransformationProcessError("", "A MARC transformation worker failed", statistics)
+        self.results[chunk_id] = ChunkResult(records, *statistics)
+
+    def check_workers(self):
+        if not all(process.is_alive() for process in self.processes):
+            raise TransformationProcessError(
+                "", "A MARC transformation worker process stopped unexpectedly. Halting."
+            )
+
+    def save_record(
+        self,
+        idx: int,
+        raw_record: bytes,
+        transformed: TransformedRecord,
+        file_def: FileDefinition,
+        failed_records_file,
+    ):
+        self.assign_hrids(transformed)
+        if transformed.extradata:
+            self.mapper.extradata_writer.cache.extend(transformed.extradata)
+            self.mapper.extradata_writer.write("", {})
+        migration_report = self.mapper.migration_report
+        try:
+            if transformed.status == TransformedRecord.PARSING_FAILED:
+                migration_report.add_general_statistics(
+                    i18n_cache.t("Records with encoding errors - parsing failed"),
+                )
+                if raw_record is None:
+                    raw_record = self.index.read_record(self.marc_file, idx)
+                failed_records_file.write(raw_record)
+                raise TransformationRecordFailedError(
+                    f"Index in {file_def.file_name}:{idx}",
+                    f"MARC parsing error: {transformed.error[0]}",
+                    "Failed records stored in results/failed_bib_records.mrc",
+                )
+            elif transformed.status == TransformedRecord.VALUE_ERROR:
+                logging.error(transformed.error[0])
+            elif transformed.status == TransformedRecord.PROCESS_FAILED:
+                raise TransformationProcessError(*transformed.error)
+            else:
+                self.processor.save_transformed_record(transformed, file_def)
+        except TransformationRecordFailedError as error:
+            error.log_it()
+            migration_report.add_general_statistics(
+                i18n_cache.t("Records that failed transformation. Check log for details"),
+            )
+
+    def assign_hrids(self, transformed: TransformedRecord):
+        """Replaces the HRID placeholders handed out by the worker with the next HRIDs
+
+        The counters are also moved on by any increments the worker made without handing
+        out an HRID, so that they end up where a single process would have left them.
+        """
+        if not self.hrid_handler:
+            return
+        instance_increments, holdings_increments = transformed.hrid_counter_increments
+        for namespace, placeholder in transformed.deferred_hrids:
+            before = self.hrid_handler.get_hrid_counters()
+            transformed.replace_hrid(placeholder, self.hrid_handler.get_next_hrid(namespace))
+            after = self.hrid_handler.get_hrid_counters()
+            instance_increments -= after[0] - before[0]
+            holdings_increments -= after[1] - before[1]
+        self.hrid_handler.instance_hrid_counter += instance_increments
+        self.hrid_handler.holdings_hrid_counter += holdings_increments
+
+    def add_worker_statistics(self, chunk_result: "ChunkResult"):
+        self.mapper.migration_report.merge(chunk_result.migration_report)
+        merge_mapped_fields(self.mapper.mapped_folio_fields, chunk_result.mapped_folio_fields)
+        merge_mapped_fields(self.mapper.mapped_legacy_fields, chunk_result.mapped_legacy_fields)
+        self.mapper.parsed_records += chunk_result.parsed_records
+
+
+class Chunk:
+    __slots__ = ("worker", "records", "byte_range", "chunk_id")
+
+    def __init__(self, worker: int):
+        self.worker = worker
+        self.records: list = []
+        self.byte_range: Optional[tuple] = None
+        self.chunk_id: Optional[int] = None
+
+
+class ChunkResult:
+    __slots__ = (
+        "records",
+        "migration_report",
+        "mapped_folio_fields",
+        "mapped_legacy_fields",
+        "parsed_records",
+    )
+
+    def __init__(
+        self,
+        records: List[TransformedRecord],
+        migration_report: MigrationReport,
+        mapped_folio_fields: dict,
+        mapped_legacy_fields: dict,
+        parsed_records: int,
+    ):
+        self.records = deque(records)
+        self.migration_report = migration_report
+        self.mapped_folio_fields = mapped_folio_fields
+        self.mapped_legacy_fields = mapped_legacy_fields
+        self.parsed_records = parsed_records
+
+
+def run_worker(processor: MarcFileProcessor, input_queue, output_queue):
+    """Transforms chunks of records until it is handed None
+
+    Runs in a forked process. Everything the main process has not saved yet is dropped,
+    and the statistics are collected from scratch for every chunk, so that the main process
+    can add them to its own.
+    """
+    mapper = processor.mapper
+    mapper.extradata_writer.cache = []
+    if hrid_handler := getattr(mapper, "hrid_handler", None):
+        hrid_handler.defer_hrids()
+    while task := input_queue.get():
+        chunk_id, file_def, records, byte_range = task
+        if byte_range:
+            records = read_byte_range(*byte_range)
+        mapper.migration_report.report = {}
+        mapper.migration_report.set_measures = set()
+        mapper.mapped_folio_fields = {}
+        mapper.mapped_legacy_fields = {}
+        parsed_records = mapper.parsed_records
+        try:
+            transformed_records = [
+                transform_raw_record(processor, idx, raw_record, file_def)
+                for idx, raw_record in records
+            ]
+        except (Exception, SystemExit) as error:
+            logging.exception("Worker process failed")
+            output_queue.put((chunk_id, None, str(error)))
+            return
+        output_queue.put(
+            (
+                chunk_id,
+                transformed_records,
+                (
+                    # The queue pickles it later on, when the next chunk may have started
+                    copy.copy(mapper.migration_report),
+                    mapper.mapped_folio_fields,
+                    mapper.mapped_legacy_fields,
+                    mapper.parsed_records - parsed_records,
+                ),
+            )
+        )
+
+
+def read_byte_range(fd: int, start: int, offset: int, length: int):
+    """Reads the records in a byte range of the MARC file, numbered from start
+
+    Uses pread, which leaves the position of the file, shared with the main process, alone.
+    """
+    return enumerate(read_raw_records(io.BytesIO(os.pread(fd, length, offset))), start)
+
+
+def transform_raw_record(
+    processor: MarcFileProcessor, idx: int, raw_record: bytes, file_def: FileDefinition
+) -> TransformedRecord:
+    """Decodes and transforms a record, like MARCReaderWrapper.read_records does"""
+    mapper = processor.mapper
+    hrid_handler = getattr(mapper, "hrid_handler", None)
+    if hrid_handler:
+        hrid_handler.deferred_hrids = []
+        hrid_counters = hrid_handler.get_hrid_counters()
+    mapper.migration_report.add_general_statistics(i18n_cache.t("Records in file before parsing"))
+    reader = LazyMARCReader(raw_record, to_unicode=True, permissive=True)
+    reader.hide_utf8_warnings = True
+    reader.force_utf8 = False
+    record = next(reader, None)
+    if record is None:
+        return TransformedRecord(
+            TransformedRecord.PARSING_FAILED, (str(reader.current_exception),)
+        )
+    try:
+        MARCReaderWrapper.set_leader(record, mapper.migration_report)
+        mapper.migration_report.add_general_statistics(
+            i18n_cache.t("Records successfully decoded from MARC21"),
+        )
+        transformed = processor.transform_record(idx, record, file_def)
+    except ValueError as error:
+        transformed = TransformedRecord(TransformedRecord.VALUE_ERROR, (str(error),))
+    if hrid_handler:
+        transformed.deferred_hrids = hrid_handler.deferred_hrids
+        transformed.hrid_counter_increments = tuple(
+            after - before
+            for after, before in zip(hrid_handler.get_hrid_counters(), hrid_counters)
+        )
+    transformed.extradata = mapper.extradata_writer.cache
+    mapper.extradata_writer.cache = []
+    return transformed
+
+
+def merge_mapped_fields(mapped_fields: dict, other: dict):
+    for field_name, counts in other.items():
+        if field_name in mapped_fields:
+            mapped_fields[field_name] = [
+                count + other_count
+                for count, other_count in zip(mapped_fields[field_name], counts)
+            ]
+        else:
+            mapped_fields[field_name] = list(counts)
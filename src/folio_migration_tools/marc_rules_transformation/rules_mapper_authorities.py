@@ -6,13 +6,13 @@ import time
 import uuid
 from typing import List
 
-import i18n
 import pymarc
 from folio_uuid.folio_namespaces import FOLIONamespaces
 from folio_uuid.folio_uuid import FolioUUID
 from folioclient import FolioClient
 from pymarc import Record
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.helper import Helper
 from folio_migration_tools.library_configuration import FileDefinition
@@ -67,6 +67,7 @@ class AuthorityMapper(RulesMapperBase):
         logging.info("Fetching mapping rules from the tenant")
         rules_endpoint = "/mapping-rules/marc-authority"
         self.mappings = self.folio_client.folio_get_single_object(rules_endpoint)
+        self.compile_mapping_rules()
         self.source_file_mapping: dict = {}
         self.setup_source_file_mapping()
         self.start = time.time()
@@ -158,7 +159,7 @@ class AuthorityMapper(RulesMapperBase):
                     natural_id = "".join(a_subfield.split())
                     source_file_id = source_file["id"]
                     self.migration_report.add_general_statistics(
-                        i18n.t("naturalId mapped from %{fro}", fro="010$a")
+                        i18n_cache.t("naturalId mapped from %{fro}", fro="010$a")
                     )
                     self.migration_report.add(
                         "AuthoritySourceFileMapping",
@@ -169,7 +170,7 @@ class AuthorityMapper(RulesMapperBase):
         if not source_file_id:
             natural_id = "".join(marc_record["001"].data.split())
             self.migration_report.add_general_statistics(
-                i18n.t("naturalId mapped from %{fro}", fro="001")
+                i18n_cache.t("naturalId mapped from %{fro}", fro="001")
             )
             natural_id_prefix = match_prefix_patt.match(natural_id)
             if natural_id_prefix:
@@ -196,7 +197,7 @@ class AuthorityMapper(RulesMapperBase):
     def handle_leader_17(self, marc_record, legacy_ids):
         leader_17 = marc_record.leader[17] or "Empty"
         self.migration_report.add(
-            "AuthorityEncodingLevel", i18n.t("Original value") + f": {leader_17}"
+            "AuthorityEncodingLevel", i18n_cache.t("Original value") + f": {leader_17}"
         )
         if leader_17 not in ["n", "o"]:
             Helper.log_data_issue(
@@ -206,7 +207,7 @@ class AuthorityMapper(RulesMapperBase):
             )
             marc_record.leader = f"{marc_record.leader[:17]}n{marc_record.leader[18:]}"
             self.migration_report.add(
-                "AuthorityEncodingLevel", i18n.t("Changed %{a} to %{b}", a=leader_17, b="n")
+                "AuthorityEncodingLevel", i18n_cache.t("Changed %{a} to %{b}", a=leader_17, b="n")
             )
 
     def perform_additional_parsing(
@@ -236,3 +237,4 @@ class AuthorityMapper(RulesMapperBase):
 
     def wrap_up(self):
         logging.info("Mapper wrapping up")
+        self.conditions.log_memoization_statistics()
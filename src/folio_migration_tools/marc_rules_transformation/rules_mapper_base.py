@@ -6,15 +6,15 @@ import urllib.parse
 import uuid
 from abc import abstractmethod
 from textwrap import wrap
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
-import i18n
 import pymarc
 from dateutil.parser import parse
 from folio_uuid.folio_uuid import FOLIONamespaces, FolioUUID
 from folioclient import FolioClient
 from pymarc import Field, Leader, Record, Subfield
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import (
     TransformationFieldMappingError,
     TransformationProcessError,
@@ -26,6 +26,12 @@ from folio_migration_tools.library_configuration import (
     LibraryConfiguration,
 )
 from folio_migration_tools.mapper_base import MapperBase
+from folio_migration_tools.marc_rules_transformation.compiled_rules import (
+    CompiledRule,
+    CompiledTagRules,
+    TargetStep,
+    resolve_target,
+)
 from folio_migration_tools.marc_rules_transformation.hrid_handler import HRIDHandler
 
 
@@ -50,6 +56,9 @@ class RulesMapperBase(MapperBase):
         self.conditions = conditions
         self.item_json_schema = ""
         self.mappings: dict = {}
+        self.compiled_rules: dict[str, CompiledTagRules] = {}
+        self.resolved_targets: dict[str, Tuple[TargetStep, ...]] = {}
+        self.resolved_targets_schema = None
         self.schema_properties = None
         if hasattr(self.task_configuration, "hrid_handling"):
             self.hrid_handler = HRIDHandler(
@@ -91,52 +100,79 @@ class RulesMapperBase(MapperBase):
                         res.append(v)
                 rec[key] = list(res)
 
+    def compile_mapping_rules(self):
+        """Compiles the mapping rules fetched from the tenant, so that mapping the records
+        does not have to interpret the rules JSON for every field"""
+        self.compiled_rules = {
+            tag: CompiledTagRules(mappings, self.conditions)
+            for tag, mappings in self.mappings.items()
+        }
+        logging.info("Compiled mapping rules for %s MARC tags", len(self.compiled_rules))
+
+    def get_tag_rules(self, tag: str) -> Optional[CompiledTagRules]:
+        """Returns the compiled mapping rules for the tag, compiling them again if the rules
+        or the conditions have been replaced since they were compiled
+
+        Args:
+            tag (str): The MARC tag
+
+        Returns:
+            Optional[CompiledTagRules]: The compiled rules, or None if the tag has no rules
+        """
+        mappings = self.mappings.get(tag)
+        if mappings is None:
+            return None
+        tag_rules = self.compiled_rules.get(tag)
+        if (
+            tag_rules is None
+            or tag_rules.mappings is not mappings
+            or tag_rules.conditions is not self.conditions
+        ):
+            tag_rules = self.compiled_rules[tag] = CompiledTagRules(mappings, self.conditions)
+        return tag_rules
+
+    def compile_rule(self, mapping) -> CompiledRule:
+        if isinstance(mapping, CompiledRule):
+            return mapping
+        return CompiledRule(mapping, self.conditions)
+
     def map_field_according_to_mapping(
-        self, marc_field: pymarc.Field, mappings, folio_record, legacy_ids
+        self, marc_field: pymarc.Field, rules, folio_record, legacy_ids
     ):
-        for mapping in mappings:
+        for rule in rules:
             try:
-                if "entity" not in mapping:
-                    self.handle_normal_mapping(mapping, marc_field, folio_record, legacy_ids)
+                if rule.entity is None:
+                    self.handle_normal_mapping(rule, marc_field, folio_record, legacy_ids)
                 else:
                     self.handle_entity_mapping(
                         marc_field,
-                        mapping,
+                        rule,
                         folio_record,
                         legacy_ids,
                     )
             except TransformationFieldMappingError as tre:
                 tre.log_it()
 
-    def handle_normal_mapping(self, mapping, marc_field: pymarc.Field, folio_record, legacy_ids):
-        target = mapping["target"]
-        if mapping.get("ignoreSubsequentSubfields", False):
+    def handle_normal_mapping(self, rule, marc_field: pymarc.Field, folio_record, legacy_ids):
+        rule = self.compile_rule(rule)
+        if rule.ignore_subsequent_subfields:
             marc_field = self.remove_repeated_subfields(marc_field)
-        if has_conditions(mapping):
-            values = self.apply_rules(marc_field, mapping, legacy_ids)
+        if rule.has_conditions:
+            values = self.apply_rules(marc_field, rule, legacy_ids)
             if marc_field.tag == "655":
                 values[0] = f"Genre: {values[0]}"
-            self.add_value_to_target(folio_record, target, values)
-        elif has_value_to_add(mapping):
-            value = mapping["rules"][0]["value"]
-            # Stupid construct to avoid bool("false") == True
-            if value == "true":
-                self.add_value_to_target(folio_record, target, [True])
-            elif value == "false":
-                self.add_value_to_target(folio_record, target, [False])
-            else:
-                self.add_value_to_target(folio_record, target, [value])
+            self.add_value_to_target(folio_record, rule.target, values)
+        elif rule.has_value_to_add:
+            self.add_value_to_target(folio_record, rule.target, [rule.value])
         else:
             # Adding stuff without rules/Conditions.
             # Might need more complex mapping for arrays etc
-            if any(mapping["subfield"]):
-                values = self.handle_sub_field_delimiters(
-                    ",".join(legacy_ids), mapping, marc_field
-                )
+            if rule.any_subfields:
+                values = self.handle_sub_field_delimiters(",".join(legacy_ids), rule, marc_field)
                 value = " ".join(values)
             else:
                 value = marc_field.format_field() if marc_field else ""
-            self.add_value_to_target(folio_record, target, [value])
+            self.add_value_to_target(folio_record, rule.target, [value])
 
     @staticmethod
     def set_005_as_updated_date(marc_record: Record, folio_object: dict, legacy_ids):
@@ -176,85 +212,50 @@ class RulesMapperBase(MapperBase):
     def handle_sub_field_delimiters(
         self,
         legacy_id: str,
-        mapping,
+        rule: CompiledRule,
         marc_field: pymarc.Field,
-        condition_types: List[str] = None,
-        parameter: dict = None,
+        apply_conditions: bool = False,
     ):
         values: List[str] = []
-        if mapping.get("subfield") and (custom_delimiters := mapping.get("subFieldDelimiter")):
-            delimiter_map = {sub_f: " " for sub_f in mapping.get("subfield")}
-            for custom_delimiter in custom_delimiters:
-                delimiter_map.update(
-                    {sub_f: custom_delimiter["value"] for sub_f in custom_delimiter["subfields"]}
-                )
-            custom_delimited_strings: List[Tuple[str, List[str]]] = []
-            subfields = mapping.get("subfield")
-            for custom_delimiter in custom_delimiters:
-                subfields_for_delimiter = [
-                    sub_f
-                    for sub_f in subfields
-                    if custom_delimiter["subfields"]
-                    and delimiter_map[sub_f] == custom_delimiter["value"]
-                ]
-                subfield_collection: Tuple[str, List[str]] = (custom_delimiter["value"], [])
-                subfield_collection[1].extend(marc_field.get_subfields(*subfields_for_delimiter))
-                custom_delimited_strings.append(subfield_collection)
-            for custom_delimited_string in custom_delimited_strings:
-                if mapping.get("applyRulesOnConcatenatedData", ""):
-                    values.extend(custom_delimited_string[1])
-                else:
+        if rule.delimited_subfields:
+            for delimiter, subfields in rule.delimited_subfields:
+                subfield_values = marc_field.get_subfields(*subfields)
+                if rule.apply_rules_on_concatenated_data:
+                    values.extend(subfield_values)
+                elif apply_conditions:
                     values.extend(
                         dict.fromkeys(
                             [
-                                self.apply_rule(
-                                    legacy_id,
-                                    x,
-                                    condition_types or [],
-                                    marc_field,
-                                    parameter or {},
-                                )
-                                for x in custom_delimited_string[1]
+                                self.apply_rule(legacy_id, x, rule, marc_field)
+                                for x in subfield_values
                             ]
                         )
                     )
-                values = [custom_delimited_string[0].join(values)]
-        elif mapping.get("subfield", []):
-            values.extend(marc_field.get_subfields(*mapping["subfield"]))
+                else:
+                    values.extend(dict.fromkeys(subfield_values))
+                values = [delimiter.join(values)]
+        elif rule.subfields:
+            values.extend(marc_field.get_subfields(*rule.subfields))
         return values
 
     def get_value_from_condition(
         self,
         legacy_id,
-        mapping,
+        rule: CompiledRule,
         marc_field,
     ):
-        stripped_conds = mapping["rules"][0]["conditions"][0]["type"].split(",")
-        condition_types = list(map(str.strip, stripped_conds))
-        parameter = mapping["rules"][0]["conditions"][0].get("parameter", {})
         values: List[str] = []
-        if mapping.get("subfield"):
-            values.extend(
-                self.handle_sub_field_delimiters(
-                    legacy_id, mapping, marc_field, condition_types, parameter
-                )
-            )
+        if rule.subfields:
+            values.extend(self.handle_sub_field_delimiters(legacy_id, rule, marc_field, True))
         else:
             values.append(marc_field.format_field() if marc_field else "")
 
-        if not mapping.get("applyRulesOnConcatenatedData", "") and mapping.get("subfield", []):
+        if not rule.apply_rules_on_concatenated_data and rule.subfields:
             return " ".join(
-                dict.fromkeys(
-                    [
-                        self.apply_rule(legacy_id, x, condition_types, marc_field, parameter)
-                        for x in values
-                    ]
-                )
+                dict.fromkeys([self.apply_rule(legacy_id, x, rule, marc_field) for x in values])
             )
         else:
-            return self.apply_rule(
-                legacy_id, " ".join(values), condition_types, marc_field, parameter
-            )
+            return self.apply_rule(legacy_id, " ".join(values), rule, marc_field)
 
     def process_marc_field(
         self,
@@ -264,70 +265,66 @@ class RulesMapperBase(MapperBase):
         legacy_ids,
     ):
         if marc_field.tag == "880":
-            mappings = self.perform_proxy_mapping(marc_field)
+            tag_rules = self.perform_proxy_mapping(marc_field)
         else:
             tags_to_ignore = {"880", "001", "008"}
-            mappings = (
-                self.mappings.get(marc_field.tag, {})
+            tag_rules = (
+                self.get_tag_rules(marc_field.tag)
                 if marc_field.tag not in tags_to_ignore
-                else []
+                else None
             )
-        if mappings:
+        if tag_rules:
             try:
-                self.map_field_according_to_mapping(marc_field, mappings, folio_record, legacy_ids)
-                if any(m.get("ignoreSubsequentFields", False) for m in mappings):
+                self.map_field_according_to_mapping(
+                    marc_field, tag_rules, folio_record, legacy_ids
+                )
+                if tag_rules.ignore_subsequent_fields:
                     ignored_subsequent_fields.add(marc_field.tag)
             except Exception as ee:
                 logging.error(
                     "map_field_according_to_mapping %s %s %s",
                     marc_field.tag,
                     marc_field.format_field(),
-                    json.dumps(mappings),
+                    json.dumps(tag_rules.mappings),
                 )
                 raise ee
 
-    def perform_proxy_mapping(self, marc_field):
-        proxy_mapping = next(iter(self.mappings.get("880", [])), [])
+    def perform_proxy_mapping(self, marc_field) -> Optional[CompiledTagRules]:
+        proxy_rules = self.get_tag_rules("880")
+        proxy_rule = proxy_rules.rules[0] if proxy_rules else None
         if "6" not in marc_field:
-            self.migration_report.add("Field880Mappings", i18n.t("Records without $6"))
+            self.migration_report.add("Field880Mappings", i18n_cache.t("Records without $6"))
             return None
-        if not proxy_mapping or not proxy_mapping.get("fieldReplacementBy3Digits", False):
+        if not proxy_rule or not proxy_rule.field_replacement_by_3_digits:
             return None
         if not marc_field["6"][:3] or len(marc_field["6"][:3]) != 3:
             self.migration_report.add(
-                "Field880Mappings", i18n.t("Records with unexpected length in $6")
+                "Field880Mappings", i18n_cache.t("Records with unexpected length in $6")
             )
             return None
         first_three = marc_field["6"][:3]
 
-        target_field = next(
-            (
-                r.get("targetField", "")
-                for r in proxy_mapping.get("fieldReplacementRule", [])
-                if r["sourceDigits"] == first_three
-            ),
-            first_three,
-        )
+        target_field = proxy_rule.field_replacements.get(first_three, first_three)
         self.migration_report.add(
             "Field880Mappings",
-            i18n.t("Source digits")
+            i18n_cache.t("Source digits")
             + f": {marc_field['6']} "
-            + i18n.t("Target field")
+            + i18n_cache.t("Target field")
             + f": {target_field}",
         )
-        mappings = self.mappings.get(target_field, {})
-        if not mappings:
+        tag_rules = self.get_tag_rules(target_field)
+        if not tag_rules:
             self.migration_report.add(
                 "Field880Mappings",
-                i18n.t("Mapping not set up for target field")
+                i18n_cache.t("Mapping not set up for target field")
                 + f": {target_field} ({marc_field['6']})",
             )
-        return mappings
+        return tag_rules
 
     def report_marc_stats(
         self, marc_field: Field, bad_tags, legacy_ids, ignored_subsequent_fields
     ):
-        self.migration_report.add("Trivia", i18n.t("Total number of Tags processed"))
+        self.migration_report.add("Trivia", i18n_cache.t("Total number of Tags processed"))
         self.report_source_and_links(marc_field)
         self.report_bad_tags(marc_field, bad_tags, legacy_ids)
         mapped = marc_field.tag in self.mappings
@@ -341,7 +338,7 @@ class RulesMapperBase(MapperBase):
         for subfield_2 in marc_field.get_subfields("2"):
             self.migration_report.add(
                 "AuthoritySources",
-                i18n.t("Source of heading or term") + f": {subfield_2.split(' ')[0]}",
+                i18n_cache.t("Source of heading or term") + f": {subfield_2.split(' ')[0]}",
             )
         for subfield_0 in marc_field.get_subfields("0"):
             code = ""
@@ -353,46 +350,39 @@ class RulesMapperBase(MapperBase):
                     code = subfield_0[: subfield_0.find(url.path)]
             if code:
                 self.migration_report.add(
-                    "AuthoritySources", i18n.t("$0 base uri or source code") + f": {code}"
+                    "AuthoritySources", i18n_cache.t("$0 base uri or source code") + f": {code}"
                 )
 
-    def apply_rules(self, marc_field: pymarc.Field, mapping, legacy_ids):
+    def apply_rules(self, marc_field: pymarc.Field, rule, legacy_ids):
+        rule = self.compile_rule(rule)
         try:
             values = []
             value = ""
-            if has_conditions(mapping):
-                value = self.get_value_from_condition(",".join(legacy_ids), mapping, marc_field)
-            elif has_value_to_add(mapping):
-                value = mapping["rules"][0]["value"]
-                if value == "false":
-                    return [False]
-                elif value == "true":
-                    return [True]
-                else:
-                    return [value]
-            elif not mapping.get("rules", []) or not mapping["rules"][0].get("conditions", []):
-                values = self.handle_sub_field_delimiters(
-                    ",".join(legacy_ids), mapping, marc_field
-                )
+            if rule.has_conditions:
+                value = self.get_value_from_condition(",".join(legacy_ids), rule, marc_field)
+            elif rule.has_value_to_add:
+                return [rule.value]
+            else:
+                values = self.handle_sub_field_delimiters(",".join(legacy_ids), rule, marc_field)
                 value = " ".join(values)
-            values = wrap(value, 3) if mapping.get("subFieldSplit", "") else [value]
+            values = wrap(value, 3) if rule.subfield_split else [value]
             return values
         except TransformationProcessError as trpe:
             self.handle_transformation_process_error(self.parsed_records, trpe)
         except TransformationFieldMappingError as fme:
             self.migration_report.add("FieldMappingErrors", fme.message)
             fme.data_value = (
-                f"{fme.data_value} MARCField: {marc_field} Mapping: {json.dumps(mapping)}"
+                f"{fme.data_value} MARCField: {marc_field} Mapping: {json.dumps(rule.mapping)}"
             )
             fme.log_it()
             return []
         except TransformationRecordFailedError as trfe:
             trfe.data_value = (
-                f"{trfe.data_value} MARCField: {marc_field} Mapping: {json.dumps(mapping)}"
+                f"{trfe.data_value} MARCField: {marc_field} Mapping: {json.dumps(rule.mapping)}"
             )
             trfe.log_it()
             self.migration_report.add_general_statistics(
-                i18n.t("Records failed due to an error. See data issues log for details")
+                i18n_cache.t("Records failed due to an error. See data issues log for details")
             )
         except Exception as exception:
             self.handle_generic_exception(self.parsed_records, exception)
@@ -408,116 +398,93 @@ class RulesMapperBase(MapperBase):
             Helper.log_data_issue(legacy_ids, message, marc_field.tag)
             bad_tags.add(marc_field.tag)
 
+    def get_target_steps(self, target_string: str) -> Tuple[TargetStep, ...]:
+        """Returns the levels of a mapping target, resolved against the schema on first use"""
+        if self.resolved_targets_schema is not self.schema:
+            self.resolved_targets = {}
+            self.resolved_targets_schema = self.schema
+        if (target_steps := self.resolved_targets.get(target_string)) is None:
+            target_steps = resolve_target(self.schema, target_string)
+            self.resolved_targets[target_string] = target_steps
+        return target_steps
+
     def add_value_to_target(self, rec, target_string, value):
         if not value:
             return
-        targets = target_string.split(".")
-        if len(targets) == 1:
-            self.add_value_to_first_level_target(rec, target_string, value)
-        else:
-            schema_parent = None
-            parent = None
-            schema_properties = self.schema["properties"]
-            sc_prop = schema_properties
-            for target in targets:  # Iterate over names in hierarcy
-                if target in sc_prop:  # property is on this level
-                    sc_prop = sc_prop[target]  # set current property
-                else:  # next level. take the properties from the items
-                    sc_prop = schema_parent["items"]["properties"][target]
-                if target not in rec and not schema_parent:  # have we added this already?
-                    if is_array_of_strings(sc_prop):
-                        rec[target] = []
-                        # break
-                        # prop[target].append({})
-                    elif is_array_of_objects(sc_prop):
-                        rec[target] = [{}]
-                        # break
-                    elif (
-                        schema_parent
-                        and is_array_of_objects(schema_parent)
-                        and sc_prop.get("type", "string") == "string"
-                    ):
-                        s = "This should be unreachable code. Check schema for changes"
-                        logging.error(s)
-                        logging.error(parent)
-                        raise TransformationProcessError("", s)
-                        # break
-                    else:
-                        if schema_parent["type"] == "array":
-                            parent.append({})
-                        else:
-                            raise TransformationProcessError(
-                                "",
-                                f"Edge! Something in the schemas has changed. "
-                                "The mapping of this needs to be investigated "
-                                f"{target_string} {schema_properties[target_string]}",
-                            )
-                elif is_array_of_objects(sc_prop) and len(rec[target][-1]) == len(
-                    sc_prop["items"]["properties"]
-                ):
-                    rec[target].append({})
-                elif schema_parent and target in rec[parent][-1]:
-                    rec[parent].append({})
-                    if len(rec[parent][-1]) > 0:
-                        rec[parent][-1][target] = value[0]
-                    else:
-                        rec[parent][-1] = {target: value[0]}
-                elif (
-                    schema_parent
-                    and is_array_of_objects(schema_parent)
-                    and sc_prop.get("type", "string") == "string"
-                ):
-                    if len(rec[parent][-1]) > 0:
-                        rec[parent][-1][target] = value[0]
-                    else:
-                        rec[parent][-1] = {target: value[0]}
-                # if target == targets[-1]:
-                # prop[target] = value[0]
-                # prop = rec[target]
-                schema_parent = sc_prop
-                parent = target
-
-    def add_value_to_first_level_target(self, rec, target_string, value):
-        sch = self.schema["properties"]
+        target_steps = self.get_target_steps(target_string)
+        if len(target_steps) == 1:
+            self.add_value_to_first_level_target(rec, target_string, value, target_steps[0])
+            return
+        first_step = target_steps[0]
+        parent = first_step.name
+        if parent not in rec:  # have we added this already?
+            if first_step.is_array_of_strings:
+                rec[parent] = []
+            elif first_step.is_array_of_objects:
+                rec[parent] = [{}]
+            else:
+                raise TransformationProcessError(
+                    "",
+                    f"Edge! Something in the schemas has changed. "
+                    "The mapping of this needs to be investigated "
+                    f"{target_string} {self.schema['properties'][parent]}",
+                )
+        elif first_step.is_array_of_objects and (
+            len(rec[parent][-1]) == first_step.item_property_count
+        ):
+            rec[parent].append({})
+        for step in target_steps[1:]:  # Iterate over names in hierarcy
+            target = step.name
+            if step.is_array_of_objects and len(rec[target][-1]) == step.item_property_count:
+                rec[target].append({})
+            elif target in rec[parent][-1]:
+                rec[parent].append({target: value[0]})
+            elif step.is_string_in_array_of_objects:
+                rec[parent][-1][target] = value[0]
+            parent = target
+
+    def add_value_to_first_level_target(
+        self, rec, target_string, value, target_step: Optional[TargetStep] = None
+    ):
+        if target_step is None:
+            target_step = self.get_target_steps(target_string)[0]
         if (
-            self.task_configuration.migration_task_type == "BibsTransformer"
+            target_string == "catalogedDate"
+            and self.task_configuration.migration_task_type == "BibsTransformer"
             and self.task_configuration.parse_cataloged_date
-            and target_string == "catalogedDate"
         ):
             try:
                 value = [str(parse(value[0], fuzzy=True).date())]
             except Exception as ee:
                 Helper.log_data_issue("", f"Could not parse catalogedDate: {ee}", value)
                 self.migration_report.add(
-                    "FieldMappingErrors", i18n.t("Could not parse catalogedDate")
+                    "FieldMappingErrors", i18n_cache.t("Could not parse catalogedDate")
                 )
-        if not target_string or target_string not in sch:
+        if not target_string or not target_step.in_schema:
+            sch = self.schema["properties"]
             raise TransformationFieldMappingError(
                 "",
-                i18n.t("Target string '%{string}' not in Schema!", string=target_string)
-                + i18n.t("Check mapping file against the schema.")
+                i18n_cache.t("Target string '%{string}' not in Schema!", string=target_string)
+                + i18n_cache.t("Check mapping file against the schema.")
                 + " "
-                + i18n.t("Target type")
+                + i18n_cache.t("Target type")
                 + f": {sch.get(target_string,{}).get('type','')} "
-                + i18n.t("Value")
+                + i18n_cache.t("Value")
                 + f": {value}",
                 "",
             )
 
-        target_field = sch.get(target_string, {})
-        if (
-            target_field.get("type", "") == "array"
-            and target_field.get("items", {}).get("type", "") == "string"
-        ):
+        if target_step.is_array_of_strings:
             if target_string not in rec:
                 rec[target_string] = value
             else:
                 rec[target_string].extend(value)
 
-        elif target_field.get("type", "") == "string":
+        elif target_step.is_string:
             if value[0]:
                 rec[target_string] = value[0]
         else:
+            sch = self.schema["properties"]
             raise TransformationProcessError(
                 "",
                 (
@@ -537,7 +504,7 @@ class RulesMapperBase(MapperBase):
                 del self.id_map[former_id]
 
     def create_entity(
-        self, entity_mappings, marc_field: Field, entity_parent_key, index_or_legacy_id
+        self, entity_rules, marc_field: Field, entity_parent_key, index_or_legacy_id
     ):
         entity = {}
         parent_schema_prop = self.schema.get("properties", {}).get(entity_parent_key, {})
@@ -547,26 +514,24 @@ class RulesMapperBase(MapperBase):
             req_entity_props = parent_schema_prop.get("required", [])
         else:
             req_entity_props = []
-        for entity_mapping in entity_mappings:
-            k = entity_mapping["target"].split(".")[-1]
+        for entity_rule in map(self.compile_rule, entity_rules):
+            k = entity_rule.target_key
             if k == "authorityId" and (legacy_subfield_9 := marc_field.get("9")):
                 marc_field.add_subfield("0", legacy_subfield_9)
                 marc_field.delete_subfield("9")
             if my_values := [
-                v
-                for v in self.apply_rules(marc_field, entity_mapping, index_or_legacy_id)
-                if v != ""
+                v for v in self.apply_rules(marc_field, entity_rule, index_or_legacy_id) if v != ""
             ]:
                 if entity_parent_key != k:
                     entity[k] = my_values[0]
                 else:
                     entity = my_values[0]
-            elif "alternativeMapping" in entity_mapping:
-                alt_mapping = entity_mapping["alternativeMapping"]
-                alt_k = alt_mapping["target"].split(".")[-1]
+            elif entity_rule.alternative is not None:
+                alt_rule = entity_rule.alternative
+                alt_k = alt_rule.target_key
                 if alt_values := [
                     v
-                    for v in self.apply_rules(marc_field, alt_mapping, index_or_legacy_id)
+                    for v in self.apply_rules(marc_field, alt_rule, index_or_legacy_id)
                     if v != ""
                 ]:
                     if entity_parent_key != alt_k:
@@ -583,24 +548,24 @@ class RulesMapperBase(MapperBase):
     def handle_entity_mapping(
         self,
         marc_field,
-        mapping,
+        rule,
         folio_record,
         legacy_ids,
     ):
-        entity_mapping = mapping["entity"]
-        e_parent = entity_mapping[0]["target"].split(".")[0]
-        if mapping.get("entityPerRepeatedSubfield", False):
+        rule = self.compile_rule(rule)
+        e_parent = rule.entity_parent
+        if rule.entity_per_repeated_subfield:
             for temp_field in self.grouped(marc_field):
-                entity = self.create_entity(entity_mapping, temp_field, e_parent, legacy_ids)
+                entity = self.create_entity(rule.entity, temp_field, e_parent, legacy_ids)
                 if entity and (
                     (isinstance(entity, dict) and all(entity.values()))
                     or (isinstance(entity, list) and all(entity))
                 ):
                     self.add_entity_to_record(entity, e_parent, folio_record, self.schema)
         else:
-            if mapping.get("ignoreSubsequentSubfields", False):
+            if rule.ignore_subsequent_subfields:
                 marc_field = self.remove_repeated_subfields(marc_field)
-            entity = self.create_entity(entity_mapping, marc_field, e_parent, legacy_ids)
+            entity = self.create_entity(rule.entity, marc_field, e_parent, legacy_ids)
             if e_parent in ["precedingTitles", "succeedingTitles"]:
                 self.create_preceding_succeeding_titles(
                     entity, e_parent, folio_record["id"], marc_field
@@ -635,19 +600,22 @@ class RulesMapperBase(MapperBase):
         folio_record["discoverySuppress"] = file_def.discovery_suppressed
         self.migration_report.add(
             "Suppression",
-            i18n.t("Suppressed from discovery") + f' = {folio_record["discoverySuppress"]}',
+            i18n_cache.t("Suppressed from discovery") + f' = {folio_record["discoverySuppress"]}',
         )
         if not only_discovery_suppress:
             folio_record["staffSuppress"] = file_def.staff_suppressed
             self.migration_report.add(
-                "Suppression", i18n.t("Staff suppressed") + f' = {folio_record["staffSuppress"]} '
+                "Suppression",
+                i18n_cache.t("Staff suppressed") + f' = {folio_record["staffSuppress"]} ',
             )
 
     def create_preceding_succeeding_titles(
         self, entity, e_parent: str, identifier: str, marc_field: pymarc.Field
     ):
         if title := entity.get("title"):
-            self.migration_report.add("PrecedingSuccedingTitles", f"{e_parent} " + i18n.t("created"))
+            self.migration_report.add(
+                "PrecedingSuccedingTitles", f"{e_parent} " + i18n_cache.t("created")
+            )
             # TODO: Make these uuids deterministic
             new_entity = {
                 "id": str(uuid.uuid4()),
@@ -680,13 +648,13 @@ class RulesMapperBase(MapperBase):
                 marc_field
             )
 
-    def apply_rule(self, legacy_id, value, condition_types, marc_field, parameter):
+    def apply_rule(self, legacy_id, value, rule: CompiledRule, marc_field):
         v = value
-        for condition_type in iter(condition_types):
+        for condition_type, condition in rule.conditions:
             try:
-                v = self.conditions.get_condition(
-                    condition_type, legacy_id, v, parameter, marc_field
-                )
+                if condition is None:
+                    condition = getattr(self.conditions, f"condition_{condition_type}")
+                v = condition(legacy_id, v, rule.parameter, marc_field)
             except AttributeError as attr_error:
                 raise TransformationProcessError(
                     legacy_id, attr_error, condition_type
@@ -798,7 +766,7 @@ class RulesMapperBase(MapperBase):
         )
         # Since they all should be UTF encoded, make the leader align.
         try:
-            temp_leader = Leader(marc_record.leader)
+            temp_leader = Leader(str(marc_record.leader))
             temp_leader[9] = "a"
             marc_record.leader = temp_leader
         except Exception as ee:
@@ -895,40 +863,30 @@ class RulesMapperBase(MapperBase):
             FOLIONamespaces.edifact: {},
         }
 
-        my_tuple_json = marc_record.as_json()
-        raw_record = {"id": srs_id, "content": my_tuple_json}
-        parsed_record = {"id": srs_id, "content": json.loads(my_tuple_json)}
-        record = {
-            "id": srs_id,
-            "deleted": False,
-            "matchedId": srs_id,
-            "generation": 0,
-            "recordType": record_types.get(record_type),
-            "rawRecord": raw_record,
-            "parsedRecord": parsed_record,
-            "additionalInfo": {"suppressDiscovery": discovery_suppress},
-            "externalIdsHolder": id_holders.get(record_type),
-            "state": "ACTUAL",
-            "leaderRecordStatus": parsed_record["content"]["leader"][5]
-            if parsed_record["content"]["leader"][5] in [*"acdnposx"]
-            else "d",
-        }
-        return json.dumps(record)
-
-
-def has_conditions(mapping):
-    return mapping.get("rules", []) and mapping["rules"][0].get("conditions", [])
-
-
-def has_value_to_add(mapping):
-    return mapping.get("rules", []) and mapping["rules"][0].get("value", "")
-
-
-def is_array_of_strings(schema_property):
-    sc_prop_type = schema_property.get("type", "string")
-    return sc_prop_type == "array" and schema_property["items"]["type"] == "string"
-
-
-def is_array_of_objects(schema_property):
-    sc_prop_type = schema_property.get("type", "string")
-    return sc_prop_type == "array" and schema_property["items"]["type"] == "object"
+        # The MARC record is serialized once. The same JSON is the parsed record, and, as
+        # an escaped string, the raw record content.
+        marc_json = json.dumps(marc_record.as_dict())
+        raw_content = json.dumps(marc_json)
+        leader = str(marc_record.leader)
+        srs_id_json = json.dumps(srs_id)
+        head = json.dumps(
+            {
+                "id": srs_id,
+                "deleted": False,
+                "matchedId": srs_id,
+                "generation": 0,
+                "recordType": record_types.get(record_type),
+            }
+        )
+        tail = json.dumps(
+            {
+                "additionalInfo": {"suppressDiscovery": discovery_suppress},
+                "externalIdsHolder": id_holders.get(record_type),
+                "state": "ACTUAL",
+                "leaderRecordStatus": leader[5] if leader[5] in [*"acdnposx"] else "d",
+            }
+        )
+        return (
+            f'{head[:-1]}, "rawRecord": {{"id": {srs_id_json}, "content": {raw_content}}}'
+            f', "parsedRecord": {{"id": {srs_id_json}, "content": {marc_json}}}, {tail[1:]}'
+        )
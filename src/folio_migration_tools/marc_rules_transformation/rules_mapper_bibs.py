@@ -10,7 +10,6 @@ from pathlib import Path
 from typing import Generator
 from typing import List
 
-import i18n
 import pymarc
 from defusedxml.ElementTree import fromstring
 from folio_uuid.folio_namespaces import FOLIONamespaces
@@ -18,6 +17,7 @@ from folio_uuid.folio_uuid import FolioUUID
 from folioclient import FolioClient
 from pymarc.record import Record
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.helper import Helper
@@ -50,6 +50,7 @@ class BibsRulesMapper(RulesMapperBase):
         logging.info("Fetching mapping rules from the tenant")
         rules_endpoint = "/mapping-rules/marc-bib"
         self.mappings = self.folio_client.folio_get_single_object(rules_endpoint)
+        self.compile_mapping_rules()
         logging.info("Fetching valid language codes...")
         self.language_codes = list(self.fetch_language_codes())
         self.instance_relationships: dict = {}
@@ -82,11 +83,13 @@ class BibsRulesMapper(RulesMapperBase):
 
     def handle_leader_05(self, marc_record, legacy_ids):
         leader_05 = marc_record.leader[5] or "Empty"
-        self.migration_report.add("RecordStatus", i18n.t("Original value") + f": {leader_05}")
+        self.migration_report.add(
+            "RecordStatus", i18n_cache.t("Original value") + f": {leader_05}"
+        )
         if leader_05 not in ["a", "c", "d", "n", "p"]:
             marc_record.leader = f"{marc_record.leader[:5]}c{marc_record.leader[6:]}"
             self.migration_report.add(
-                "RecordStatus", i18n.t("Changed %{a} to %{b}", a=leader_05, b="c")
+                "RecordStatus", i18n_cache.t("Changed %{a} to %{b}", a=leader_05, b="c")
             )
         if leader_05 == "d":
             Helper.log_data_issue(legacy_ids, "d in leader. Is this correct?", marc_record.leader)
@@ -195,14 +198,14 @@ class BibsRulesMapper(RulesMapperBase):
             if f852s and not f86xs:
                 self.migration_report.add(
                     "HoldingsGenerationFromBibs",
-                    i18n.t(
+                    i18n_cache.t(
                         "Records with %{has_many}s but no %{has_no}", has_many="852", has_no="86X"
                     ),
                 )
             elif any(f852s):
                 self.migration_report.add(
                     "HoldingsGenerationFromBibs",
-                    i18n.t(
+                    i18n_cache.t(
                         "Records with both %{has_many}s and at least one %{has_one}",
                         has_one="86X",
                         has_many="852",
@@ -212,11 +215,14 @@ class BibsRulesMapper(RulesMapperBase):
             elif any(f86xs):
                 self.migration_report.add(
                     "HoldingsGenerationFromBibs",
-                    i18n.t("Records without %{has_no}s but with %{has}", has="86X", has_no="852"),
+                    i18n_cache.t(
+                        "Records without %{has_no}s but with %{has}", has="86X", has_no="852"
+                    ),
                 )
 
     def wrap_up(self):
         logging.info("Mapper wrapping up")
+        self.conditions.log_memoization_statistics()
         if self.task_configuration.update_hrid_settings:
             self.hrid_handler.store_hrid_settings()
 
@@ -237,14 +243,14 @@ class BibsRulesMapper(RulesMapperBase):
                 self.migration_report.add(
                     "RecourceTypeMapping",
                     "336$a - "
-                    + i18n.t("Successful matching on %{criteria}", criteria=match_template)
+                    + i18n_cache.t("Successful matching on %{criteria}", criteria=match_template)
                     + f" ({f336a})",
                 )
             else:
                 self.migration_report.add(
                     "RecourceTypeMapping",
                     "336$a - "
-                    + i18n.t("Unsuccessful matching on %{criteria}", criteria=match_template)
+                    + i18n_cache.t("Unsuccessful matching on %{criteria}", criteria=match_template)
                     + f" ({f336a})",
                 )
                 Helper.log_data_issue(
@@ -258,7 +264,7 @@ class BibsRulesMapper(RulesMapperBase):
             raise TransformationProcessError("", "No instance_types setup in tenant")
 
         if "336" in marc_record and "b" not in marc_record["336"]:
-            self.migration_report.add("RecourceTypeMapping", i18n.t("Subfield b not in 336"))
+            self.migration_report.add("RecourceTypeMapping", i18n_cache.t("Subfield b not in 336"))
             if "a" in marc_record["336"]:
                 return_id = get_folio_id_by_name(marc_record["336"]["a"])
 
@@ -274,7 +280,7 @@ class BibsRulesMapper(RulesMapperBase):
                 self.migration_report.add(
                     "RecourceTypeMapping",
                     "336$b - "
-                    + i18n.t(
+                    + i18n_cache.t(
                         "Code %{code} ('%{code_raw}') not found in FOLIO ",
                         code=f336_b_norm,
                         code_raw=f336_b,
@@ -282,14 +288,14 @@ class BibsRulesMapper(RulesMapperBase):
                 )
                 Helper.log_data_issue(
                     legacy_id,
-                    i18n.t("instance type code (%{code}) not found in FOLIO", code="336$b"),
+                    i18n_cache.t("instance type code (%{code}) not found in FOLIO", code="336$b"),
                     f336_b,
                 )
             else:
                 self.migration_report.add(
                     "RecourceTypeMapping",
                     "336$b "
-                    + i18n.t(
+                    + i18n_cache.t(
                         "%{fro} mapped from %{record}", fro=t[1], record=marc_record["336"]["b"]
                     ),
                 )
@@ -307,7 +313,7 @@ class BibsRulesMapper(RulesMapperBase):
             match = next(f for f in self.folio_client.instance_formats if f["code"] == code)
             self.migration_report.add(
                 "InstanceFormat",
-                i18n.t("Successful match") + f"  - {code}->{match['name']}",
+                i18n_cache.t("Successful match") + f"  - {code}->{match['name']}",
             )
             return match["id"]
         except Exception:
@@ -315,7 +321,7 @@ class BibsRulesMapper(RulesMapperBase):
             Helper.log_data_issue(legacy_id, "Instance format Code not found in FOLIO", code)
             self.migration_report.add(
                 "InstanceFormat",
-                i18n.t("Code '%{code}' not found in FOLIO", code=code),
+                i18n_cache.t("Code '%{code}' not found in FOLIO", code=code),
             )
             return ""
 
@@ -331,7 +337,7 @@ class BibsRulesMapper(RulesMapperBase):
             )
             self.migration_report.add(
                 "InstanceFormat",
-                i18n.t(
+                i18n_cache.t(
                     "Successful matching on %{criteria_1} and %{criteria_2}",
                     criteria_1="337$a",
                     criteria_2="338$a",
@@ -347,7 +353,7 @@ class BibsRulesMapper(RulesMapperBase):
             )
             self.migration_report.add(
                 "InstanceFormat",
-                i18n.t(
+                i18n_cache.t(
                     "Unsuccessful matching on %{criteria_1} and %{criteria_2}",
                     criteria_1="337$a",
                     criteria_2="338$a",
@@ -376,7 +382,7 @@ class BibsRulesMapper(RulesMapperBase):
     ):
         self.migration_report.add(
             "InstanceFormat",
-            i18n.t("338$b is missing. Will try parse from 337$a and 338$a"),
+            i18n_cache.t("338$b is missing. Will try parse from 337$a and 338$a"),
         )
         for a in f_338.get_subfields("a"):
             corresponding_337 = all_337s[field_index] if field_index < len(all_337s) else None
@@ -405,7 +411,7 @@ class BibsRulesMapper(RulesMapperBase):
                         corresponding_337 = all_337s[fidx] if fidx < len(all_337s) else None
                         if not corresponding_337:
                             # No matching 337. No use mapping the 338
-                            s = i18n.t(
+                            s = i18n_cache.t(
                                 "No corresponding 337 to 338 even though 338$b was one character"
                             )
                             Helper.log_data_issue(legacy_id, s, b)
@@ -421,7 +427,7 @@ class BibsRulesMapper(RulesMapperBase):
                                 else None
                             )
                             if not corresponding_b:
-                                s = i18n.t("No corresponding $b in corresponding 338")
+                                s = i18n_cache.t("No corresponding $b in corresponding 338")
                                 Helper.log_data_issue(legacy_id, s, "")
                                 self.migration_report.add("InstanceFormat", s)
                             else:
@@ -454,14 +460,14 @@ class BibsRulesMapper(RulesMapperBase):
 
             if not ret:
                 self.migration_report.add(
-                    "MatchedModesOfIssuanceCode", i18n.t("Unmatched level") + f": {level}"
+                    "MatchedModesOfIssuanceCode", i18n_cache.t("Unmatched level") + f": {level}"
                 )
 
                 return self.other_mode_of_issuance_id
             return ret
         except IndexError:
             self.migration_report.add(
-                "PossibleCleaningTasks", i18n.t("No Leader[7] in") + f" {legacy_id}"
+                "PossibleCleaningTasks", i18n_cache.t("No Leader[7] in") + f" {legacy_id}"
             )
 
             return self.other_mode_of_issuance_id
@@ -598,14 +604,14 @@ class BibsRulesMapper(RulesMapperBase):
         res = {f["b"].strip(): None for f in marc_record.get_fields("998") if "b" in f}
         if any(res):
             self.migration_report.add_general_statistics(
-                i18n.t("legacy id from %{fro}", fro="998$b")
+                i18n_cache.t("legacy id from %{fro}", fro="998$b")
             )
             return list(res)
         else:
             try:
                 ret = [marc_record["001"].format_field().strip()]
                 self.migration_report.add_general_statistics(
-                    i18n.t("legacy id from %{fro}", fro="001")
+                    i18n_cache.t("legacy id from %{fro}", fro="001")
                 )
                 return ret
             except Exception as e:
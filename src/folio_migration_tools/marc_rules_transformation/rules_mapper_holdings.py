@@ -3,13 +3,13 @@ import json
 import logging
 from typing import List
 
-import i18n
 from folio_uuid.folio_namespaces import FOLIONamespaces
 from folio_uuid.folio_uuid import FolioUUID
 from folioclient import FolioClient
 from pymarc.field import Field
 from pymarc.record import Record
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import (
     TransformationFieldMappingError,
     TransformationProcessError,
@@ -70,6 +70,7 @@ class RulesMapperHoldings(RulesMapperBase):
         rules_endpoint = "/mapping-rules/marc-holdings"
         self.mappings = self.folio_client.folio_get_single_object(rules_endpoint)
         self.fix_853_bug_in_rules()
+        self.compile_mapping_rules()
 
     def fix_853_bug_in_rules(self):
         f852_mappings = self.mappings["852"]
@@ -225,16 +226,16 @@ class RulesMapperHoldings(RulesMapperBase):
             ignored_subsequent_fields (_type_): _description_
             index_or_legacy_ids (_type_): _description_
         """
-        self.migration_report.add("Trivia", i18n.t("Total number of Tags processed"))
+        self.migration_report.add("Trivia", i18n_cache.t("Total number of Tags processed"))
         if marc_field.tag not in self.mappings:
             self.report_legacy_mapping(marc_field.tag, True, False)
         elif marc_field.tag not in ignored_subsequent_fields:
-            mappings = self.mappings[marc_field.tag]
+            tag_rules = self.get_tag_rules(marc_field.tag)
             self.map_field_according_to_mapping(
-                marc_field, mappings, folio_holding, index_or_legacy_ids
+                marc_field, tag_rules, folio_holding, index_or_legacy_ids
             )
             self.report_legacy_mapping(marc_field.tag, True, True)
-            if any(m.get("ignoreSubsequentFields", False) for m in mappings):
+            if tag_rules.ignore_subsequent_fields:
                 ignored_subsequent_fields.add(marc_field.tag)
 
     def perform_additional_mapping(
@@ -324,6 +325,7 @@ class RulesMapperHoldings(RulesMapperBase):
 
     def wrap_up(self):
         logging.info("Mapper wrapping up")
+        self.conditions.log_memoization_statistics()
         source_file_create_source_records = [
             x.create_source_records for x in self.task_configuration.files
         ]
@@ -354,7 +356,7 @@ class RulesMapperHoldings(RulesMapperBase):
         if folio_holding.get("holdingsTypeId", ""):
             self.migration_report.add(
                 "HoldingsTypeMapping",
-                i18n.t(
+                i18n_cache.t(
                     "Already set to %{value}. %{leader_key} was %{leader}",
                     value=folio_holding.get("holdingsTypeId"),
                     leader_key="LDR[06]",
@@ -375,7 +377,7 @@ class RulesMapperHoldings(RulesMapperBase):
                     Helper.log_data_issue(
                         legacy_ids,
                         (
-                            i18n.t("blurbs.HoldingsTypeMapping.title") + " is 'unknown'. "
+                            i18n_cache.t("blurbs.HoldingsTypeMapping.title") + " is 'unknown'. "
                             "(leader 06 is set to 'u') Check if this is correct"
                         ),
                         ldr06,
@@ -389,14 +391,14 @@ class RulesMapperHoldings(RulesMapperBase):
                 folio_holding["holdingsTypeId"] = self.fallback_holdings_type_id
                 self.migration_report.add(
                     "HoldingsTypeMapping",
-                    i18n.t("An Unmapped")
+                    i18n_cache.t("An Unmapped")
                     + f" {ldr06} -> {holdings_type} -> "
-                    + i18n.t("Unmapped"),
+                    + i18n_cache.t("Unmapped"),
                 )
                 Helper.log_data_issue(
                     legacy_ids,
                     (
-                        i18n.t("blurbs.HoldingsTypeMapping.title", locale="en")
+                        i18n_cache.t("blurbs.HoldingsTypeMapping.title", locale="en")
                         + ". leader 06 was unmapped."
                     ),
                     ldr06,
@@ -1,7 +1,13 @@
+import json
 import logging
-import i18n
+import os
+import sys
 from datetime import datetime
 from datetime import timezone
+from pathlib import Path
+from typing import Union
+
+import i18n
 
 
 class MigrationReport:
@@ -10,6 +16,8 @@ class MigrationReport:
     def __init__(self):
         self.report = {}
         self.stats = {}
+        # The (blurb_id, measure) pairs given a value with set, rather than counted with add
+        self.set_measures: set = set()
 
     def add(self, blurb_id, measure_to_add, number=1):
         """Add section header and values to migration report.
@@ -19,13 +27,15 @@ class MigrationReport:
             measure_to_add (_type_): _description_
             number (int, optional): _description_. Defaults to 1.
         """
-        try:
-            self.report[blurb_id][measure_to_add] += number
-        except KeyError:
-            if blurb_id not in self.report:
-                self.report[blurb_id] = {"blurb_id": blurb_id}
-            if measure_to_add not in self.report[blurb_id]:
-                self.report[blurb_id][measure_to_add] = number
+        section = self.report.get(blurb_id)
+        if section is None:
+            blurb_id = intern(blurb_id)
+            section = self.report[blurb_id] = {"blurb_id": blurb_id}
+        count = section.get(measure_to_add)
+        if count is None:
+            section[intern(measure_to_add)] = number
+        else:
+            section[measure_to_add] = count + number
 
     def set(self, blurb_id, measure_to_add: str, number: int):
         """Set a section value  to a specific number
@@ -38,6 +48,87 @@ class MigrationReport:
         if blurb_id not in self.report:
             self.report[blurb_id] = {}
         self.report[blurb_id][measure_to_add] = number
+        self.set_measures.add((blurb_id, measure_to_add))
+
+    def merge(self, other: Union["MigrationReport", dict]):
+        """Adds the counts in another report, like one from a worker process, to this one
+
+        Values the other report gave with set, like the number of rows in a file, replace
+        the values in this report instead of being added to them. A snapshot does not tell
+        them apart from counts, so all the values in a snapshot are added.
+
+        Args:
+            other (Union[MigrationReport, dict]): The other report, or a snapshot of it
+        """
+        if isinstance(other, MigrationReport):
+            report, set_measures = other.report, other.set_measures
+        else:
+            report, set_measures = other, set()
+        for blurb_id, measures in report.items():
+            section = self.report.get(blurb_id)
+            if section is None:
+                blurb_id = intern(blurb_id)
+                section = self.report[blurb_id] = {"blurb_id": blurb_id}
+            for measure, number in measures.items():
+                if measure == "blurb_id":
+                    section["blurb_id"] = number
+                elif (blurb_id, measure) in set_measures:
+                    section[intern(measure)] = number
+                    self.set_measures.add((blurb_id, measure))
+                elif measure in section:
+                    section[measure] += number
+                else:
+                    section[intern(measure)] = number
+
+    def snapshot(self) -> dict:
+        """A copy of the counts, that can be pickled, saved as JSON, or merged into another
+        report
+
+        Returns:
+            dict: The counts per measure, per section
+        """
+        return {blurb_id: dict(measures) for blurb_id, measures in self.report.items()}
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "MigrationReport":
+        migration_report = cls()
+        migration_report.report = {
+            intern(blurb_id): {intern(measure): number for measure, number in measures.items()}
+            for blurb_id, measures in snapshot.items()
+        }
+        return migration_report
+
+    def write_snapshot(self, snapshot_path: Path):
+        """Saves the counts as JSON, for example to publish a partial report of a long run
+
+        The snapshot is written to a temporary file that then replaces the old snapshot, so
+        that readers never see a half written one. Measures that are not strings, like
+        errors, are saved as they read in the migration report.
+
+        Args:
+            snapshot_path (Path): Where to save the snapshot
+        """
+        snapshot: dict = {}
+        for blurb_id, measures in self.report.items():
+            section = snapshot[str(blurb_id)] = {}
+            for measure, number in measures.items():
+                key = measure if isinstance(measure, str) else str(measure)
+                if key in section and key != "blurb_id":
+                    section[key] += number
+                else:
+                    section[key] = number
+        temp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+        try:
+            with open(temp_path, "w") as snapshot_file:
+                json.dump(snapshot, snapshot_file)
+            os.replace(temp_path, snapshot_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    @classmethod
+    def read_snapshot(cls, snapshot_path: Path) -> "MigrationReport":
+        with open(snapshot_path) as snapshot_file:
+            return cls.from_snapshot(json.load(snapshot_file))
 
     def add_general_statistics(self, measure_to_add: str):
         """Shortcut for adding to the first breakdown
@@ -112,6 +203,11 @@ class MigrationReport:
                 logging.info(f"{b[0] or 'EMPTY'} \t\t{b[1]:,}   ")
 
 
+def intern(key):
+    """Interns string section and measure ids, so that each is only kept once"""
+    return sys.intern(key) if type(key) is str else key
+
+
 def as_str(s):
     try:
         return str(s), ""
@@ -1,12 +1,20 @@
+import asyncio
 import copy
 import json
 import logging
+import os
+import random
 import sys
+import threading
 import time
 import traceback
+import zlib
+from collections import deque
 from datetime import datetime
+from pathlib import Path
 from typing import Annotated
 from typing import List
+from typing import Optional
 from uuid import uuid4
 
 import httpx
@@ -20,12 +28,40 @@ from folio_migration_tools.library_configuration import FileDefinition
 from folio_migration_tools.library_configuration import LibraryConfiguration
 from folio_migration_tools.migration_report import MigrationReport
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
-from folio_migration_tools.task_configuration import AbstractTaskConfiguration
+from folio_migration_tools.rate_limiter import RateLimiter
+from folio_migration_tools.task_configuration import RateLimitedTaskConfiguration
 
 
 def write_failed_batch_to_file(batch, file):
     for record in batch:
-        file.write(f"{json.dumps(record)}\n")
+        file.write(f"{serialize_record(record)}\n")
+
+
+def serialize_record(record) -> str:
+    if isinstance(record, bytes):
+        return record.decode("utf-8")
+    return json.dumps(record)
+
+
+def insert_json_property(record: bytes, json_property: bytes) -> bytes:
+    """Inserts a serialized property last in a serialized JSON object, without parsing it
+
+    If the object already has the property, FOLIO will use the value inserted here, since the
+    JSON parsers used by the storage modules keep the last value of a repeated property.
+
+    Args:
+        record (bytes): A serialized JSON object
+        json_property (bytes): A serialized property, like b'"_version":-1'
+
+    Returns:
+        bytes: The serialized JSON object with the property added
+    """
+    end = record.rindex(b"}")
+    last = end - 1
+    while last > 0 and record[last] in b" \t\r\n":
+        last -= 1
+    separator = b"" if record[last] == ord("{") else b","
+    return b"".join((record[:end], separator, json_property, record[end:]))
 
 
 class BatchPoster(MigrationTaskBase):
@@ -46,7 +82,7 @@ class BatchPoster(MigrationTaskBase):
         _type_: _description_
     """
 
-    class TaskConfiguration(AbstractTaskConfiguration):
+    class TaskConfiguration(RateLimitedTaskConfiguration):
         name: str
         migration_task_type: str
         object_type: str
@@ -71,6 +107,169 @@ class BatchPoster(MigrationTaskBase):
                 )
             ),
         ] = True
+        max_concurrent_batches: Annotated[
+            int,
+            Field(
+                description=(
+                    "The number of batches BatchPoster keeps in flight against FOLIO at the "
+                    "same time. Only applies to object types that are posted in batches. "
+                    "Defaults to 1 (post one batch at a time)"
+                ),
+                ge=1,
+            ),
+        ] = 1
+        max_concurrent_records: Annotated[
+            int,
+            Field(
+                description=(
+                    "The number of records BatchPoster posts at the same time for object types "
+                    "that are posted one record at a time (Extradata, Authorities, "
+                    "Organizations and Orders). Extradata objects that depend on another "
+                    "object, like instructors on their course listing, are held back until "
+                    "that object has been posted. Defaults to 1 (post one record at a time)"
+                ),
+                ge=1,
+            ),
+        ] = 1
+        adaptive_batch_size: Annotated[
+            bool,
+            Field(
+                description=(
+                    "Toggles adaptive batch sizing. When on, BatchPoster grows the batches "
+                    "while FOLIO responds faster than target_response_seconds, and shrinks "
+                    "them on slow responses, HTTP 413, 5xx and timeouts. Batches failing with "
+                    "413, 5xx or timeouts are split up and reposted at the smaller size. "
+                    "Timeouts only happen when request_timeout_seconds is set"
+                )
+            ),
+        ] = False
+        min_batch_size: Annotated[
+            int,
+            Field(description="Smallest batch size adaptive batch sizing may choose", ge=1),
+        ] = 1
+        max_batch_size: Annotated[
+            Optional[int],
+            Field(
+                description=(
+                    "Largest batch size adaptive batch sizing may choose. "
+                    "Defaults to batch_size"
+                ),
+                ge=1,
+            ),
+        ] = None
+        target_response_seconds: Annotated[
+            float,
+            Field(
+                description=(
+                    "Adaptive batch sizing grows the batches as long as FOLIO responds "
+                    "within this many seconds"
+                ),
+                gt=0,
+            ),
+        ] = 5.0
+        bisect_failed_batches: Annotated[
+            bool,
+            Field(
+                description=(
+                    "When a batch is rejected with HTTP 422, split it in halves and repost "
+                    "them, until the failing records are isolated. Only the failing records "
+                    "are written to the failed records file, each preceded by the error "
+                    "message from FOLIO and a tab"
+                )
+            ),
+        ] = False
+        raw_payloads: Annotated[
+            bool,
+            Field(
+                description=(
+                    "Post the records as they are in the file, without parsing and "
+                    "re-serializing them. The records are spliced into the batch payload as "
+                    "bytes, and _version and snapshotId are added without parsing the JSON. "
+                    "Failed records are written to the failed records file as they were read. "
+                    "Speeds up the posting of large records, like SRS records"
+                )
+            ),
+        ] = False
+        compress_requests: Annotated[
+            bool,
+            Field(
+                description=(
+                    "Gzip the batch payloads and send them with Content-Encoding: gzip. "
+                    "Batches of records are repetitive and compress well, which helps when "
+                    "FOLIO is reached over a slow network link. FOLIO (or the proxy in front "
+                    "of it) must accept gzipped request bodies"
+                )
+            ),
+        ] = False
+        max_retries: Annotated[
+            int,
+            Field(
+                description=(
+                    "How many times a request failing with one of the retryable_status_codes "
+                    "or a network error is retried, with exponential backoff and jitter"
+                ),
+                ge=0,
+            ),
+        ] = 5
+        retry_backoff_seconds: Annotated[
+            float,
+            Field(
+                description=(
+                    "The base wait before retrying a request. The wait is doubled for every "
+                    "attempt, and a random (jittered) part of it is used"
+                ),
+                ge=0,
+            ),
+        ] = 2.0
+        retry_max_backoff_seconds: Annotated[
+            float,
+            Field(description="The longest wait before retrying a request", ge=0),
+        ] = 60.0
+        retry_max_elapsed_seconds: Annotated[
+            float,
+            Field(
+                description=(
+                    "Stop retrying a request when this many seconds have passed since the "
+                    "first attempt"
+                ),
+                ge=0,
+            ),
+        ] = 900.0
+        request_timeout_seconds: Annotated[
+            float,
+            Field(
+                description=(
+                    "How many seconds BatchPoster waits for FOLIO to respond to a request "
+                    "before giving up on it. Requests that time out are retried like network "
+                    "errors. 0 means no timeout"
+                ),
+                ge=0,
+            ),
+        ] = 0
+        retryable_status_codes: Annotated[
+            List[int],
+            Field(description="HTTP status codes that make BatchPoster retry a request"),
+        ] = [429, 500, 502, 503, 504]
+        records_per_second: Annotated[
+            float,
+            Field(
+                description=(
+                    "Upper limit for the number of records per second BatchPoster posts to "
+                    "FOLIO. 0 means no limit"
+                ),
+                ge=0,
+            ),
+        ] = 0
+        resume: Annotated[
+            bool,
+            Field(
+                description=(
+                    "BatchPoster keeps a journal of how far into each file the records have "
+                    "been posted. Set this to true to pick up where a previous, interrupted run "
+                    "of this task left off, instead of starting from the first row"
+                )
+            ),
+        ] = False
 
     @staticmethod
     def get_object_type() -> FOLIONamespaces:
@@ -95,6 +294,27 @@ class BatchPoster(MigrationTaskBase):
         self.failed_objects: list = []
         self.batch_size = self.task_configuration.batch_size
         logging.info("Batch size is %s", self.batch_size)
+        self.request_timeout = self.task_configuration.request_timeout_seconds or None
+        self.batch_size_controller = (
+            BatchSizeController(
+                self.batch_size,
+                self.task_configuration.min_batch_size,
+                self.task_configuration.max_batch_size or self.batch_size,
+                self.task_configuration.target_response_seconds,
+            )
+            if self.task_configuration.adaptive_batch_size
+            else None
+        )
+        self.retry_policy = RetryPolicy(
+            self.task_configuration.max_retries,
+            self.task_configuration.retry_backoff_seconds,
+            self.task_configuration.retry_max_backoff_seconds,
+            self.task_configuration.retry_max_elapsed_seconds,
+            self.task_configuration.retryable_status_codes,
+        )
+        self.rate_limiter = RateLimiter.from_task_configuration(
+            self.task_configuration, self.folder_structure
+        )
         self.processed = 0
         self.failed_batches = 0
         self.users_created = 0
@@ -103,80 +323,205 @@ class BatchPoster(MigrationTaskBase):
         self.failed_fields: set = set()
         self.num_failures = 0
         self.num_posted = 0
+        self.bytes_sent = 0
+        self.uncompressed_bytes_sent = 0
+        self.posting_started = time.monotonic()
         self.okapi_headers = self.folio_client.okapi_headers
         self.http_client = None
+        self.concurrent_poster = None
+        self.batches_in_flight: deque = deque()
+        self.records_in_flight: deque = deque()
+        self.journal = None
+        self.unacknowledged_rows: dict = {}
 
     def do_work(self):
-        with httpx.Client(timeout=None) as httpx_client:
+        self.posting_started = time.monotonic()
+        with self.create_http_client() as httpx_client:
             self.http_client = httpx_client
+            if self.task_configuration.max_concurrent_batches > 1 and self.api_info.get(
+                "is_batch", False
+            ):
+                logging.info(
+                    "Posting with up to %s concurrent batches",
+                    self.task_configuration.max_concurrent_batches,
+                )
+                self.concurrent_poster = ConcurrentPoster(self.request_timeout)
+            elif self.task_configuration.max_concurrent_records > 1 and not self.api_info.get(
+                "is_batch", False
+            ):
+                logging.info(
+                    "Posting with up to %s concurrent records",
+                    self.task_configuration.max_concurrent_records,
+                )
+                self.concurrent_poster = ConcurrentPoster(self.request_timeout)
+            if not self.performing_rerun:
+                self.journal = PostingJournal(
+                    self.folder_structure.results_folder
+                    / f"posting_journal_{self.task_configuration.name}.jsonl",
+                    self.task_configuration.resume,
+                )
             try:
                 batch = []
                 if self.task_configuration.object_type == "SRS":
                     self.create_snapshot()
                 with open(self.folder_structure.failed_recs_path, "w") as failed_recs_file:
                     for file_def in self.task_configuration.files:
-                        path = self.folder_structure.results_folder / file_def.file_name
-                        with open(path) as rows:
-                            logging.info("Running %s", path)
-                            last_row = ""
-                            for self.processed, row in enumerate(rows, start=1):
-                                last_row = row
-                                if row.strip():
-                                    try:
-                                        if self.task_configuration.object_type == "Extradata":
-                                            self.post_extra_data(
-                                                row, self.processed, failed_recs_file
-                                            )
-                                        elif not self.api_info["is_batch"]:
-                                            self.post_single_records(
-                                                row, self.processed, failed_recs_file
-                                            )
-                                        else:
-                                            batch = self.post_record_batch(
-                                                batch, failed_recs_file, row
-                                            )
-                                    except UnicodeDecodeError as unicode_error:
-                                        self.handle_unicode_error(unicode_error, last_row)
-                                    except TransformationProcessError as tpe:
-                                        self.handle_generic_exception(
-                                            tpe,
-                                            last_row,
-                                            batch,
-                                            self.processed,
-                                            failed_recs_file,
-                                        )
-                                        logging.critical("Halting %s", tpe)
-                                        print(f"\n\t{tpe.message}")
-                                        sys.exit(1)
-                                    except TransformationRecordFailedError as exception:
-                                        self.handle_generic_exception(
-                                            exception,
-                                            last_row,
-                                            batch,
-                                            self.processed,
-                                            failed_recs_file,
-                                        )
-                                        batch = []
+                        batch = self.post_file(file_def.file_name, batch, failed_recs_file)
 
                     if self.task_configuration.object_type != "Extradata" and any(batch):
                         try:
-                            self.post_batch(batch, failed_recs_file, self.processed)
+                            self.dispatch_batch(batch, failed_recs_file, self.processed)
                         except Exception as exception:
                             self.handle_generic_exception(
-                                exception, last_row, batch, self.processed, failed_recs_file
+                                exception, "", batch, self.processed, failed_recs_file
                             )
+                    while self.batches_in_flight:
+                        self.collect_oldest_batch(failed_recs_file)
+                    while self.records_in_flight:
+                        self.collect_oldest_record(failed_recs_file)
+                    self.acknowledge_rows(self.take_unacknowledged_rows())
                     logging.info("Done posting %s records. ", (self.processed))
             except Exception as ee:
                 if self.task_configuration.object_type == "SRS":
                     self.commit_snapshot()
                 raise ee
+            finally:
+                if self.concurrent_poster:
+                    self.concurrent_poster.close()
+                    self.concurrent_poster = None
+                if self.journal:
+                    self.journal.close()
+                    self.journal = None
+
+    def create_http_client(self) -> httpx.Client:
+        return httpx.Client(timeout=self.request_timeout)
+
+    def post_file(self, file_name: str, batch: list, failed_recs_file) -> list:
+        """Posts the records in a file from the results folder
+
+        When resuming, the rows the journal records as handled are skipped.
+
+        Args:
+            file_name (str): The name of the file in the results folder
+            batch (list): The records read from earlier files and not yet posted
+            failed_recs_file: File to write failed records to
+
+        Returns:
+            list: The records read and not yet posted
+        """
+        path = self.folder_structure.results_folder / file_name
+        with open(path, "rb") as rows:
+            logging.info("Running %s", path)
+            row_number, offset = self.seek_to_checkpoint(rows, file_name)
+            for self.processed, raw_row in enumerate(rows, start=row_number + 1):
+                offset += len(raw_row)
+                self.unacknowledged_rows[file_name] = (self.processed, offset)
+                if raw_row.strip():
+                    batch = self.post_row(raw_row, batch, failed_recs_file)
+                self.acknowledge_single_records()
+                self.write_partial_report(self.migration_report)
+        return batch
+
+    def seek_to_checkpoint(self, rows, file_name: str) -> tuple:
+        """Seeks past the rows of the file that the journal records as handled
+
+        Args:
+            rows: The file, opened in binary mode
+            file_name (str): The name of the file
+
+        Returns:
+            tuple: The number of the last row handled and the byte offset following it
+        """
+        row_number, offset = self.journal.get_checkpoint(file_name) if self.journal else (0, 0)
+        if offset:
+            logging.info("Resuming %s after row %s (byte %s)", file_name, row_number, offset)
+            rows.seek(offset)
+        return row_number, offset
+
+    def post_row(self, raw_row: bytes, batch: list, failed_recs_file) -> list:
+        """Posts the record in a row, or adds it to the batch for object types posted in batches
+
+        Args:
+            raw_row (bytes): The row, as read from the file
+            batch (list): The records read and not yet posted
+            failed_recs_file: File to write failed records to
+
+        Returns:
+            list: The records read and not yet posted
+        """
+        last_row = raw_row
+        try:
+            if self.task_configuration.raw_payloads and self.api_info.get("is_batch", False):
+                # Kept as bytes. Decoding would copy every record
+                return self.post_record_batch(batch, failed_recs_file, raw_row)
+            row = last_row = raw_row.decode("utf-8")
+            if self.task_configuration.object_type == "Extradata":
+                self.post_extra_data(row, self.processed, failed_recs_file)
+            elif not self.api_info["is_batch"]:
+                self.post_single_records(row, self.processed, failed_recs_file)
+            else:
+                batch = self.post_record_batch(batch, failed_recs_file, row)
+        except UnicodeDecodeError as unicode_error:
+            self.handle_unicode_error(unicode_error, last_row)
+        except TransformationProcessError as tpe:
+            self.handle_generic_exception(tpe, last_row, batch, self.processed, failed_recs_file)
+            logging.critical("Halting %s", tpe)
+            print(f"\n\t{tpe.message}")
+            sys.exit(1)
+        except TransformationRecordFailedError as exception:
+            self.handle_generic_exception(
+                exception, last_row, batch, self.processed, failed_recs_file
+            )
+            batch = []
+        return batch
+
+    def acknowledge_single_records(self):
+        """Acknowledges the rows read every batch_size rows, for records not posted in batches
+
+        Batches acknowledge their own rows when they have been posted.
+        """
+        if not self.api_info.get("is_batch", False) and self.processed % int(self.batch_size) == 0:
+            self.acknowledge_rows_when_posted(self.take_unacknowledged_rows())
+
+    def take_unacknowledged_rows(self) -> dict:
+        """Hands over the positions of the rows read since the last call
+
+        Returns:
+            dict: The last row number and byte offset read, per file name
+        """
+        rows, self.unacknowledged_rows = self.unacknowledged_rows, {}
+        return rows
+
+    def acknowledge_rows_when_posted(self, rows: dict):
+        """Acknowledges the rows once the records posted concurrently so far have been handled
+
+        Args:
+            rows (dict): The last row number and byte offset read, per file name
+        """
+        if self.records_in_flight:
+            self.records_in_flight[-1][3].update(rows)
+        else:
+            self.acknowledge_rows(rows)
+
+    def acknowledge_rows(self, rows: dict):
+        """Records in the journal that the rows have been posted or written to the failed file
+
+        Args:
+            rows (dict): The last row number and byte offset handled, per file name
+        """
+        if self.journal:
+            for file_name, (row_number, offset) in rows.items():
+                self.journal.commit(file_name, row_number, offset)
 
     def post_record_batch(self, batch, failed_recs_file, row):
+        if self.task_configuration.raw_payloads:
+            batch.append(self.read_raw_record(row))
+            if len(batch) >= int(self.batch_size):
+                self.dispatch_batch(batch, failed_recs_file, self.processed)
+                batch = []
+            return batch
         json_rec = json.loads(row.split("\t")[-1])
-        if (
-            self.task_configuration.object_type in ["Instances", "Holdings", "Items"]
-            and not self.task_configuration.use_safe_inventory_endpoints
-        ):
+        if self.is_upsert():
             self.migration_report.add_general_statistics(
                 i18n.t("Set _version to -1 to enable upsert")
             )
@@ -186,42 +531,140 @@ class BatchPoster(MigrationTaskBase):
         if self.processed == 1:
             logging.info(json.dumps(json_rec, indent=True))
         batch.append(json_rec)
-        if len(batch) == int(self.batch_size):
-            self.post_batch(batch, failed_recs_file, self.processed)
+        if len(batch) >= int(self.batch_size):
+            self.dispatch_batch(batch, failed_recs_file, self.processed)
             batch = []
         return batch
 
+    def is_upsert(self) -> bool:
+        return (
+            self.task_configuration.object_type in ["Instances", "Holdings", "Items"]
+            and not self.task_configuration.use_safe_inventory_endpoints
+        )
+
+    def read_raw_record(self, raw_row: bytes) -> bytes:
+        """Takes the record from a row read with raw_payloads, without decoding it
+
+        The record is kept as it is in the file, so that it is written unchanged to the
+        failed records file. _version and snapshotId are added when the payload is built.
+
+        Args:
+            raw_row (bytes): The row, as read from the file
+
+        Returns:
+            bytes: The serialized record
+        """
+        record = raw_row[raw_row.rfind(b"\t") + 1 :].strip()
+        if self.is_upsert():
+            self.migration_report.add_general_statistics(
+                i18n.t("Set _version to -1 to enable upsert")
+            )
+        if self.processed == 1:
+            logging.info(record.decode("utf-8", errors="replace"))
+        return record
+
+    def prepare_raw_record(self, record: bytes) -> bytes:
+        """Adds _version and snapshotId to a record read with raw_payloads, as needed
+
+        Args:
+            record (bytes): The serialized record
+
+        Returns:
+            bytes: The serialized record to post
+        """
+        if self.is_upsert():
+            record = insert_json_property(record, b'"_version":-1')
+        if self.task_configuration.object_type == "SRS":
+            record = insert_json_property(
+                record, b'"snapshotId":"' + self.snapshot_id.encode("utf-8") + b'"'
+            )
+        return record
+
+    def dispatch_batch(self, batch, failed_recs_file, num_records):
+        """Posts the batch, either right away or by handing it to the concurrent poster.
+
+        When posting concurrently, the responses are handled here on the main thread, in the
+        order the batches were read, so that the failed records file, the counters and the
+        migration report are updated exactly as they are when posting one batch at a time.
+
+        Args:
+            batch (list): The records to post
+            failed_recs_file: File to write failed records to
+            num_records (int): The number of rows read when the batch was completed
+        """
+        if self.batch_size_controller:
+            self.migration_report.add("BatchSizes", str(len(batch)))
+        rows = self.take_unacknowledged_rows()
+        if not self.concurrent_poster:
+            try:
+                self.post_batch(batch, failed_recs_file, num_records)
+            except TransformationRecordFailedError as exception:
+                self.handle_generic_exception(exception, "", batch, num_records, failed_recs_file)
+            self.acknowledge_rows(rows)
+            return
+        while self.batches_in_flight and self.batches_in_flight[0][0].done():
+            self.collect_oldest_batch(failed_recs_file)
+        while len(self.batches_in_flight) >= self.task_configuration.max_concurrent_batches:
+            self.collect_oldest_batch(failed_recs_file)
+        future = self.concurrent_poster.submit(
+            self.post_batch_async(
+                self.get_request_arguments(batch, dict(self.folio_client.okapi_headers)),
+                len(batch),
+            )
+        )
+        self.batches_in_flight.append((future, batch, num_records, rows))
+
+    def collect_oldest_batch(self, failed_recs_file):
+        future, batch, num_records, rows = self.batches_in_flight.popleft()
+        try:
+            try:
+                response = future.result()
+            except httpx.TimeoutException:
+                if not self.resize_and_repost(None, batch, failed_recs_file, num_records):
+                    raise
+            else:
+                if not self.resize_and_repost(response, batch, failed_recs_file, num_records):
+                    self.handle_batch_response(response, batch, failed_recs_file, num_records)
+        except TransformationProcessError as tpe:
+            self.handle_generic_exception(tpe, "", batch, num_records, failed_recs_file)
+            raise
+        except Exception as exception:
+            self.handle_generic_exception(exception, "", batch, num_records, failed_recs_file)
+        self.acknowledge_rows(rows)
+
     def post_extra_data(self, row: str, num_records: int, failed_recs_file):
         (object_name, data) = row.split("\t")
         endpoint = get_extradata_endpoint(object_name, data)
         url = f"{self.folio_client.okapi_url}/{endpoint}"
         body = data
-        response = self.post_objects(url, body)
-        if response.status_code == 201:
-            self.num_posted += 1
-        elif response.status_code == 422:
-            self.num_failures += 1
-            error_msg = json.loads(response.text)["errors"][0]["message"]
-            logging.error("Row %s\tHTTP %s\t %s", num_records, response.status_code, error_msg)
-            if "id value already exists" not in json.loads(response.text)["errors"][0]["message"]:
-                failed_recs_file.write(row)
-        else:
-            self.num_failures += 1
-            logging.error("Row %s\tHTTP %s\t%s", num_records, response.status_code, response.text)
-            failed_recs_file.write(row)
-        if num_records % 50 == 0:
-            logging.info(
-                "%s records posted successfully. %s failed",
-                self.num_posted,
-                self.num_failures,
+        if self.concurrent_poster:
+            self.dispatch_record(
+                url,
+                body,
+                row,
+                num_records,
+                failed_recs_file,
+                get_extradata_key(object_name, data),
+                get_extradata_prerequisite(object_name, data),
             )
+            return
+        response = self.post_objects(url, body)
+        self.handle_record_response(response, row, num_records, failed_recs_file)
 
     def post_single_records(self, row: str, num_records: int, failed_recs_file):
         if self.api_info["is_batch"]:
             raise TypeError("This record type supports batch processing, use post_batch method")
         api_endpoint = self.api_info.get("api_endpoint")
         url = f"{self.folio_client.okapi_url}{api_endpoint}"
+        if self.concurrent_poster:
+            self.dispatch_record(url, row, row, num_records, failed_recs_file)
+            return
         response = self.post_objects(url, row)
+        self.handle_record_response(response, row, num_records, failed_recs_file)
+
+    def handle_record_response(
+        self, response: httpx.Response, row: str, num_records: int, failed_recs_file
+    ):
         if response.status_code == 201:
             self.num_posted += 1
         elif response.status_code == 422:
@@ -241,14 +684,85 @@ class BatchPoster(MigrationTaskBase):
                 self.num_failures,
             )
 
+    def dispatch_record(
+        self,
+        url: str,
+        body: str,
+        row: str,
+        num_records: int,
+        failed_recs_file,
+        key: Optional[tuple] = None,
+        prerequisite: Optional[tuple] = None,
+    ):
+        """Hands a single record to the concurrent poster.
+
+        Like batches, the responses are handled on the main thread in the order the rows were
+        read. A record with a prerequisite is not submitted until the record it depends on,
+        if it is still in flight, has been handled.
+
+        Args:
+            url (str): The URL to post to
+            body (str): The record to post
+            row (str): The row from the file, written to the failed records file on failure
+            num_records (int): The row number
+            failed_recs_file: File to write failed records to
+            key (Optional[tuple]): (object name, id) for records other records may depend on
+            prerequisite (Optional[tuple]): The key of the record this record depends on
+        """
+        while self.records_in_flight and self.records_in_flight[0][0].done():
+            self.collect_oldest_record(failed_recs_file)
+        if prerequisite:
+            while any(in_flight[4] == prerequisite for in_flight in self.records_in_flight):
+                self.collect_oldest_record(failed_recs_file)
+        while len(self.records_in_flight) >= self.task_configuration.max_concurrent_records:
+            self.collect_oldest_record(failed_recs_file)
+        future = self.concurrent_poster.submit(
+            self.post_record_async(url, body, dict(self.folio_client.okapi_headers))
+        )
+        self.records_in_flight.append((future, row, num_records, {}, key))
+
+    def collect_oldest_record(self, failed_recs_file):
+        future, row, num_records, rows, _ = self.records_in_flight.popleft()
+        try:
+            response = future.result()
+        except Exception as exception:
+            self.num_failures += 1
+            logging.error("Row %s\t%s", num_records, exception)
+            failed_recs_file.write(row)
+        else:
+            self.handle_record_response(response, row, num_records, failed_recs_file)
+        self.acknowledge_rows(rows)
+
+    async def post_record_async(self, url: str, body: str, headers: dict):
+        content = body.encode("utf-8")
+        return await self.retry_policy.call_async(
+            self.rate_limiter.limit_async(
+                lambda: self.concurrent_poster.client.post(url, content=content, headers=headers)
+            ),
+            f"Posting to {url}",
+        )
+
     def post_objects(self, url, body):
         if self.http_client and not self.http_client.is_closed:
-            return self.http_client.post(
-                url, data=body.encode("utf-8"), headers=self.folio_client.okapi_headers
+            return self.retry_policy.call(
+                self.rate_limiter.limit(
+                    lambda: self.http_client.post(
+                        url, data=body.encode("utf-8"), headers=self.folio_client.okapi_headers
+                    )
+                ),
+                f"Posting to {url}",
             )
         else:
-            return httpx.post(
-                url, headers=self.okapi_headers, data=body.encode("utf-8"), timeout=None
+            return self.retry_policy.call(
+                self.rate_limiter.limit(
+                    lambda: httpx.post(
+                        url,
+                        headers=self.okapi_headers,
+                        data=body.encode("utf-8"),
+                        timeout=self.request_timeout,
+                    )
+                ),
+                f"Posting to {url}",
             )
 
     def handle_generic_exception(self, exception, last_row, batch, num_records, failed_recs_file):
@@ -272,29 +786,138 @@ class BatchPoster(MigrationTaskBase):
             "%s Posting failed. Encoding error reading file",
             unicode_error,
         )
-        logging.info(
-            "Failing row, either the one shown here or the next row in %s",
-            self.task_configuration.file.file_name,
-        )
+        logging.info("Failing row:")
         logging.info(last_row)
         logging.info("=========Stack trace==============")
-        traceback.logging.info_exc()
-        logging.info("=======================", flush=True)
+        logging.info(traceback.format_exc())
+        logging.info("=======================")
+
+    def post_batch(self, batch, failed_recs_file, num_records):
+        try:
+            response = self.do_post(batch)
+        except httpx.TimeoutException:
+            if not self.resize_and_repost(None, batch, failed_recs_file, num_records):
+                raise
+            return
+        if not self.resize_and_repost(response, batch, failed_recs_file, num_records):
+            self.handle_batch_response(response, batch, failed_recs_file, num_records)
+
+    def resize_and_repost(
+        self, response: Optional[httpx.Response], batch, failed_recs_file, num_records
+    ) -> bool:
+        """Feeds the outcome of a post to the adaptive batch sizing, if it is turned on.
+
+        Batches that failed with HTTP 413, 5xx or a timeout (response is None) and that are
+        larger than the new batch size are split up and reposted at the new size.
+
+        Args:
+            response (Optional[httpx.Response]): The response, or None if the request timed out
+            batch (list): The records that were posted
+            failed_recs_file: File to write failed records to
+            num_records (int): The number of rows read when the batch was completed
+
+        Returns:
+            bool: True if the batch was reposted and the response should not be handled
+        """
+        if not self.batch_size_controller:
+            return False
+        if response is not None and response.status_code in [200, 201]:
+            self.batch_size = self.batch_size_controller.record_success(
+                response.elapsed.total_seconds()
+            )
+            return False
+        if response is not None and response.status_code != 413 and response.status_code < 500:
+            return False
+        self.batch_size = self.batch_size_controller.record_failure()
+        if len(batch) <= self.batch_size:
+            return False
+        logging.info(
+            "Post of %s records failed (%s). Reposting in batches of %s",
+            len(batch),
+            "timeout" if response is None else f"HTTP {response.status_code}",
+            self.batch_size,
+        )
+        for smaller_batch in chunks(batch, self.batch_size):
+            self.migration_report.add("BatchSizes", str(len(smaller_batch)))
+            try:
+                self.post_batch(smaller_batch, failed_recs_file, num_records)
+            except TransformationRecordFailedError as exception:
+                self.handle_generic_exception(
+                    exception, "", smaller_batch, num_records, failed_recs_file
+                )
+        return True
+
+    def bisect_failed_batch(self, response: httpx.Response, batch, failed_recs_file, num_records):
+        """Splits a rejected batch in halves and reposts them to isolate the failing records
+
+        The halves are posted through post_batch, so a half that gets rejected again is
+        bisected in turn. A single rejected record is written to the failed records file,
+        preceded by the error message from FOLIO and a tab. BatchPoster only reads the last
+        tab-separated column of each row, so the file can still be rerun.
+
+        Args:
+            response (httpx.Response): The 422 response for the batch
+            batch (list): The records that were posted
+            failed_recs_file: File to write failed records to
+            num_records (int): The number of rows read when the batch was completed
+        """
+        if len(batch) == 1:
+            error_message = get_error_message(response)
+            self.num_failures += 1
+            self.migration_report.add(
+                "Details", i18n.t("Records isolated as failing by bisecting batches")
+            )
+            logging.error("Row %s\tHTTP %s\t%s", num_records, response.status_code, error_message)
+            failed_recs_file.write(f"{json.dumps(error_message)}\t{serialize_record(batch[0])}\n")
+            return
+        logging.info("Batch of %s records rejected. Bisecting", len(batch))
+        middle = (len(batch) + 1) // 2
+        for half_batch in (batch[:middle], batch[middle:]):
+            try:
+                self.post_batch(half_batch, failed_recs_file, num_records)
+            except TransformationRecordFailedError as exception:
+                self.handle_generic_exception(
+                    exception, "", half_batch, num_records, failed_recs_file
+                )
+
+    async def post_batch_async(self, request_arguments: dict, num_records_in_batch: int):
+        """Posts a batch on the concurrent poster's event loop.
 
-    def post_batch(self, batch, failed_recs_file, num_records, recursion_depth=0):
-        response = self.do_post(batch)
+        Retries wait without holding up the other batches in flight. The payload is built
+        by the main thread, before the batch is handed over.
+
+        Args:
+            request_arguments (dict): The body and headers, from get_request_arguments
+            num_records_in_batch (int): The number of records in the batch
+
+        Returns:
+            httpx.Response: The last response from FOLIO
+        """
+        url = self.folio_client.okapi_url + self.api_info["api_endpoint"]
+        return await self.retry_policy.call_async(
+            self.rate_limiter.limit_async(
+                lambda: self.concurrent_poster.client.post(url, **request_arguments),
+                num_records_in_batch,
+            ),
+            f"Posting {num_records_in_batch} records",
+        )
+
+    def handle_batch_response(
+        self, response: httpx.Response, batch, failed_recs_file, num_records
+    ):
         if response.status_code == 201:
             logging.info(
                 (
                     "Posting successful! Total rows: %s Total failed: %s "
                     "in %ss "
-                    "Batch Size: %s Request size: %s "
+                    "Batch Size: %s Request size: %s Sent: %s"
                 ),
                 num_records,
                 self.num_failures,
                 response.elapsed.total_seconds(),
                 len(batch),
                 get_req_size(response),
+                self.get_bytes_sent(),
             )
         elif response.status_code == 200:
             json_report = json.loads(response.text)
@@ -322,7 +945,7 @@ class BatchPoster(MigrationTaskBase):
                 (
                     "Posting successful! Total rows: %s Total failed: %s "
                     "created: %s updated: %s in %ss Batch Size: %s Request size: %s "
-                    "Message from server: %s"
+                    "Sent: %s Message from server: %s"
                 ),
                 num_records,
                 self.num_failures,
@@ -331,8 +954,11 @@ class BatchPoster(MigrationTaskBase):
                 response.elapsed.total_seconds(),
                 len(batch),
                 get_req_size(response),
+                self.get_bytes_sent(),
                 json_report.get("message", ""),
             )
+        elif response.status_code == 422 and self.task_configuration.bisect_failed_batches:
+            self.bisect_failed_batch(response, batch, failed_recs_file, num_records)
         elif response.status_code == 422:
             resp = json.loads(response.text)
             raise TransformationRecordFailedError(
@@ -346,24 +972,6 @@ class BatchPoster(MigrationTaskBase):
             # Likely a json parsing error
             logging.error(response.text)
             raise TransformationProcessError("", "HTTP 400. Somehting is wrong. Quitting")
-        elif self.task_configuration.object_type == "SRS" and response.status_code >= 500:
-            logging.info(
-                "Post failed. Size: %s Waiting 30s until reposting. Number of tries: %s of 5",
-                get_req_size(response),
-                recursion_depth,
-            )
-            logging.info(response.text)
-            time.sleep(30)
-            if recursion_depth > 4:
-                raise TransformationRecordFailedError(
-                    "",
-                    f"HTTP {response.status_code}\t"
-                    f"Request size: {get_req_size(response)}"
-                    f"{datetime.utcnow().isoformat()} UTC\n",
-                    response.text,
-                )
-            else:
-                self.post_batch(batch, failed_recs_file, num_records, recursion_depth + 1)
         elif (
             response.status_code == 413 and "DB_ALLOW_SUPPRESS_OPTIMISTIC_LOCKING" in response.text
         ):
@@ -387,21 +995,128 @@ class BatchPoster(MigrationTaskBase):
                 resp,
             )
 
-    def do_post(self, batch):
-        path = self.api_info["api_endpoint"]
-        url = self.folio_client.okapi_url + path
+    def get_payload(self, batch) -> bytes:
+        """Serializes the batch into the payload expected by the endpoint
+
+        Records read with raw_payloads are already serialized, and are spliced into the
+        payload with _version and snapshotId added as needed.
+
+        Args:
+            batch (list): The records to post
+
+        Returns:
+            bytes: The serialized payload
+        """
+        if self.task_configuration.raw_payloads:
+            return b"".join(self.get_payload_chunks(batch))
         if self.api_info["object_name"] == "users":
             payload = {self.api_info["object_name"]: list(batch), "totalRecords": len(batch)}
         elif self.api_info["total_records"]:
             payload = {"records": list(batch), "totalRecords": len(batch)}
         else:
             payload = {self.api_info["object_name"]: batch}
+        return json.dumps(payload).encode("utf-8")
+
+    def get_payload_chunks(self, batch):
+        """Serializes the batch one record at a time
+
+        Joined, the chunks are the same bytes as get_payload returns, so the payload can be
+        compressed as it is serialized without building it in full first.
+
+        Args:
+            batch (list): The records to post
+
+        Yields:
+            bytes: The payload, in chunks
+        """
+        if self.task_configuration.raw_payloads:
+            records = (self.prepare_raw_record(record) for record in batch)
+            separator, key_separator = b",", b":"
+        else:
+            records = (json.dumps(record).encode("utf-8") for record in batch)
+            separator, key_separator = b", ", b": "
+        if self.api_info["object_name"] == "users" or self.api_info["total_records"]:
+            name = b"users" if self.api_info["object_name"] == "users" else b"records"
+            suffix = b']%s"totalRecords"%s%d}' % (separator, key_separator, len(batch))
+        else:
+            name = self.api_info["object_name"].encode("utf-8")
+            suffix = b"]}"
+        yield b'{"%s"%s[' % (name, key_separator)
+        for index, record in enumerate(records):
+            if index:
+                yield separator
+            yield record
+        yield suffix
+
+    def get_request_arguments(self, batch, headers: dict) -> dict:
+        """Builds the body and headers for posting the batch
+
+        With compress_requests, the payload is gzipped as it is serialized. The size of the
+        uncompressed payload is kept in the request extensions, for logging.
+
+        Args:
+            batch (list): The records to post
+            headers (dict): The Okapi headers to send
+
+        Returns:
+            dict: Keyword arguments for httpx post
+        """
+        if not self.task_configuration.compress_requests:
+            payload = self.get_payload(batch)
+            self.count_bytes_sent(len(payload), len(payload))
+            return {
+                "content": payload,
+                "headers": headers,
+                "extensions": {"uncompressed_size": len(payload)},
+            }
+        payload, uncompressed_size = gzip_chunks(self.get_payload_chunks(batch))
+        self.count_bytes_sent(len(payload), uncompressed_size)
+        return {
+            "content": payload,
+            "headers": {**headers, "content-encoding": "gzip"},
+            "extensions": {"uncompressed_size": uncompressed_size},
+        }
+
+    def count_bytes_sent(self, sent_size: int, uncompressed_size: int):
+        self.bytes_sent += sent_size
+        self.uncompressed_bytes_sent += uncompressed_size
+
+    def get_bytes_sent(self) -> str:
+        """Describes the bytes sent so far and the average rate since posting started
+
+        Returns:
+            str: Like 12.50MB (1.25MB/s)
+        """
+        seconds = max(time.monotonic() - self.posting_started, 0.001)
+        return (
+            f"{get_human_readable(self.bytes_sent)} "
+            f"({get_human_readable(self.bytes_sent / seconds)}/s)"
+        )
+
+    def do_post(self, batch):
+        path = self.api_info["api_endpoint"]
+        url = self.folio_client.okapi_url + path
+        request_arguments = self.get_request_arguments(batch, self.folio_client.okapi_headers)
         if self.http_client and not self.http_client.is_closed:
-            return self.http_client.post(
-                url, json=payload, headers=self.folio_client.okapi_headers
+            return self.retry_policy.call(
+                self.rate_limiter.limit(
+                    lambda: self.http_client.post(url, **request_arguments), len(batch)
+                ),
+                f"Posting {len(batch)} records",
             )
         else:
-            return httpx.post(url, headers=self.okapi_headers, json=payload, timeout=None)
+            return self.retry_policy.call(
+                self.rate_limiter.limit(
+                    lambda: httpx.post(
+                        url,
+                        content=request_arguments["content"],
+                        headers=request_arguments["headers"],
+                        timeout=self.request_timeout,
+                    ),
+                    len(batch),
+                ),
+                f"Posting {len(batch)} records",
+            )
 
     def wrap_up(self):
         logging.info("Done. Wrapping up")
@@ -421,10 +1136,35 @@ class BatchPoster(MigrationTaskBase):
         else:
             logging.info("Done posting %s records. %s failed", self.num_posted, self.num_failures)
 
+        self.retry_policy.add_to_migration_report(self.migration_report)
+        if self.rate_limiter.seconds_waited:
+            self.migration_report.add(
+                "GeneralStatistics",
+                i18n.t("Seconds waited for the rate limiter"),
+                round(self.rate_limiter.seconds_waited),
+            )
         run = "second time" if self.performing_rerun else "first time"
         self.migration_report.set("GeneralStatistics", f"Records processed {run}", self.processed)
         self.migration_report.set("GeneralStatistics", f"Records posted {run}", self.num_posted)
         self.migration_report.set("GeneralStatistics", f"Failed to post {run}", self.num_failures)
+        if self.bytes_sent:
+            seconds = max(time.monotonic() - self.posting_started, 0.001)
+            self.migration_report.set(
+                "GeneralStatistics",
+                f"Bytes sent {run}",
+                get_human_readable(self.bytes_sent),
+            )
+            self.migration_report.set(
+                "GeneralStatistics",
+                f"Bytes sent per second {run}",
+                get_human_readable(self.bytes_sent / seconds),
+            )
+            if self.uncompressed_bytes_sent != self.bytes_sent:
+                self.migration_report.set(
+                    "GeneralStatistics",
+                    f"Bytes before compression {run}",
+                    get_human_readable(self.uncompressed_bytes_sent),
+                )
         self.rerun_run()
         with open(self.folder_structure.migration_reports_file, "w+") as report_file:
             self.migration_report.write_migration_report(
@@ -442,12 +1182,14 @@ class BatchPoster(MigrationTaskBase):
             )
             try:
                 self.task_configuration.batch_size = 1
+                self.task_configuration.adaptive_batch_size = False
                 self.task_configuration.files = [
                     FileDefinition(file_name=str(self.folder_structure.failed_recs_path.name))
                 ]
                 temp_report = copy.deepcopy(self.migration_report)
                 temp_start = self.start_datetime
                 self.task_configuration.rerun_failed_records = False
+                self.task_configuration.resume = False
                 self.__init__(self.task_configuration, self.library_configuration)
                 self.performing_rerun = True
                 self.migration_report = temp_report
@@ -476,11 +1218,22 @@ class BatchPoster(MigrationTaskBase):
         try:
             url = f"{self.folio_client.okapi_url}/source-storage/snapshots"
             if self.http_client and not self.http_client.is_closed:
-                res = self.http_client.post(
-                    url, json=snapshot, headers=self.folio_client.okapi_headers
+                res = self.retry_policy.call(
+                    lambda: self.http_client.post(
+                        url, json=snapshot, headers=self.folio_client.okapi_headers
+                    ),
+                    "Posting the snapshot",
                 )
             else:
-                res = httpx.post(url, headers=self.okapi_headers, json=snapshot, timeout=None)
+                res = self.retry_policy.call(
+                    lambda: httpx.post(
+                        url,
+                        headers=self.okapi_headers,
+                        json=snapshot,
+                        timeout=self.request_timeout,
+                    ),
+                    "Posting the snapshot",
+                )
             res.raise_for_status()
             logging.info("Posted Snapshot to FOLIO: %s", json.dumps(snapshot, indent=4))
             get_url = f"{self.folio_client.okapi_url}/source-storage/snapshots/{self.snapshot_id}"
@@ -489,9 +1242,19 @@ class BatchPoster(MigrationTaskBase):
                 logging.info("Sleeping while waiting for the snapshot to get created")
                 time.sleep(5)
                 if self.http_client and not self.http_client.is_closed:
-                    res = self.http_client.get(get_url, headers=self.folio_client.okapi_headers)
+                    res = self.retry_policy.call(
+                        lambda: self.http_client.get(
+                            get_url, headers=self.folio_client.okapi_headers
+                        ),
+                        "Fetching the snapshot",
+                    )
                 else:
-                    res = httpx.get(get_url, headers=self.okapi_headers, timeout=None)
+                    res = self.retry_policy.call(
+                        lambda: httpx.get(
+                            get_url, headers=self.okapi_headers, timeout=self.request_timeout
+                        ),
+                        "Fetching the snapshot",
+                    )
                 if res.status_code == 200:
                     getted = True
                 else:
@@ -505,11 +1268,22 @@ class BatchPoster(MigrationTaskBase):
         try:
             url = f"{self.folio_client.okapi_url}/source-storage/snapshots/{self.snapshot_id}"
             if self.http_client and not self.http_client.is_closed:
-                res = self.http_client.put(
-                    url, json=snapshot, headers=self.folio_client.okapi_headers
+                res = self.retry_policy.call(
+                    lambda: self.http_client.put(
+                        url, json=snapshot, headers=self.folio_client.okapi_headers
+                    ),
+                    "Committing the snapshot",
                 )
             else:
-                res = httpx.put(url, headers=self.okapi_headers, json=snapshot, timeout=None)
+                res = self.retry_policy.call(
+                    lambda: httpx.put(
+                        url,
+                        headers=self.okapi_headers,
+                        json=snapshot,
+                        timeout=self.request_timeout,
+                    ),
+                    "Committing the snapshot",
+                )
             res.raise_for_status()
             logging.info("Posted Committed snapshot to FOLIO: %s", json.dumps(snapshot, indent=4))
         except Exception:
@@ -522,6 +1296,264 @@ class BatchPoster(MigrationTaskBase):
             sys.exit(1)
 
 
+class RetryPolicy:
+    """Retries failing requests with exponential backoff and jitter.
+
+    Requests are retried when the response has one of the retryable status codes or when the
+    request raises one of the retryable exceptions, until max_retries retries have been made
+    or the next attempt would start more than max_elapsed_seconds after the first one. The
+    number of retries per reason and the time lost on failed attempts and waits are tallied,
+    from whichever thread the requests are made.
+    """
+
+    retryable_exceptions = (httpx.TransportError,)
+
+    def __init__(
+        self,
+        max_retries: int,
+        backoff_seconds: float,
+        max_backoff_seconds: float,
+        max_elapsed_seconds: float,
+        retryable_status_codes: List[int],
+    ):
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.max_elapsed_seconds = max_elapsed_seconds
+        self.retryable_status_codes = set(retryable_status_codes)
+        self.retries: dict = {}
+        self.wasted_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def get_wait(self, attempt: int, started: float) -> Optional[float]:
+        """Returns the number of seconds to wait before the next attempt, or None to give up
+
+        Args:
+            attempt (int): The number of the failed attempt, starting at 0
+            started (float): time.monotonic() of the first attempt
+
+        Returns:
+            Optional[float]: The wait in seconds, or None if the request should not be retried
+        """
+        if attempt >= self.max_retries:
+            return None
+        wait = random.uniform(  # noqa: S311
+            0, min(self.max_backoff_seconds, self.backoff_seconds * 2**attempt)
+        )
+        if time.monotonic() + wait - started > self.max_elapsed_seconds:
+            return None
+        return wait
+
+    def record_retry(self, reason: str, wasted_seconds: float):
+        with self.lock:
+            self.retries[reason] = self.retries.get(reason, 0) + 1
+            self.wasted_seconds += wasted_seconds
+
+    def check_attempt(self, attempt, started, attempt_started, description, response, exception):
+        if exception is not None:
+            if not isinstance(exception, self.retryable_exceptions):
+                return None
+            reason = type(exception).__name__
+        elif response.status_code in self.retryable_status_codes:
+            reason = f"HTTP {response.status_code}"
+        else:
+            return None
+        wait = self.get_wait(attempt, started)
+        if wait is not None:
+            logging.info(
+                "%s failed (%s). Retrying in %.1fs. Retry %s of %s",
+                description,
+                reason,
+                wait,
+                attempt + 1,
+                self.max_retries,
+            )
+            self.record_retry(reason, time.monotonic() - attempt_started + wait)
+        return wait
+
+    def call(self, send, description: str) -> httpx.Response:
+        """Makes a request through send(), retrying it according to the policy
+
+        Args:
+            send: Callable making the request and returning the response
+            description (str): What the request does, for the log
+
+        Returns:
+            httpx.Response: The first response that should not be retried, or the last one
+
+        Raises:
+            exception: The exception from the last attempt, if it raised one
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt_started = time.monotonic()
+            response = exception = None
+            try:
+                response = send()
+            except Exception as ee:
+                exception = ee
+            wait = self.check_attempt(
+                attempt, started, attempt_started, description, response, exception
+            )
+            if wait is None:
+                if exception is not None:
+                    raise exception
+                return response
+            time.sleep(wait)
+            attempt += 1
+
+    async def call_async(self, send, description: str) -> httpx.Response:
+        """Awaits a request from send(), retrying it according to the policy
+
+        Args:
+            send: Callable returning an awaitable request
+            description (str): What the request does, for the log
+
+        Returns:
+            httpx.Response: The first response that should not be retried, or the last one
+
+        Raises:
+            exception: The exception from the last attempt, if it raised one
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt_started = time.monotonic()
+            response = exception = None
+            try:
+                response = await send()
+            except Exception as ee:
+                exception = ee
+            wait = self.check_attempt(
+                attempt, started, attempt_started, description, response, exception
+            )
+            if wait is None:
+                if exception is not None:
+                    raise exception
+                return response
+            await asyncio.sleep(wait)
+            attempt += 1
+
+    def add_to_migration_report(self, migration_report: MigrationReport):
+        with self.lock:
+            for reason, count in self.retries.items():
+                migration_report.add(
+                    "Retries", i18n.t("Retries after %{reason}", reason=reason), count
+                )
+            if self.retries:
+                migration_report.add(
+                    "Retries",
+                    i18n.t("Seconds lost to failed attempts and waits"),
+                    round(self.wasted_seconds),
+                )
+
+
+class PostingJournal:
+    """Journal of how far into each file BatchPoster has posted the records.
+
+    Every acknowledged batch appends the last row number and the byte offset following it to
+    the journal file, which is flushed and fsync'd so that it survives a crash. When resuming,
+    the last entry per file tells where to seek to.
+    """
+
+    def __init__(self, journal_path: Path, resume: bool):
+        self.journal_path = journal_path
+        self.checkpoints: dict = {}
+        if resume and journal_path.is_file():
+            with open(journal_path) as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logging.info("Skipping incomplete journal entry %s", line)
+                        continue
+                    self.checkpoints[entry["file"]] = (entry["row"], entry["offset"])
+            logging.info("Resuming from journal %s", journal_path)
+        elif resume:
+            logging.info("No journal found at %s. Starting from the beginning", journal_path)
+        self.journal_file = open(journal_path, "a" if resume else "w")
+
+    def get_checkpoint(self, file_name: str) -> tuple:
+        return self.checkpoints.get(file_name, (0, 0))
+
+    def commit(self, file_name: str, row_number: int, offset: int):
+        self.checkpoints[file_name] = (row_number, offset)
+        self.journal_file.write(
+            json.dumps({"file": file_name, "row": row_number, "offset": offset}) + "\n"
+        )
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+
+    def close(self):
+        self.journal_file.close()
+
+
+class BatchSizeController:
+    """Chooses batch sizes using additive increase and multiplicative decrease (AIMD).
+
+    The batch size grows by a tenth of the starting size every time FOLIO responds within the
+    target time, and is halved on slow responses and failures, within the given bounds.
+    """
+
+    def __init__(
+        self, batch_size: int, min_batch_size: int, max_batch_size: int, target_seconds: float
+    ):
+        self.min_batch_size = min(min_batch_size, batch_size)
+        self.max_batch_size = max(max_batch_size, batch_size)
+        self.target_seconds = target_seconds
+        self.increase_step = max(1, round(batch_size / 10))
+        self.batch_size = batch_size
+
+    def record_success(self, elapsed_seconds: float) -> int:
+        if elapsed_seconds <= self.target_seconds:
+            self.batch_size = min(self.max_batch_size, self.batch_size + self.increase_step)
+        else:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        return self.batch_size
+
+    def record_failure(self) -> int:
+        self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        return self.batch_size
+
+
+class ConcurrentPoster:
+    """Runs an asyncio event loop with a shared httpx.AsyncClient in a background thread.
+
+    BatchPoster submits coroutines to it and collects the results from the main thread, which
+    lets a number of requests be in flight while the file is read and responses are handled.
+
+    Args:
+        timeout (Optional[float]): Seconds to wait for a response, or None to wait forever
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="ConcurrentPoster", daemon=True
+        )
+        self.thread.start()
+        self.client: httpx.AsyncClient = self.submit(self.create_client(timeout)).result()
+
+    @staticmethod
+    async def create_client(timeout: Optional[float]):
+        return httpx.AsyncClient(timeout=timeout)
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    async def shutdown(self):
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*pending, return_exceptions=True)
+        await self.client.aclose()
+
+    def close(self):
+        self.submit(self.shutdown()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
 def get_api_info(object_type: str, use_safe: bool = True):
     choices = {
         "Extradata": {
@@ -648,6 +1680,41 @@ def get_extradata_endpoint(object_name: str, string_object: str):
     return object_types[object_name]
 
 
+def get_error_message(response: httpx.Response) -> str:
+    try:
+        return json.loads(response.text)["errors"][0]["message"]
+    except (ValueError, KeyError, IndexError, TypeError):
+        return response.text
+
+
+def get_extradata_prerequisite(object_name: str, string_object: str) -> Optional[tuple]:
+    """Returns the key of the extradata object that has to be posted before this one, if any
+
+    Args:
+        object_name (str): The extradata object type
+        string_object (str): The serialized extradata object
+
+    Returns:
+        Optional[tuple]: (object name, id) of the object this object refers to
+    """
+    prerequisites = {
+        "course": ("courselisting", "courseListingId"),
+        "instructor": ("courselisting", "courseListingId"),
+        "interfaceCredential": ("interfaces", "interfaceId"),
+        "feefineaction": ("account", "accountId"),
+    }
+    if object_name not in prerequisites:
+        return None
+    prerequisite_name, id_property = prerequisites[object_name]
+    return (prerequisite_name, json.loads(string_object).get(id_property))
+
+
+def get_extradata_key(object_name: str, string_object: str) -> Optional[tuple]:
+    if object_name in ["courselisting", "interfaces", "account"]:
+        return (object_name, json.loads(string_object).get("id"))
+    return None
+
+
 def get_human_readable(size, precision=2):
     suffixes = ["B", "KB", "MB", "GB", "TB"]
     suffix_index = 0
@@ -658,8 +1725,30 @@ def get_human_readable(size, precision=2):
 
 
 def get_req_size(response: httpx.Response):
-    size = response.request.method
-    size += str(response.request.url)
-    size += "\r\n".join(f"{k}{v}" for k, v in response.request.headers.items())
-    size += response.request.content.decode("utf-8") or ""
-    return get_human_readable(len(size.encode("utf-8")))
+    sent_size = len(response.request.content)
+    uncompressed_size = response.request.extensions.get("uncompressed_size", sent_size)
+    if uncompressed_size == sent_size:
+        return get_human_readable(sent_size)
+    return (
+        f"{get_human_readable(sent_size)} "
+        f"({get_human_readable(uncompressed_size)} uncompressed)"
+    )
+
+
+def gzip_chunks(chunks) -> tuple:
+    """Gzips the chunks one at a time, as they are produced
+
+    Args:
+        chunks: Iterable of bytes
+
+    Returns:
+        tuple: The gzipped bytes and the number of bytes before compression
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    compressed = []
+    uncompressed_size = 0
+    for chunk in chunks:
+        uncompressed_size += len(chunk)
+        compressed.append(compressor.compress(chunk))
+    compressed.append(compressor.flush())
+    return b"".join(compressed), uncompressed_size
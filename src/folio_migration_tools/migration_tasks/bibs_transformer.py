@@ -144,6 +144,18 @@ class BibsTransformer(MigrationTaskBase):
                 ),
             ),
         ] = False
+        workers: Annotated[
+            int,
+            Field(
+                title="Worker processes",
+                description=(
+                    "The number of processes to transform the records in. With more than one, "
+                    "the records are transformed in parallel and saved in file order, with the "
+                    "same results as in a single process. Not available on Windows"
+                ),
+                ge=1,
+            ),
+        ] = 1
 
     @staticmethod
     def get_object_type() -> FOLIONamespaces:
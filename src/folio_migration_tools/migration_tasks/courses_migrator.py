@@ -20,11 +20,11 @@ from folio_migration_tools.mapping_file_transformation.mapping_file_mapper_base
     MappingFileMapperBase,
 )
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
-from folio_migration_tools.task_configuration import AbstractTaskConfiguration
+from folio_migration_tools.task_configuration import RefDataMappingTaskConfiguration
 
 
 class CoursesMigrator(MigrationTaskBase):
-    class TaskConfiguration(AbstractTaskConfiguration):
+    class TaskConfiguration(RefDataMappingTaskConfiguration):
         name: str
         composite_course_map_path: str
         migration_task_type: str
@@ -82,13 +82,15 @@ class CoursesMigrator(MigrationTaskBase):
             / self.task_configuration.courses_file.file_name
         )
         logging.info("Processing %s", full_path)
+        if self.task_configuration.pre_resolve_ref_data_values:
+            self.mapper.pre_resolve_ref_data_file(full_path)
         start = time.time()
         with open(full_path, encoding="utf-8-sig") as records_file:
             for idx, record in enumerate(self.mapper.get_objects(records_file, full_path)):
                 try:
                     if idx == 0:
                         logging.info("First legacy record:")
-                        logging.info(json.dumps(record, indent=4))
+                        logging.info(json.dumps(dict(record), indent=4))
                         self.mapper.verify_legacy_record(record, idx)
                     folio_rec, legacy_id = self.mapper.do_map(
                         record, f"row {idx}", FOLIONamespaces.course
@@ -123,6 +125,7 @@ class CoursesMigrator(MigrationTaskBase):
                 self.print_progress(idx, start)
 
     def wrap_up(self):
+        self.mapper.log_ref_data_mapping_statistics()
         self.extradata_writer.flush()
         with open(self.folder_structure.migration_reports_file, "w+") as report_file:
             self.mapper.migration_report.write_migration_report(
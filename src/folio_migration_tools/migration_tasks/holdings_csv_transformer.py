@@ -31,14 +31,14 @@ from folio_migration_tools.mapping_file_transformation.mapping_file_mapper_base
 )
 from folio_migration_tools.marc_rules_transformation.hrid_handler import HRIDHandler
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
-from folio_migration_tools.task_configuration import AbstractTaskConfiguration
+from folio_migration_tools.task_configuration import RefDataMappingTaskConfiguration
 
 csv.field_size_limit(int(ctypes.c_ulong(-1).value // 2))
 csv.register_dialect("tsv", delimiter="\t")
 
 
 class HoldingsCsvTransformer(MigrationTaskBase):
-    class TaskConfiguration(AbstractTaskConfiguration):
+    class TaskConfiguration(RefDataMappingTaskConfiguration):
         name: str
         migration_task_type: str
         hrid_handling: HridHandling
@@ -238,6 +238,7 @@ class HoldingsCsvTransformer(MigrationTaskBase):
         )
 
     def wrap_up(self):
+        self.mapper.log_ref_data_mapping_statistics()
         logging.info("Done. Transformer wrapping up...")
         self.extradata_writer.flush()
         if any(self.holdings):
@@ -294,6 +295,8 @@ class HoldingsCsvTransformer(MigrationTaskBase):
 
     def process_single_file(self, file_def: FileDefinition):
         full_path = self.folder_structure.data_folder / "items" / file_def.file_name
+        if self.task_config.pre_resolve_ref_data_values:
+            self.mapper.pre_resolve_ref_data_file(full_path)
         with open(full_path, encoding="utf-8-sig") as records_file:
             self.mapper.migration_report.add_general_statistics(
                 i18n.t("Number of files processed")
@@ -321,6 +324,7 @@ class HoldingsCsvTransformer(MigrationTaskBase):
                     elapsed = idx / (time.time() - start)
                     elapsed_formatted = "{0:.4g}".format(elapsed)
                     logging.info(f"{idx:,} records processed. Recs/sec: {elapsed_formatted} ")
+                self.write_partial_report(self.mapper.migration_report)
             self.total_records = records_processed
             logging.info(
                 f"Done processing {file_def.file_name} containing {self.total_records:,} records. "
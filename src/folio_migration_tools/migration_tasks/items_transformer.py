@@ -7,7 +7,6 @@ import sys
 import time
 import traceback
 import uuid
-import i18n
 from typing import Annotated
 from typing import List
 from typing import Optional
@@ -15,6 +14,7 @@ from typing import Optional
 from folio_uuid.folio_namespaces import FOLIONamespaces
 from pydantic import Field
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.helper import Helper
@@ -27,13 +27,13 @@ from folio_migration_tools.mapping_file_transformation.mapping_file_mapper_base
 )
 from folio_migration_tools.marc_rules_transformation.hrid_handler import HRIDHandler
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
-from folio_migration_tools.task_configuration import AbstractTaskConfiguration
+from folio_migration_tools.task_configuration import RefDataMappingTaskConfiguration
 
 csv.field_size_limit(int(ctypes.c_ulong(-1).value // 2))
 
 
 class ItemsTransformer(MigrationTaskBase):
-    class TaskConfiguration(AbstractTaskConfiguration):
+    class TaskConfiguration(RefDataMappingTaskConfiguration):
         name: str
         migration_task_type: str
         hrid_handling: HridHandling
@@ -222,17 +222,22 @@ class ItemsTransformer(MigrationTaskBase):
     def process_single_file(self, file_def: FileDefinition, results_file):
         full_path = self.folder_structure.legacy_records_folder / file_def.file_name
         logging.info("Processing %s", full_path)
+        if self.task_config.pre_resolve_ref_data_values:
+            self.mapper.pre_resolve_ref_data_file(full_path)
         records_in_file = 0
         with open(full_path, encoding="utf-8-sig") as records_file:
             self.mapper.migration_report.add_general_statistics(
-                i18n.t("Number of files processed")
+                i18n_cache.t("Number of files processed")
+            )
+            items_in_file = i18n_cache.t(
+                "Number of Legacy items in %{container}", container=file_def
             )
             start = time.time()
             for idx, record in enumerate(self.mapper.get_objects(records_file, full_path)):
                 try:
                     if idx == 0:
                         logging.info("First legacy record:")
-                        logging.info(json.dumps(record, indent=4))
+                        logging.info(json.dumps(dict(record), indent=4))
                         self.mapper.verify_legacy_record(record, idx)
                     folio_rec, legacy_id = self.mapper.do_map(
                         record, f"row {idx}", FOLIONamespaces.items
@@ -260,7 +265,7 @@ class ItemsTransformer(MigrationTaskBase):
                     # TODO: turn this into a asynchrounous task
                     Helper.write_to_file(results_file, folio_rec)
                     self.mapper.migration_report.add_general_statistics(
-                        i18n.t("Number of records written to disk")
+                        i18n_cache.t("Number of records written to disk")
                     )
                     self.mapper.report_folio_mapping(folio_rec, self.mapper.schema)
                 except TransformationProcessError as process_error:
@@ -274,14 +279,12 @@ class ItemsTransformer(MigrationTaskBase):
                     sys.exit(1)
                 except Exception as excepion:
                     self.mapper.handle_generic_exception(idx, excepion)
-                self.mapper.migration_report.add(
-                    "GeneralStatistics",
-                    i18n.t("Number of Legacy items in %{container}", container=file_def),
-                )
+                self.mapper.migration_report.add("GeneralStatistics", items_in_file)
                 self.mapper.migration_report.add_general_statistics(
-                    i18n.t("Number of Legacy items in total")
+                    i18n_cache.t("Number of Legacy items in total")
                 )
                 self.print_progress(idx, start)
+                self.write_partial_report(self.mapper.migration_report)
                 records_in_file = idx + 1
 
             logging.info(
@@ -331,11 +334,12 @@ class ItemsTransformer(MigrationTaskBase):
             del folio_rec["circulationNotes"]
 
     def wrap_up(self):
+        self.mapper.log_ref_data_mapping_statistics()
         logging.info("Done. Transformer wrapping up...")
         self.extradata_writer.flush()
         with open(self.folder_structure.migration_reports_file, "w") as migration_report_file:
             self.mapper.migration_report.write_migration_report(
-                i18n.t("Item transformation report"),
+                i18n_cache.t("Item transformation report"),
                 migration_report_file,
                 self.mapper.start_datetime,
             )
@@ -21,12 +21,13 @@ from folio_migration_tools.helper import Helper
 from folio_migration_tools.library_configuration import FileDefinition
 from folio_migration_tools.library_configuration import FolioRelease
 from folio_migration_tools.library_configuration import LibraryConfiguration
-from folio_migration_tools.mapping_file_transformation.mapping_file_mapper_base import (
-    MappingFileMapperBase,
+from folio_migration_tools.mapping_file_transformation.delimited_file_reader import (
+    DelimitedFileReader,
 )
 from folio_migration_tools.migration_report import MigrationReport
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
-from folio_migration_tools.task_configuration import AbstractTaskConfiguration
+from folio_migration_tools.rate_limiter import RateLimiter
+from folio_migration_tools.task_configuration import RateLimitedTaskConfiguration
 from folio_migration_tools.transaction_migration.legacy_loan import LegacyLoan
 from folio_migration_tools.transaction_migration.transaction_result import (
     TransactionResult,
@@ -34,7 +35,7 @@ from folio_migration_tools.transaction_migration.transaction_result import (
 
 
 class LoansMigrator(MigrationTaskBase):
-    class TaskConfiguration(AbstractTaskConfiguration):
+    class TaskConfiguration(RateLimitedTaskConfiguration):
         name: str
         migration_task_type: str
         open_loans_files: list[FileDefinition]
@@ -63,6 +64,9 @@ class LoansMigrator(MigrationTaskBase):
         self.migration_report = MigrationReport()
         self.valid_legacy_loans = []
         super().__init__(library_config, task_configuration)
+        self.rate_limiter = RateLimiter.from_task_configuration(
+            self.task_configuration, self.folder_structure
+        )
         self.circulation_helper = CirculationHelper(
             self.folio_client,
             task_configuration.fallback_service_point_id,
@@ -86,26 +90,24 @@ class LoansMigrator(MigrationTaskBase):
         for file_def in task_configuration.open_loans_files:
             loans_file_path = self.folder_structure.legacy_records_folder / file_def.file_name
             with open(loans_file_path, "r", encoding="utf-8") as loans_file:
-                total_rows, empty_rows, reader = MappingFileMapperBase._get_delimited_file_reader(
-                    loans_file, loans_file_path
+                reader = DelimitedFileReader(loans_file, loans_file_path)
+                self.semi_valid_legacy_loans.extend(
+                    self.load_and_validate_legacy_loans(
+                        reader,
+                        file_def.service_point_id or task_configuration.fallback_service_point_id,
+                    )
                 )
-                logging.info("Source data file contains %d rows", total_rows)
-                logging.info("Source data file contains %d empty rows", empty_rows)
+                logging.info("Source data file contains %d rows", reader.total_rows)
+                logging.info("Source data file contains %d empty rows", reader.empty_rows)
                 self.migration_report.set(
                     "GeneralStatistics",
                     f"Total rows in {loans_file_path.name}",
-                    total_rows,
+                    reader.total_rows,
                 )
                 self.migration_report.set(
                     "GeneralStatistics",
                     f"Empty rows in {loans_file_path.name}",
-                    empty_rows,
-                )
-                self.semi_valid_legacy_loans.extend(
-                    self.load_and_validate_legacy_loans(
-                        reader,
-                        file_def.service_point_id or task_configuration.fallback_service_point_id,
-                    )
+                    reader.empty_rows,
                 )
 
                 logging.info(
@@ -643,6 +645,7 @@ class LoansMigrator(MigrationTaskBase):
 
     def folio_put_post(self, url, data_dict, verb, action_description=""):
         full_url = f"{self.folio_client.okapi_url}{url}"
+        self.rate_limiter.acquire()
         try:
             if verb == "PUT":
                 resp = self.http_client.put(
@@ -23,11 +23,11 @@ from folio_migration_tools.mapping_file_transformation.mapping_file_mapper_base
     MappingFileMapperBase,
 )
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
-from folio_migration_tools.task_configuration import AbstractTaskConfiguration
+from folio_migration_tools.task_configuration import RefDataMappingTaskConfiguration
 
 
 class ManualFeeFinesTransformer(MigrationTaskBase):
-    class TaskConfiguration(AbstractTaskConfiguration):
+    class TaskConfiguration(RefDataMappingTaskConfiguration):
         name: str
         feefines_map: str
         migration_task_type: str
@@ -112,6 +112,8 @@ class ManualFeeFinesTransformer(MigrationTaskBase):
 
     def process_single_file(self, file_def: FileDefinition):
         full_path = self.folder_structure.legacy_records_folder / file_def.file_name
+        if self.task_configuration.pre_resolve_ref_data_values:
+            self.mapper.pre_resolve_ref_data_file(full_path)
         with open(full_path, encoding="utf-8-sig") as records_file:
             self.mapper.migration_report.add_general_statistics(
                 i18n.t("Number of files processed")
@@ -122,7 +124,7 @@ class ManualFeeFinesTransformer(MigrationTaskBase):
                 try:
                     if idx == 0:
                         logging.info("First legacy record:")
-                        logging.info(json.dumps(record, indent=4))
+                        logging.info(json.dumps(dict(record), indent=4))
 
                     self.mapper.report_legacy_mapping_no_schema(record)
 
@@ -160,6 +162,7 @@ class ManualFeeFinesTransformer(MigrationTaskBase):
                 self.print_progress(idx, start)
 
     def wrap_up(self):
+        self.mapper.log_ref_data_mapping_statistics()
         logging.info("Done. Transformer wrapping up...")
         self.extradata_writer.flush()
         with open(self.folder_structure.migration_reports_file, "w") as migration_report_file:
@@ -25,6 +25,12 @@ from folio_migration_tools.marc_rules_transformation.marc_file_processor import
 from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
     MARCReaderWrapper,
 )
+from folio_migration_tools.marc_rules_transformation.marc_worker_pool import (
+    MarcWorkerPool,
+)
+from folio_migration_tools.migration_report import MigrationReport
+
+PARTIAL_REPORT_INTERVAL_SECONDS = 300
 
 
 class MigrationTaskBase:
@@ -74,6 +80,7 @@ class MigrationTaskBase:
             logging.critical("Halting...")
             sys.exit(1)
         self.num_exeptions: int = 0
+        self.last_partial_report = time.monotonic()
         self.extradata_writer = ExtradataWriter(
             self.folder_structure.transformation_extra_data_path
         )
@@ -252,6 +259,22 @@ class MigrationTaskBase:
             elapsed_formatted = "{0:.4g}".format(elapsed)
             logging.info(f"{num_processed:,} records processed. Recs/sec: {elapsed_formatted} ")
 
+    def write_partial_report(self, migration_report: MigrationReport):
+        """Saves a snapshot of the migration report as JSON every few minutes, so that long
+        runs can be followed before the report is written
+
+        Args:
+            migration_report (MigrationReport): The report of the task
+        """
+        if time.monotonic() - self.last_partial_report < PARTIAL_REPORT_INTERVAL_SECONDS:
+            return
+        self.last_partial_report = time.monotonic()
+        snapshot_path = self.folder_structure.migration_report_snapshot_path
+        try:
+            migration_report.write_snapshot(snapshot_path)
+        except OSError as os_error:
+            logging.warning("Could not save the partial report to %s: %s", snapshot_path, os_error)
+
     def do_work_marc_transformer(
         self,
     ):
@@ -263,12 +286,22 @@ class MigrationTaskBase:
             self.processor = MarcFileProcessor(
                 self.mapper, self.folder_structure, created_records_file
             )
+            worker_pool = None
+            workers = getattr(self.task_configuration, "workers", 1)
+            if workers > 1 and MarcWorkerPool.is_available():
+                worker_pool = MarcWorkerPool(self.processor, workers)
+            elif workers > 1:
+                logging.warning(
+                    "Transforming in worker processes is not supported on this platform. "
+                    "Transforming in a single process."
+                )
             for file_def in self.task_configuration.files:
                 MARCReaderWrapper.process_single_file(
                     file_def,
                     self.processor,
                     self.folder_structure.failed_marc_recs_file,
                     self.folder_structure,
+                    worker_pool,
                 )
 
     def load_ref_data_mapping_file(
@@ -24,14 +24,14 @@ from folio_migration_tools.mapping_file_transformation.order_mapper import (
     CompositeOrderMapper,
 )
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
-from folio_migration_tools.task_configuration import AbstractTaskConfiguration
+from folio_migration_tools.task_configuration import RefDataMappingTaskConfiguration
 
 csv.field_size_limit(int(ctypes.c_ulong(-1).value // 2))
 
 
 # Read files and do some work
 class OrdersTransformer(MigrationTaskBase):
-    class TaskConfiguration(AbstractTaskConfiguration):
+    class TaskConfiguration(RefDataMappingTaskConfiguration):
         name: str
         migration_task_type: str
         files: List[FileDefinition]
@@ -148,6 +148,8 @@ class OrdersTransformer(MigrationTaskBase):
         return files
 
     def process_single_file(self, filename):
+        if self.task_config.pre_resolve_ref_data_values:
+            self.mapper.pre_resolve_ref_data_file(filename)
         with open(filename, encoding="utf-8-sig") as records_file, open(
             self.folder_structure.created_objects_path, "w+"
         ) as results_file:
@@ -163,7 +165,7 @@ class OrdersTransformer(MigrationTaskBase):
                     # Print first legacy record, then first transformed record
                     if idx == 0:
                         logging.info("First legacy record:")
-                        logging.info(json.dumps(record, indent=4))
+                        logging.info(json.dumps(dict(record), indent=4))
 
                     folio_rec, legacy_id = self.mapper.do_map(
                         record, f"row {idx}", FOLIONamespaces.orders, True
@@ -227,6 +229,7 @@ class OrdersTransformer(MigrationTaskBase):
                 sys.exit()
 
     def wrap_up(self):
+        self.mapper.log_ref_data_mapping_statistics()
         logging.info("Done. Wrapping up...")
         with open(self.folder_structure.migration_reports_file, "w") as migration_report_file:
             logging.info(
@@ -25,14 +25,14 @@ from folio_migration_tools.mapping_file_transformation.organization_mapper impor
     OrganizationMapper,
 )
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
-from folio_migration_tools.task_configuration import AbstractTaskConfiguration
+from folio_migration_tools.task_configuration import RefDataMappingTaskConfiguration
 
 csv.field_size_limit(int(ctypes.c_ulong(-1).value // 2))
 
 
 # Read files and do some work
 class OrganizationTransformer(MigrationTaskBase):
-    class TaskConfiguration(AbstractTaskConfiguration):
+    class TaskConfiguration(RefDataMappingTaskConfiguration):
         name: str
         migration_task_type: str
         files: List[FileDefinition]
@@ -131,6 +131,8 @@ class OrganizationTransformer(MigrationTaskBase):
         return files
 
     def process_single_file(self, filename):
+        if self.task_config.pre_resolve_ref_data_values:
+            self.mapper.pre_resolve_ref_data_file(filename)
         with open(filename, encoding="utf-8-sig") as records_file, open(
             self.folder_structure.created_objects_path, "w+"
         ) as results_file:
@@ -144,7 +146,7 @@ class OrganizationTransformer(MigrationTaskBase):
                 try:
                     if idx == 0:
                         logging.info("First legacy record:")
-                        logging.info(json.dumps(record, indent=4))
+                        logging.info(json.dumps(dict(record), indent=4))
 
                     folio_rec, legacy_id = self.mapper.do_map(
                         record, f"row {idx}", FOLIONamespaces.organizations
@@ -215,6 +217,7 @@ class OrganizationTransformer(MigrationTaskBase):
                 sys.exit()
 
     def wrap_up(self):
+        self.mapper.log_ref_data_mapping_statistics()
         logging.info("Done. Transformer wrapping up...")
         self.extradata_writer.flush()
         with open(self.folder_structure.migration_reports_file, "w") as migration_report_file:
@@ -17,12 +17,13 @@ from folio_migration_tools.library_configuration import FileDefinition
 from folio_migration_tools.library_configuration import LibraryConfiguration
 from folio_migration_tools.migration_report import MigrationReport
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
-from folio_migration_tools.task_configuration import AbstractTaskConfiguration
+from folio_migration_tools.rate_limiter import RateLimiter
+from folio_migration_tools.task_configuration import RateLimitedTaskConfiguration
 from folio_migration_tools.transaction_migration.legacy_reserve import LegacyReserve
 
 
 class ReservesMigrator(MigrationTaskBase):
-    class TaskConfiguration(AbstractTaskConfiguration):
+    class TaskConfiguration(RateLimitedTaskConfiguration):
         name: str
         migration_task_type: str
         course_reserve_file_path: FileDefinition
@@ -40,6 +41,9 @@ class ReservesMigrator(MigrationTaskBase):
         self.migration_report = MigrationReport()
         self.valid_reserves = []
         super().__init__(library_config, task_configuration)
+        self.rate_limiter = RateLimiter.from_task_configuration(
+            self.task_configuration, self.folder_structure
+        )
         with open(
             self.folder_structure.legacy_records_folder
             / task_configuration.course_reserve_file_path.file_name,
@@ -166,6 +170,7 @@ class ReservesMigrator(MigrationTaskBase):
 
     def folio_put_post(self, url, data_dict, verb, action_description=""):
         full_url = f"{self.folio_client.okapi_url}{url}"
+        self.rate_limiter.acquire()
         try:
             if verb == "PUT":
                 resp = httpx.put(
@@ -119,7 +119,7 @@ class UserTransformer(MigrationTaskBase):
                         try:
                             if num_users == 1:
                                 logging.info("First Legacy  user")
-                                logging.info(json.dumps(legacy_user, indent=4))
+                                logging.info(json.dumps(dict(legacy_user), indent=4))
                                 print_email_warning()
                             folio_user, index_or_id = self.mapper.do_map(
                                 legacy_user,
@@ -156,7 +156,7 @@ class UserTransformer(MigrationTaskBase):
                         except Exception as ee:
                             logging.error(ee)
                             logging.error(num_users)
-                            logging.error(json.dumps(legacy_user))
+                            logging.error(json.dumps(dict(legacy_user)))
                             self.mapper.migration_report.add_general_statistics(
                                 i18n.t("Failed user transformations")
                             )
@@ -169,6 +169,7 @@ class UserTransformer(MigrationTaskBase):
             sys.exit(1)
 
     def wrap_up(self):
+        self.mapper.log_ref_data_mapping_statistics()
         self.extradata_writer.flush()
         with open(self.folder_structure.migration_reports_file, "w") as migration_report_file:
             self.mapper.migration_report.write_migration_report(
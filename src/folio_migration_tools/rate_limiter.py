@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from folio_migration_tools.folder_structure import FolderStructure
+from folio_migration_tools.task_configuration import RateLimitedTaskConfiguration
+
+
+class TokenBucket:
+    """Token bucket refilled at rate tokens per second, holding at most one second worth.
+
+    Takes are never refused. A take larger than the tokens available puts the bucket in debt,
+    and the caller is told how long to wait for the debt to be paid back. That way requests
+    larger than the bucket (like a batch of 1000 records at 500 records/s) are paced correctly.
+    A rate of 0 or less means no limit.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def set_rate(self, rate: float):
+        self.refill()
+        self.rate = rate
+        self.tokens = min(self.tokens, rate)
+
+    def refill(self):
+        now = time.monotonic()
+        if self.rate > 0:
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float) -> float:
+        """Takes tokens from the bucket
+
+        Args:
+            amount (float): The number of tokens to take
+
+        Returns:
+            float: The number of seconds to wait before using the tokens
+        """
+        if self.rate <= 0:
+            return 0.0
+        self.refill()
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """Client-side rate limiter for requests to FOLIO, in requests and records per second.
+
+    The limits can be changed while a task is running by editing a JSON control file, like
+    {"requests_per_second": 10, "records_per_second": 2000}. The file is checked for changes
+    at most every control_file_check_seconds. Leaving out a limit, or setting it to 0, turns
+    that limit off. The limiter can be used from several threads and from asyncio code.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 0,
+        records_per_second: float = 0,
+        control_file_path: Optional[Path] = None,
+        control_file_check_seconds: float = 5.0,
+    ):
+        self.requests = TokenBucket(requests_per_second)
+        self.records = TokenBucket(records_per_second)
+        self.control_file_path = control_file_path
+        self.control_file_check_seconds = control_file_check_seconds
+        self.control_file_checked = 0.0
+        self.control_file_modified = 0.0
+        self.seconds_waited = 0.0
+        self.lock = threading.Lock()
+        if control_file_path:
+            logging.info("Rate limits can be changed at runtime in %s", control_file_path)
+            self.check_control_file()
+        self.log_limits()
+
+    @classmethod
+    def from_task_configuration(
+        cls, task_configuration: RateLimitedTaskConfiguration, folder_structure: FolderStructure
+    ) -> "RateLimiter":
+        """Creates the rate limiter of a task from its rate limit settings
+
+        Args:
+            task_configuration (RateLimitedTaskConfiguration): The configuration of the task
+            folder_structure (FolderStructure): The folders of the task. The control file is
+                resolved from the base folder.
+
+        Returns:
+            RateLimiter: The rate limiter
+        """
+        control_file = task_configuration.rate_limit_control_file
+        return cls(
+            task_configuration.requests_per_second,
+            getattr(task_configuration, "records_per_second", 0),
+            folder_structure.base_folder / control_file if control_file else None,
+        )
+
+    def log_limits(self):
+        logging.info(
+            "Rate limits: %s requests/s, %s records/s (0 means no limit)",
+            self.requests.rate,
+            self.records.rate,
+        )
+
+    def check_control_file(self):
+        self.control_file_checked = time.monotonic()
+        try:
+            modified = self.control_file_path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if modified == self.control_file_modified:
+            return
+        self.control_file_modified = modified
+        try:
+            with open(self.control_file_path) as control_file:
+                limits = json.load(control_file)
+            self.requests.set_rate(float(limits.get("requests_per_second", 0)))
+            self.records.set_rate(float(limits.get("records_per_second", 0)))
+        except (ValueError, TypeError, AttributeError, OSError) as error:
+            logging.error("Could not read rate limits from %s: %s", self.control_file_path, error)
+            return
+        logging.info("Read new rate limits from %s", self.control_file_path)
+        self.log_limits()
+
+    def reserve(self, records: int = 1) -> float:
+        """Reserves capacity for one request carrying the given number of records
+
+        Args:
+            records (int): The number of records in the request
+
+        Returns:
+            float: The number of seconds to wait before making the request
+        """
+        with self.lock:
+            if (
+                self.control_file_path
+                and time.monotonic() - self.control_file_checked > self.control_file_check_seconds
+            ):
+                self.check_control_file()
+            wait = max(self.requests.take(1), self.records.take(records))
+            self.seconds_waited += wait
+            return wait
+
+    def acquire(self, records: int = 1):
+        wait = self.reserve(records)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, records: int = 1):
+        wait = self.reserve(records)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def limit(self, send, records: int = 1):
+        """Wraps a request so that every call waits for the rate limits, retries included
+
+        Args:
+            send: Callable making the request
+            records (int): The number of records in the request
+
+        Returns:
+            Callable making the request when the rate limits allow it
+        """
+
+        def rate_limited_send():
+            self.acquire(records)
+            return send()
+
+        return rate_limited_send
+
+    def limit_async(self, send, records: int = 1):
+        """Wraps an asyncio request so that every call waits for the rate limits
+
+        Args:
+            send: Callable returning an awaitable request
+            records (int): The number of records in the request
+
+        Returns:
+            Callable returning the awaitable request, made when the rate limits allow it
+        """
+
+        async def rate_limited_send():
+            await self.acquire_async(records)
+            return await send()
+
+        return rate_limited_send
@@ -0,0 +1,54 @@
+from typing import Dict
+from typing import List
+from typing import Optional
+
+
+class RefDataIndex:
+    """Case insensitive lookups of FOLIO reference data, like locations or contributor types,
+    by code, name or id
+
+    Each reference data list is indexed once per key type, the first time it is looked up
+    by that key. A list is indexed again only if it is replaced or changes length, so values
+    that are not in the reference data are answered from the index as well. Each task has
+    one index, kept by its mapper, and the indexes go away with the mapper.
+    """
+
+    def __init__(self):
+        self.indexes: Dict[tuple, tuple] = {}
+
+    def get_index(self, ref_data: List[dict], key_type: str) -> Dict[str, dict]:
+        """Gets the index of a reference data list by code, name or id
+
+        Args:
+            ref_data (List[dict]): The reference data, like FolioClient.locations
+            key_type (str): The property to index the reference data by
+
+        Returns:
+            Dict[str, dict]: The reference data objects by the lower cased key. If keys are
+                repeated, the last object with the key is indexed.
+        """
+        key = (id(ref_data), key_type)
+        indexed = self.indexes.get(key)
+        if indexed is None or indexed[0] is not ref_data or indexed[1] != len(ref_data):
+            index = {r[key_type].lower(): r for r in ref_data}
+            self.indexes[key] = (ref_data, len(ref_data), index)
+            return index
+        return indexed[2]
+
+    def get_ref_data(self, ref_data: List[dict], key_type: str, key_value: str) -> Optional[dict]:
+        return self.get_index(ref_data, key_type).get(key_value.lower())
+
+    def get_ref_data_tuple(self, ref_data: List[dict], key_type: str, key_value: str) -> tuple:
+        """Gets the id and name of a reference data object
+
+        Args:
+            ref_data (List[dict]): The reference data, like FolioClient.locations
+            key_type (str): code, name or id
+            key_value (str): The code, name or id to look up. Case does not matter.
+
+        Returns:
+            tuple: The id and name of the object, or an empty tuple if not found
+        """
+        if ref_object := self.get_index(ref_data, key_type).get(key_value.lower()):
+            return (ref_object["id"], ref_object["name"])
+        return ()
@@ -25,3 +25,43 @@ class AbstractTaskConfiguration(BaseModel):
     class Config:
         alias_generator = to_camel
         allow_population_by_field_name = True
+
+
+class RateLimitedTaskConfiguration(AbstractTaskConfiguration):
+    requests_per_second: Annotated[
+        float,
+        Field(
+            description=(
+                "Upper limit for the number of requests per second made to FOLIO. "
+                "0 means no limit"
+            ),
+            ge=0,
+        ),
+    ] = 0
+    rate_limit_control_file: Annotated[
+        str,
+        Field(
+            description=(
+                'Path to a JSON file, like {"requests_per_second": 10}, that is checked '
+                "every few seconds while the task runs. Changing it changes the rate limits "
+                "without restarting the task. Tasks that also limit records per second read "
+                "records_per_second from it as well. Relative paths are resolved from the "
+                "base folder"
+            )
+        ),
+    ] = ""
+
+
+class RefDataMappingTaskConfiguration(AbstractTaskConfiguration):
+    pre_resolve_ref_data_values: Annotated[
+        bool,
+        Field(
+            title="Pre-resolve reference data values",
+            description=(
+                "Read each source file once before transforming it, and map each distinct "
+                "combination of legacy values in the reference data mappings up front, so "
+                "that the records only look the mapped values up. Combinations that are not "
+                "in the maps are logged before the transformation starts"
+            ),
+        ),
+    ] = False
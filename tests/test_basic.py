@@ -11,6 +11,7 @@ from folio_uuid import FolioUUID
 from pymarc import Field
 from pymarc.reader import MARCReader
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools import mapper_base
 from folio_migration_tools.marc_rules_transformation.holdings_statementsparser import (
     HoldingsStatementsParser,
@@ -56,6 +57,18 @@ def test_blurb_internationalization():
     assert i18n.t("blurbs.Introduction.title") == "Introduction"
 
 
+def test_cached_translations():
+    i18n.load_config(Path(__file__).parents[1] / "src/folio_migration_tools/i18n_config.py")
+    i18n_cache.translate.cache_clear()
+    for _ in range(3):
+        assert i18n_cache.t("blurbs.Introduction.title") == "Introduction"
+    assert i18n_cache.translate.cache_info().hits == 2
+    assert i18n_cache.t("Values in %{field}", field="003") == "Values in 003"
+    assert i18n_cache.t("Values in %{field}", field=1) == "Values in 1"
+    assert i18n_cache.t("Values in %{field}", field=True) == "Values in True"
+    assert i18n_cache.t("Values in %{field}", field=["001"]) == "Values in ['001']"
+
+
 def test_get_marc_record():
     file_path = "./tests/test_data/default/test_get_record.xml"
     record = pymarc.parse_xml_to_array(file_path)[0]
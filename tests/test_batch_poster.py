@@ -1,5 +1,17 @@
+import asyncio
+import gzip
+import json
+import time
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
 from folio_uuid.folio_namespaces import FOLIONamespaces
 
+from folio_migration_tools.library_configuration import FileDefinition
+from folio_migration_tools.library_configuration import FolioRelease
+from folio_migration_tools.library_configuration import LibraryConfiguration
 from folio_migration_tools.migration_tasks import batch_poster
 from folio_migration_tools.migration_tasks.batch_poster import BatchPoster
 
@@ -42,3 +54,463 @@ def test_get_extradata_endpoint_interface_credential():
         endpoint
         == "organizations-storage/interfaces/7e131c38-5384-44ed-9f4a-da6ca2f36498/credentials"
     )
+
+
+def mocked_batch_poster(
+    base_folder: Path, object_type: str, handler, **task_config
+) -> BatchPoster:
+    for folder in ["mapping_files", "iterations/test/source_data", "iterations/test/results"]:
+        (base_folder / folder).mkdir(parents=True, exist_ok=True)
+    (base_folder / "iterations/test/reports").mkdir(exist_ok=True)
+    (base_folder / ".gitignore").touch()
+    library_config = LibraryConfiguration(
+        okapi_url="http://okapi_url",
+        tenant_id="tenant",
+        okapi_username="user",
+        okapi_password="password",
+        folio_release=FolioRelease.orchid,
+        library_name="Batch Poster Tester Library",
+        log_level_debug=False,
+        iteration_identifier="test",
+        base_folder=base_folder,
+    )
+    task_config = {"files": [], "batch_size": 2, "retry_backoff_seconds": 0, **task_config}
+    with patch(
+        "folio_migration_tools.migration_tasks.migration_task_base.FolioClient"
+    ) as folio_client:
+        folio_client.return_value.okapi_url = "http://okapi_url"
+        folio_client.return_value.okapi_headers = {"x-okapi-tenant": "tenant"}
+        poster = BatchPoster(
+            BatchPoster.TaskConfiguration(
+                name="test",
+                migration_task_type="BatchPoster",
+                object_type=object_type,
+                **task_config,
+            ),
+            library_config,
+            use_logging=False,
+        )
+    poster.create_http_client = lambda: httpx.Client(
+        timeout=poster.request_timeout, transport=httpx.MockTransport(handler)
+    )
+    poster.http_client = poster.create_http_client()
+    return poster
+
+
+def test_dispatch_batch_concurrently_keeps_failed_records_in_order(tmp_path):
+    posted = []
+
+    def handler(request: httpx.Request):
+        batch = json.loads(request.content)["items"]
+        posted.append(batch)
+        status = 422 if batch[0]["id"] == "3" else 201
+        return httpx.Response(status, stream=httpx.ByteStream(json.dumps({"errors": []}).encode()))
+
+    poster = mocked_batch_poster(tmp_path, "Items", handler, max_concurrent_batches=2)
+    poster.concurrent_poster = batch_poster.ConcurrentPoster()
+    poster.concurrent_poster.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    failed_recs_file = StringIO()
+    try:
+        for i in range(0, 6, 2):
+            poster.dispatch_batch(
+                [{"id": str(i + 1)}, {"id": str(i + 2)}], failed_recs_file, i + 2
+            )
+            assert len(poster.batches_in_flight) <= 2
+        while poster.batches_in_flight:
+            poster.collect_oldest_batch(failed_recs_file)
+    finally:
+        poster.concurrent_poster.close()
+    assert len(posted) == 3
+    assert poster.failed_batches == 1
+    assert poster.num_failures == 2
+    assert failed_recs_file.getvalue() == '{"id": "3"}\n{"id": "4"}\n'
+
+
+def test_batch_size_controller_grows_and_shrinks_within_bounds():
+    controller = batch_poster.BatchSizeController(100, 10, 120, 2.0)
+    assert controller.record_success(0.5) == 110
+    assert controller.record_success(0.5) == 120
+    assert controller.record_success(0.5) == 120
+    assert controller.record_success(3.0) == 60
+    assert controller.record_failure() == 30
+    assert controller.record_failure() == 15
+    assert controller.record_failure() == 10
+    assert controller.record_failure() == 10
+
+
+def test_post_batch_splits_batch_on_413_when_adaptive(tmp_path):
+    posted_sizes = []
+
+    def handler(request: httpx.Request):
+        batch = json.loads(request.content)["items"]
+        posted_sizes.append(len(batch))
+        return httpx.Response(
+            413 if len(batch) > 2 else 201, stream=httpx.ByteStream(b"Request Entity Too Large")
+        )
+
+    poster = mocked_batch_poster(
+        tmp_path, "Items", handler, adaptive_batch_size=True, min_batch_size=1, max_batch_size=8
+    )
+    poster.batch_size = poster.batch_size_controller.batch_size = 8
+    failed_recs_file = StringIO()
+    poster.post_batch([{"id": str(i)} for i in range(8)], failed_recs_file, 8)
+    assert posted_sizes == [8, 4, 2, 2, 4, 2, 2]
+    assert poster.num_failures == 0
+    assert failed_recs_file.getvalue() == ""
+    assert poster.migration_report.report["BatchSizes"]["4"] == 2
+    assert poster.migration_report.report["BatchSizes"]["2"] == 4
+
+
+def test_post_batch_splits_batch_on_timeout_when_adaptive(tmp_path):
+    posted_sizes = []
+
+    def handler(request: httpx.Request):
+        batch = json.loads(request.content)["items"]
+        posted_sizes.append(len(batch))
+        if len(batch) > 2:
+            raise httpx.ReadTimeout("Timed out", request=request)
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    poster = mocked_batch_poster(
+        tmp_path,
+        "Items",
+        handler,
+        adaptive_batch_size=True,
+        max_batch_size=4,
+        max_retries=0,
+        request_timeout_seconds=30,
+    )
+    assert poster.create_http_client().timeout.read == 30
+    poster.batch_size = poster.batch_size_controller.batch_size = 4
+    poster.post_batch([{"id": str(i)} for i in range(4)], StringIO(), 4)
+    assert posted_sizes == [4, 2, 2]
+    assert poster.num_failures == 0
+    assert (
+        mocked_batch_poster(tmp_path, "Items", handler).create_http_client().timeout.read is None
+    )
+
+
+def test_bisect_failed_batch_writes_only_failing_records(tmp_path):
+    posted_sizes = []
+
+    def handler(request: httpx.Request):
+        batch = json.loads(request.content)["items"]
+        posted_sizes.append(len(batch))
+        if any(record["id"] in ["3", "6"] for record in batch):
+            body = {"errors": [{"message": "Bad record"}]}
+            return httpx.Response(422, stream=httpx.ByteStream(json.dumps(body).encode()))
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    poster = mocked_batch_poster(tmp_path, "Items", handler, bisect_failed_batches=True)
+    failed_recs_file = StringIO()
+    poster.post_batch([{"id": str(i)} for i in range(8)], failed_recs_file, 8)
+    assert posted_sizes == [8, 4, 2, 2, 1, 1, 4, 2, 2, 1, 1]
+    assert poster.num_failures == 2
+    assert failed_recs_file.getvalue() == (
+        '"Bad record"\t{"id": "3"}\n' '"Bad record"\t{"id": "6"}\n'
+    )
+
+
+def test_posting_journal_resumes_from_last_complete_entry(tmp_path):
+    journal_path = tmp_path / "posting_journal_test.jsonl"
+    journal = batch_poster.PostingJournal(journal_path, False)
+    journal.commit("a.json", 2, 120)
+    journal.commit("b.json", 4, 300)
+    journal.commit("a.json", 4, 250)
+    journal.close()
+    with open(journal_path, "a") as journal_file:
+        journal_file.write('{"file": "a.json", "ro')
+    resumed = batch_poster.PostingJournal(journal_path, True)
+    resumed.close()
+    assert resumed.get_checkpoint("a.json") == (4, 250)
+    assert resumed.get_checkpoint("b.json") == (4, 300)
+    assert resumed.get_checkpoint("c.json") == (0, 0)
+    assert batch_poster.PostingJournal(journal_path, False).get_checkpoint("a.json") == (0, 0)
+
+
+def test_dispatch_batch_acknowledges_rows_after_posting(tmp_path):
+    def handler(request: httpx.Request):
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    poster = mocked_batch_poster(tmp_path, "Items", handler)
+    poster.journal = batch_poster.PostingJournal(tmp_path / "journal.jsonl", False)
+    poster.unacknowledged_rows = {"a.json": (2, 40)}
+    poster.dispatch_batch([{"id": "1"}, {"id": "2"}], StringIO(), 2)
+    poster.journal.close()
+    assert poster.unacknowledged_rows == {}
+    assert (tmp_path / "journal.jsonl").read_text() == (
+        '{"file": "a.json", "row": 2, "offset": 40}\n'
+    )
+
+
+def test_do_work_resumes_from_the_journal(tmp_path):
+    posted = []
+
+    def handler(request: httpx.Request):
+        posted.extend(record["id"] for record in json.loads(request.content)["items"])
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    poster = mocked_batch_poster(
+        tmp_path,
+        "Items",
+        handler,
+        files=[FileDefinition(file_name="items.json")],
+        resume=True,
+    )
+    rows = [f'{{"id": "{i}"}}\n'.encode("utf-8") for i in range(1, 6)]
+    (poster.folder_structure.results_folder / "items.json").write_bytes(b"".join(rows))
+    journal_path = poster.folder_structure.results_folder / "posting_journal_test.jsonl"
+    offset = len(rows[0] + rows[1])
+    journal_path.write_text(json.dumps({"file": "items.json", "row": 2, "offset": offset}) + "\n")
+    poster.do_work()
+    assert posted == ["3", "4", "5"]
+    assert poster.processed == 5
+    assert poster.num_failures == 0
+    resumed = batch_poster.PostingJournal(journal_path, True)
+    resumed.close()
+    assert resumed.get_checkpoint("items.json") == (5, len(b"".join(rows)))
+
+
+def test_do_work_saves_partial_reports(tmp_path):
+    poster = mocked_batch_poster(
+        tmp_path,
+        "Items",
+        lambda request: httpx.Response(201, stream=httpx.ByteStream(b"")),
+        files=[FileDefinition(file_name="items.json")],
+    )
+    (poster.folder_structure.results_folder / "items.json").write_bytes(b'{"id": "1"}\n')
+    poster.folder_structure.migration_report_snapshot_path = tmp_path / "report.json"
+    poster.last_partial_report = float("-inf")
+    poster.migration_report.add("GeneralStatistics", "Records")
+    poster.do_work()
+    assert json.loads((tmp_path / "report.json").read_text())["GeneralStatistics"] == {
+        "blurb_id": "GeneralStatistics",
+        "Records": 1,
+    }
+
+
+def test_insert_json_property():
+    assert (
+        batch_poster.insert_json_property(b'{"id": "1"}', b'"_version":-1')
+        == b'{"id": "1","_version":-1}'
+    )
+    assert batch_poster.insert_json_property(b"{ }", b'"_version":-1') == b'{ "_version":-1}'
+    assert (
+        batch_poster.insert_json_property(b'{"a": {"b": 1}}\n', b'"c":2')
+        == b'{"a": {"b": 1},"c":2}\n'
+    )
+
+
+def test_raw_payloads_are_spliced_into_the_batch_payload(tmp_path):
+    def handler(request: httpx.Request):
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    poster = mocked_batch_poster(tmp_path, "SRS", handler, raw_payloads=True)
+    poster.snapshot_id = "snapshot-1"
+    poster.processed = 2
+    record = poster.read_raw_record(b'legacy_id\t{"id": "1", "snapshotId": "old"}\n')
+    assert record == b'{"id": "1", "snapshotId": "old"}'
+    payload = poster.get_payload([record, b'{"id": "2"}'])
+    assert payload == (
+        b'{"records":[{"id": "1", "snapshotId": "old","snapshotId":"snapshot-1"},'
+        b'{"id": "2","snapshotId":"snapshot-1"}],"totalRecords":2}'
+    )
+    assert json.loads(payload)["records"][0]["snapshotId"] == "snapshot-1"
+
+
+def test_raw_payloads_match_parsed_payloads(tmp_path):
+    def handler(request: httpx.Request):
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    records = [{"id": "1", "title": "Ä"}, {"id": "2"}]
+    for object_type in ["Instances", "Users", "SRS"]:
+        payloads = []
+        for raw_payloads in [False, True]:
+            poster = mocked_batch_poster(
+                tmp_path,
+                object_type,
+                handler,
+                batch_size=10,
+                raw_payloads=raw_payloads,
+                use_safe_inventory_endpoints=False,
+            )
+            poster.snapshot_id = "snapshot-1"
+            batch: list = []
+            for poster.processed, record in enumerate(records, start=2):
+                row = f"legacy_id\t{json.dumps(record)}\n"
+                batch = poster.post_record_batch(
+                    batch, StringIO(), row.encode("utf-8") if raw_payloads else row
+                )
+            payloads.append(json.loads(poster.get_payload(batch)))
+        assert payloads[0] == payloads[1]
+
+
+def test_raw_payloads_write_the_records_as_read_to_the_failed_records_file(tmp_path):
+    posted = []
+
+    def handler(request: httpx.Request):
+        posted.append(json.loads(request.content))
+        return httpx.Response(422, stream=httpx.ByteStream(b'{"errors": []}'))
+
+    poster = mocked_batch_poster(
+        tmp_path, "Items", handler, raw_payloads=True, use_safe_inventory_endpoints=False
+    )
+    failed_recs_file = StringIO()
+    batch: list = []
+    for poster.processed, row in enumerate([b'{"id": "1"}\n', b'{"id": "2"}\n'], start=1):
+        batch = poster.post_row(row, batch, failed_recs_file)
+    assert posted == [{"items": [{"id": "1", "_version": -1}, {"id": "2", "_version": -1}]}]
+    assert failed_recs_file.getvalue() == '{"id": "1"}\n{"id": "2"}\n'
+
+
+def test_payload_chunks_join_to_the_payload(tmp_path):
+    def handler(request: httpx.Request):
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    records = [{"id": "1", "title": "Ä"}, {"id": "2"}]
+    for object_type in ["Instances", "Users", "SRS"]:
+        for raw_payloads in [False, True]:
+            poster = mocked_batch_poster(tmp_path, object_type, handler, raw_payloads=raw_payloads)
+            batch = [json.dumps(r).encode("utf-8") for r in records] if raw_payloads else records
+            assert b"".join(poster.get_payload_chunks(batch)) == poster.get_payload(batch)
+            assert b"".join(poster.get_payload_chunks(batch[:0])) == poster.get_payload([])
+
+
+def test_compressed_requests_are_gzipped(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    records = [{"id": str(i), "title": "The same title"} for i in range(50)]
+    poster = mocked_batch_poster(tmp_path, "Instances", handler, compress_requests=True)
+    response = poster.do_post(records)
+    assert requests[0].headers["content-encoding"] == "gzip"
+    assert gzip.decompress(requests[0].content) == poster.get_payload(records)
+    assert response.request.extensions["uncompressed_size"] == len(poster.get_payload(records))
+    assert len(requests[0].content) < len(poster.get_payload(records))
+    assert "uncompressed" in batch_poster.get_req_size(response)
+
+
+def test_bytes_sent_are_counted_when_the_payload_is_built(tmp_path):
+    def handler(request: httpx.Request):
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    records = [{"id": str(i), "title": "The same title"} for i in range(50)]
+    poster = mocked_batch_poster(tmp_path, "Instances", handler)
+    poster.do_post(records)
+    poster.do_post(records)
+    assert (
+        poster.bytes_sent == poster.uncompressed_bytes_sent == 2 * len(poster.get_payload(records))
+    )
+    compressing_poster = mocked_batch_poster(
+        tmp_path, "Instances", handler, compress_requests=True
+    )
+    compressing_poster.do_post(records)
+    assert compressing_poster.uncompressed_bytes_sent == len(poster.get_payload(records))
+    assert compressing_poster.bytes_sent < compressing_poster.uncompressed_bytes_sent
+    assert compressing_poster.get_bytes_sent().endswith("/s)")
+
+
+def test_do_post_retries_transient_errors_for_all_object_types(tmp_path):
+    responses = [
+        httpx.ConnectError("Connection reset"),
+        httpx.Response(502, stream=httpx.ByteStream(b"Bad gateway")),
+        httpx.Response(201, stream=httpx.ByteStream(b"")),
+    ]
+
+    def handler(request: httpx.Request):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    poster = mocked_batch_poster(tmp_path, "Items", handler)
+    acquired = []
+    poster.rate_limiter.acquire = acquired.append
+    assert poster.do_post([{"id": "1"}]).status_code == 201
+    assert acquired == [1, 1, 1]
+    poster.retry_policy.add_to_migration_report(poster.migration_report)
+    assert poster.migration_report.report["Retries"]["Retries after ConnectError"] == 1
+    assert poster.migration_report.report["Retries"]["Retries after HTTP 502"] == 1
+
+
+def test_retry_policy_gives_up_after_max_retries(tmp_path):
+    attempts = []
+
+    def handler(request: httpx.Request):
+        attempts.append(request)
+        return httpx.Response(503, stream=httpx.ByteStream(b"Unavailable"))
+
+    poster = mocked_batch_poster(tmp_path, "Holdings", handler, max_retries=2)
+    assert poster.do_post([{"id": "1"}]).status_code == 503
+    assert len(attempts) == 3
+
+
+def test_retry_policy_does_not_retry_client_errors(tmp_path):
+    attempts = []
+
+    def handler(request: httpx.Request):
+        attempts.append(request)
+        return httpx.Response(422, stream=httpx.ByteStream(b"{}"))
+
+    poster = mocked_batch_poster(tmp_path, "Instances", handler)
+    assert poster.do_post([{"id": "1"}]).status_code == 422
+    assert len(attempts) == 1
+
+
+def test_retry_policy_stops_at_max_elapsed_time():
+    policy = batch_poster.RetryPolicy(10, 1, 1, 0, [500])
+    assert policy.get_wait(0, time.monotonic() - 1) is None
+    assert batch_poster.RetryPolicy(10, 1, 1, 100, [500]).get_wait(10, time.monotonic()) is None
+
+
+def test_retry_policy_call_async_retries():
+    responses = [httpx.Response(504), httpx.Response(201)]
+
+    async def send():
+        return responses.pop(0)
+
+    policy = batch_poster.RetryPolicy(3, 0, 0, 60, [504])
+    response = asyncio.run(policy.call_async(send, "Posting"))
+    assert response.status_code == 201
+    assert policy.retries == {"HTTP 504": 1}
+
+
+def test_concurrent_extradata_waits_for_prerequisites(tmp_path):
+    events = []
+
+    async def handler(request: httpx.Request):
+        name = request.url.path
+        events.append(("start", name))
+        if name.endswith("courselistings"):
+            await asyncio.sleep(0.2)
+        events.append(("end", name))
+        return httpx.Response(201, stream=httpx.ByteStream(b""))
+
+    poster = mocked_batch_poster(tmp_path, "Extradata", handler, max_concurrent_records=4)
+    poster.concurrent_poster = batch_poster.ConcurrentPoster()
+    poster.concurrent_poster.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    failed_recs_file = StringIO()
+    rows = [
+        'courselisting\t{"id": "cl1"}\n',
+        'notes\t{"id": "n1"}\n',
+        'instructor\t{"id": "i1", "courseListingId": "cl1"}\n',
+    ]
+    try:
+        for num, row in enumerate(rows, start=1):
+            poster.post_extra_data(row, num, failed_recs_file)
+        while poster.records_in_flight:
+            poster.collect_oldest_record(failed_recs_file)
+    finally:
+        poster.concurrent_poster.close()
+    instructors = "/coursereserves/courselistings/cl1/instructors"
+    assert events.index(("start", instructors)) > events.index(
+        ("end", "/coursereserves/courselistings")
+    )
+    assert events.index(("start", "/notes")) < events.index(
+        ("end", "/coursereserves/courselistings")
+    )
+    assert poster.num_posted == 3
+    assert batch_poster.get_extradata_prerequisite("notes", "{}") is None
@@ -23,7 +23,7 @@ def test_set_leader():
         record: Record = None
         record = next(reader)
         MARCReaderWrapper.set_leader(record, migration_report)
-        assert record.leader.endswith("4500")
+        assert str(record.leader).endswith("4500")
         assert record.leader[9] == "a"
         assert record.leader[10] == "2"
         assert record.leader[11] == "2"
@@ -0,0 +1,123 @@
+from unittest.mock import Mock
+
+from folio_migration_tools.marc_rules_transformation.compiled_rules import (
+    CompiledRule,
+)
+from folio_migration_tools.marc_rules_transformation.compiled_rules import (
+    CompiledTagRules,
+)
+
+
+class FakeConditions:
+    def condition_trim_period(self, legacy_id, value, parameter, marc_field):
+        return value.rstrip(".")
+
+    def condition_capitalize(self, legacy_id, value, parameter, marc_field):
+        return value.capitalize()
+
+
+def test_conditions_are_parsed_and_bound():
+    conditions = FakeConditions()
+    rule = CompiledRule(
+        {
+            "target": "identifiers.value",
+            "subfield": ["a", "z"],
+            "rules": [
+                {
+                    "conditions": [
+                        {
+                            "type": "trim_period, capitalize,not_there",
+                            "parameter": {"name": "ISBN"},
+                        }
+                    ]
+                }
+            ],
+        },
+        conditions,
+    )
+    assert rule.has_conditions
+    assert rule.target_key == "value"
+    assert [name for name, _ in rule.conditions] == ["trim_period", "capitalize", "not_there"]
+    assert rule.conditions[0][1].__func__ is FakeConditions.condition_trim_period
+    assert rule.conditions[2][1] is None
+    assert rule.parameter == {"name": "ISBN"}
+    assert rule.any_subfields
+    assert rule.delimited_subfields is None
+
+
+def test_values_to_add_are_converted():
+    rules = [
+        CompiledRule({"target": "t", "rules": [{"conditions": [], "value": value}]}, None)
+        for value in ["true", "false", "Text"]
+    ]
+    assert [rule.value for rule in rules] == [True, False, "Text"]
+    assert all(rule.has_value_to_add and not rule.has_conditions for rule in rules)
+
+
+def test_delimited_subfields_are_grouped():
+    rule = CompiledRule(
+        {
+            "target": "subjects",
+            "subfield": ["a", "b", "x", "y"],
+            "subFieldDelimiter": [
+                {"value": "--", "subfields": ["x", "y"]},
+                {"value": " ", "subfields": ["a", "b"]},
+            ],
+        },
+        None,
+    )
+    assert rule.delimited_subfields == [("--", ["x", "y"]), (" ", ["a", "b"])]
+
+
+def test_entities_and_alternative_mappings_are_compiled():
+    rule = CompiledRule(
+        {
+            "entityPerRepeatedSubfield": True,
+            "entity": [
+                {"target": "electronicAccess.uri", "subfield": ["u"]},
+                {
+                    "target": "electronicAccess.linkText",
+                    "subfield": ["y"],
+                    "alternativeMapping": {
+                        "target": "electronicAccess.materialsSpecification",
+                        "subfield": ["3"],
+                    },
+                },
+            ],
+        },
+        None,
+    )
+    assert rule.entity_parent == "electronicAccess"
+    assert rule.entity_per_repeated_subfield
+    assert [entity_rule.target_key for entity_rule in rule.entity] == ["uri", "linkText"]
+    assert rule.entity[1].alternative.target_key == "materialsSpecification"
+
+
+def test_tag_rules():
+    mappings = [
+        {"target": "a", "subfield": ["a"]},
+        {"target": "b", "subfield": ["b"], "ignoreSubsequentFields": True},
+    ]
+    conditions = Mock()
+    tag_rules = CompiledTagRules(mappings, conditions)
+    assert len(tag_rules) == 2
+    assert [rule.target for rule in tag_rules] == ["a", "b"]
+    assert tag_rules.ignore_subsequent_fields
+    assert tag_rules.mappings is mappings
+    assert not CompiledTagRules([], conditions)
+
+
+def test_field_replacements_keep_the_first_match():
+    rule = CompiledRule(
+        {
+            "fieldReplacementBy3Digits": True,
+            "fieldReplacementRule": [
+                {"sourceDigits": "100", "targetField": "700"},
+                {"sourceDigits": "100", "targetField": "710"},
+                {"sourceDigits": "245", "targetField": "246"},
+            ],
+        },
+        None,
+    )
+    assert rule.field_replacement_by_3_digits
+    assert rule.field_replacements == {"100": "700", "245": "246"}
@@ -1,10 +1,17 @@
 from unittest.mock import Mock
 
+from folio_migration_tools.library_configuration import FolioRelease
+from folio_migration_tools.marc_rules_transformation.compiled_rules import (
+    ConditionParameter,
+)
 from folio_migration_tools.marc_rules_transformation.conditions import Conditions
+from folio_migration_tools.marc_rules_transformation.conditions import PURE_CONDITIONS
 from folio_migration_tools.marc_rules_transformation.rules_mapper_bibs import (
     BibsRulesMapper,
 )
 from folio_migration_tools.migration_report import MigrationReport
+from folio_migration_tools.ref_data_index import RefDataIndex
+from folio_migration_tools.test_infrastructure import mocked_classes
 from folioclient import FolioClient
 from pymarc import Field, Subfield
 
@@ -29,6 +36,40 @@ def test_condition_trim_punctuation():
     assert res4 == "Rockefeller, John D."
 
 
+def test_pure_conditions_are_memoized():
+    conditions = Conditions(
+        mocked_classes.mocked_folio_client(), Mock(), "auth", FolioRelease.orchid
+    )
+    assert {"trim_punctuation", "char_select", "remove_substring"} <= PURE_CONDITIONS
+    for _ in range(3):
+        assert conditions.condition_trim_punctuation("id", "Smith, John.", None, None) == (
+            "Smith, John"
+        )
+    parameter = ConditionParameter({"from": 0, "to": 2})
+    same_parameter = ConditionParameter({"to": 2, "from": 0})
+    assert conditions.condition_char_select("id", "abc", parameter, None) == "ab"
+    assert conditions.condition_char_select("id", "abc", same_parameter, None) == "ab"
+    assert conditions.condition_char_select("id", "abc", {"from": 1, "to": 3}, None) == "bc"
+    statistics = conditions.get_memoization_statistics()
+    assert statistics["trim_punctuation"].hits == 2
+    assert statistics["trim_punctuation"].misses == 1
+    assert statistics["char_select"].hits == 1
+    assert statistics["char_select"].misses == 1
+    assert "capitalize" not in statistics
+
+
+def test_conditions_look_up_reference_data_in_the_index_of_the_mapper():
+    mapper = Mock()
+    mapper.ref_data_index = RefDataIndex()
+    conditions = Conditions(
+        mocked_classes.mocked_folio_client(), mapper, "auth", FolioRelease.orchid
+    )
+    ref_data = [{"id": "id1", "code": "A", "name": "Name A"}]
+    assert conditions.get_ref_data_tuple_by_code(ref_data, "test", "a") == ("id1", "Name A")
+    assert mapper.ref_data_index.get_index(ref_data, "code") == {"a": ref_data[0]}
+    assert len(mapper.ref_data_index.indexes) == 1
+
+
 def test_condition_concat_subfields_by_name():
     mock = Mock(spec=Conditions)
     parameter = {"subfieldsToConcat": ["q"], "subfieldsToStopConcat": ["z"]}
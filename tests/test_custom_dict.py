@@ -0,0 +1,36 @@
+import csv
+import io
+import json
+
+from folio_migration_tools.custom_dict import InsensitiveDictReader
+from folio_migration_tools.custom_dict import LegacyRow
+from folio_migration_tools.custom_dict import LegacyRowReader
+
+
+def test_legacy_rows_read_like_dict_reader_rows():
+    data = "id,title,id\n1,Title,2\n\n3,Short\n4,Long,5,6\n"
+    rows = list(LegacyRowReader(io.StringIO(data)))
+    dict_rows = list(csv.DictReader(io.StringIO(data)))
+    assert rows == dict_rows
+    assert isinstance(rows[0], LegacyRow)
+    assert [type(row) for row in rows[1:]] == [dict, dict]
+    assert rows[0]["id"] == "2"
+    assert rows[0].get("title") == "Title"
+    assert rows[0].get("barcode", "") == ""
+    assert "title" in rows[0] and "barcode" not in rows[0]
+    assert list(rows[0].items()) == list(dict_rows[0].items())
+    assert json.dumps(dict(rows[0])) == json.dumps(dict_rows[0])
+
+
+def test_legacy_rows_share_the_header_map():
+    csv.register_dialect("tsv", delimiter="\t")
+    reader = LegacyRowReader(io.StringIO("a\tb\n1\t2\n3\t4\n"), dialect="tsv")
+    first, second = reader
+    assert first.field_index is second.field_index
+    assert (first["b"], second["b"]) == ("2", "4")
+
+
+def test_insensitive_dict_reader_reads_legacy_rows():
+    first, *_ = InsensitiveDictReader(io.StringIO(" Item_Barcode ,Comment\n123,Hi\n"))
+    assert isinstance(first, LegacyRow)
+    assert first["item_barcode"] == "123"
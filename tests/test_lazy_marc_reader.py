@@ -0,0 +1,89 @@
+import glob
+
+from pymarc import Field
+from pymarc import MARCReader
+from pymarc import Record
+from pymarc import Subfield
+
+from folio_migration_tools.marc_rules_transformation.lazy_marc_reader import LazyField
+from folio_migration_tools.marc_rules_transformation.lazy_marc_reader import (
+    LazyMARCReader,
+)
+from folio_migration_tools.marc_rules_transformation.lazy_marc_reader import LazyRecord
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    MARCReaderWrapper,
+)
+from folio_migration_tools.migration_report import MigrationReport
+
+
+def make_utf8_record(indicators=("1", "0")) -> bytes:
+    record = Record(force_utf8=True)
+    record.add_field(Field(tag="001", data="bib1"))
+    record.add_field(
+        Field(
+            tag="245",
+            indicators=list(indicators),
+            subfields=[Subfield("a", "Tïtle /"), Subfield("c", "Åuthor.")],
+        )
+    )
+    record.add_field(Field(tag="999", indicators=[" ", " "], subfields=[Subfield("a", "local")]))
+    return record.as_marc()
+
+
+def test_lazy_records_are_the_same_as_pymarc_records():
+    for path in glob.glob("./tests/test_data/**/*.mrc", recursive=True):
+        with open(path, "rb") as marc_file:
+            marc_data = marc_file.read()
+        reader = MARCReader(marc_data, to_unicode=True, permissive=True)
+        lazy_reader = LazyMARCReader(marc_data, to_unicode=True, permissive=True)
+        reader.hide_utf8_warnings = lazy_reader.hide_utf8_warnings = True
+        for record, lazy_record in zip(reader, lazy_reader):
+            if record is None:
+                assert lazy_record is None
+                assert type(lazy_reader.current_exception) is type(reader.current_exception)
+                continue
+            assert lazy_record.as_dict() == record.as_dict()
+            assert str(lazy_record) == str(record)
+            assert lazy_record.as_dict() == record.as_dict()
+            assert lazy_record.as_marc() == record.as_marc()
+
+
+def test_subfields_are_split_when_first_used():
+    record = next(LazyMARCReader(make_utf8_record(), to_unicode=True, permissive=True))
+    assert isinstance(record, LazyRecord)
+    field_245, field_999 = record.get_fields("245", "999")
+    assert isinstance(field_245, LazyField)
+    assert (field_245.indicator1, field_245.indicator2) == ("1", "0")
+    assert field_245._subfields is None
+    assert field_245["a"] == "Tïtle /"
+    assert field_245._subfields is not None
+    assert field_999._subfields is None
+    field_245.add_subfield("b", "subtitle")
+    assert record.as_dict()["fields"][1]["245"]["subfields"][-1] == {"b": "subtitle"}
+    assert field_999._subfields is None
+    assert record["001"].data == "bib1"
+
+
+def test_fields_with_broken_indicators_are_decoded_by_pymarc():
+    marc = make_utf8_record(indicators=("1", "0")).replace(b"10\x1faT", b"1\xc3\xa9\x1faT")
+    record = next(LazyMARCReader(marc, to_unicode=True, permissive=True))
+    assert record is None
+    pymarc_reader = MARCReader(marc, to_unicode=True, permissive=True)
+    assert next(pymarc_reader) is None
+
+
+def test_set_leader_fixes_leader_in_place():
+    record = next(LazyMARCReader(make_utf8_record(), to_unicode=True, permissive=True))
+    record.leader[10:12] = "00"
+    record.leader[20:] = "0000"
+    leader = record.leader
+    migration_report = MigrationReport()
+    MARCReaderWrapper.set_leader(record, migration_report)
+    assert record.leader is leader
+    assert record.leader[9:12] == "a22"
+    assert record.leader[20:] == "4500"
+    assert len(migration_report.report["LeaderManipulation"]) == 4
+
+    record.leader = f"{record.leader[:9]} {record.leader[10:]}"
+    MARCReaderWrapper.set_leader(record, migration_report)
+    assert str(record.leader)[9] == "a"
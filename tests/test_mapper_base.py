@@ -4,7 +4,12 @@ from unittest.mock import MagicMock, Mock
 import pytest
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.extradata_writer import ExtradataWriter
+from folio_migration_tools.library_configuration import LibraryConfiguration
 from folio_migration_tools.mapper_base import MapperBase
+from folio_migration_tools.mapping_file_transformation.ref_data_mapping import BoundedCache
+from folio_migration_tools.mapping_file_transformation.ref_data_mapping import (
+    RefDataMapping,
+)
 from folio_migration_tools.migration_report import MigrationReport
 from folio_migration_tools.test_infrastructure import mocked_classes
 from folio_uuid.folio_namespaces import FOLIONamespaces
@@ -169,3 +174,41 @@ def test_add_legacy_identifier_to_admin_note_dupe():
     mapper = Mock(spec=MapperBase)
     MapperBase.add_legacy_id_to_admin_note(mapper, folio_record, legacy_id)
     assert f"{MapperBase.legacy_id_template} legacy_ID" in folio_record["administrativeNotes"]
+
+
+def test_get_mapped_ref_data_value_resolves_distinct_values_once():
+    mapper = MapperBase(Mock(spec=LibraryConfiguration), mocked_classes.mocked_folio_client())
+    ref_data_mapping = Mock(spec=RefDataMapping)
+    ref_data_mapping.mapped_legacy_keys = ["location"]
+    ref_data_mapping.resolved = BoundedCache(10)
+    ref_data_mapping.blurb_id = "LocationMapping"
+    ref_data_mapping.key_type = "code"
+    ref_data_mapping.default_id = "default_id"
+    ref_data_mapping.default_name = "default"
+    ref_data_mapping.get_ref_data_mapping.side_effect = lambda legacy_object: (
+        {"location": "l_1", "folio_code": "L1", "folio_id": "l_1_id"}
+        if legacy_object["location"] == "l_1"
+        else None
+    )
+    ref_data_mapping.get_hybrid_mapping.return_value = None
+    for location in ["l_1", "l_2", "l_1", "l_2", "l_1"]:
+        MapperBase.get_mapped_ref_data_value(
+            mapper, ref_data_mapping, {"location": location}, "row 1"
+        )
+    assert ref_data_mapping.get_ref_data_mapping.call_count == 2
+    assert mapper.get_mapped_ref_data_value(ref_data_mapping, {"location": "l_1"}, "") == "l_1_id"
+    assert mapper.get_mapped_ref_data_value(ref_data_mapping, {"location": "l_2"}, "") == (
+        "default_id"
+    )
+    assert (
+        mapper.get_mapped_ref_data_value(
+            ref_data_mapping, {"location": "l_2"}, "", prevent_default=True
+        )
+        == ""
+    )
+    assert mapper.migration_report.report["LocationMapping"] == {
+        "blurb_id": "LocationMapping",
+        "l_1 -> L1": 4,
+        "Unmapped (Default value was set) -- l_2 -> default": 3,
+        'Not to be mapped. (No default) -- l_2 -> ""': 1,
+    }
@@ -1,6 +1,7 @@
 import csv
 import functools
 import io
+import logging
 from pathlib import Path
 from unittest.mock import Mock
 
@@ -10,9 +11,17 @@ from folioclient import FolioClient
 
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.library_configuration import LibraryConfiguration
+from folio_migration_tools.mapping_file_transformation.delimited_file_reader import (
+    DelimitedFileReader,
+)
 from folio_migration_tools.mapping_file_transformation.mapping_file_mapper_base import (
     MappingFileMapperBase,
 )
+from folio_migration_tools.mapping_file_transformation.mapping_plan import MappingPlan
+from folio_migration_tools.mapping_file_transformation.ref_data_mapping import BoundedCache
+from folio_migration_tools.mapping_file_transformation.ref_data_mapping import (
+    RefDataMapping,
+)
 from folio_migration_tools.migration_report import MigrationReport
 from folio_migration_tools.migration_tasks.items_transformer import ItemsTransformer
 from folio_migration_tools.test_infrastructure import mocked_classes
@@ -1616,17 +1625,14 @@ value_1,value_2,value_3
 """
 
 
-def test__get_delimited_file_reader():
+def test_delimited_file_reader():
     csv.register_dialect("tsv", delimiter="\t")
     with io.StringIO(delimited_data_tab) as delimited_data_tab_file:
         with io.StringIO(delimited_data_comma) as delimited_data_comma_file:
             delimited_file_tab = (Path("/tmp/delimited_data.tsv"), delimited_data_tab_file)
             delimited_file_comma = (Path("/tmp/delimited_data.csv"), delimited_data_comma_file)
             for file in (delimited_file_tab, delimited_file_comma):
-                total_rows, empty_rows, reader = MappingFileMapperBase._get_delimited_file_reader(
-                    file[1], file[0]
-                )
-                assert total_rows == 2 and empty_rows == 1
+                reader = DelimitedFileReader(file[1], file[0])
                 for idx, row in enumerate(reader):
                     if idx == 0:
                         for key in row.keys():
@@ -1637,6 +1643,94 @@ def test__get_delimited_file_reader():
                             and row["header_2"] == "value_2"
                             and row["header_3"] == "value_3"
                         )
+                assert reader.total_rows == 2 and reader.empty_rows == 1
+                assert reader.estimated_rows is None
+
+
+def test_delimited_file_reader_estimates_rows(tmp_path):
+    file_path = tmp_path / "delimited_data.csv"
+    file_path.write_text("header_1,header_2\n" + "value_1,value_2\n" * 100)
+    with open(file_path) as delimited_file:
+        reader = DelimitedFileReader(delimited_file, file_path)
+        rows = iter(reader)
+        for _ in range(10):
+            next(rows)
+        assert 90 <= reader.estimated_rows <= 110
+        assert len(list(rows)) == 90
+        assert reader.total_rows == 100 and reader.empty_rows == 0
+
+
+def test_delimited_file_reader_estimates_rows_of_non_ascii_files(tmp_path):
+    file_path = tmp_path / "delimited_data.csv"
+    file_path.write_text("header_1,header_2\n" + "åäö,ÅÄÖ\n" * 100, encoding="utf-8-sig")
+    with open(file_path, encoding="utf-8-sig") as delimited_file:
+        reader = DelimitedFileReader(delimited_file, file_path)
+        rows = iter(reader)
+        for _ in range(10):
+            next(rows)
+        assert 90 <= reader.estimated_rows <= 110
+        assert len(list(rows)) == 90
+
+
+def test_get_objects_reports_row_counts(mocked_folio_client: FolioClient):
+    record_map = {"data": [{"folio_field": "legacyIdentifier", "legacy_field": "id", "value": ""}]}
+    mapper = MyTestableFileMapper({"properties": {}}, record_map, mocked_folio_client)
+    with io.StringIO(delimited_data_comma) as delimited_data_comma_file:
+        rows = list(mapper.get_objects(delimited_data_comma_file, Path("/tmp/data.csv")))
+    assert len(rows) == 2
+    assert mapper.migration_report.report["GeneralStatistics"]["Number of rows in data.csv"] == 2
+    assert (
+        mapper.migration_report.report["GeneralStatistics"]["Number of empty rows in data.csv"]
+        == 1
+    )
+
+
+def test_get_objects_reports_row_counts_of_partly_read_files(mocked_folio_client: FolioClient):
+    record_map = {"data": [{"folio_field": "legacyIdentifier", "legacy_field": "id", "value": ""}]}
+    mapper = MyTestableFileMapper({"properties": {}}, record_map, mocked_folio_client)
+    with io.StringIO("id\n1\n2\n3\n") as source_file:
+        rows = mapper.get_objects(source_file, Path("/tmp/data.csv"))
+        assert next(rows)["id"] == "1"
+        rows.close()
+    assert mapper.migration_report.report["GeneralStatistics"]["Number of rows in data.csv"] == 1
+    assert (
+        mapper.migration_report.report["GeneralStatistics"]["Number of empty rows in data.csv"]
+        == 0
+    )
+
+
+def test_pre_resolve_ref_data_mappings_logs_unmapped_values(mocked_folio_client, caplog):
+    record_map = {"data": [{"folio_field": "legacyIdentifier", "legacy_field": "id", "value": ""}]}
+    mapper = MyTestableFileMapper({"properties": {}}, record_map, mocked_folio_client)
+    mapper.location_mapping = Mock(spec=RefDataMapping)
+    mapper.location_mapping.name = "locations"
+    mapper.location_mapping.key_type = "code"
+    mapper.location_mapping.default_id = "main_id"
+    mapper.location_mapping.default_name = "Main"
+    mapper.location_mapping.mapped_legacy_keys = ["location", "collection"]
+    mapper.location_mapping.resolved = BoundedCache(10)
+    mapper.location_mapping.find_mapping.side_effect = lambda values: values[0] == "l_1"
+    mapper.location_mapping.get_ref_data_mapping.side_effect = lambda legacy_object: (
+        {"folio_code": "L1", "folio_id": "l_1_id"}
+        if legacy_object["location"].strip() == "l_1"
+        else None
+    )
+    mapper.location_mapping.get_hybrid_mapping.return_value = None
+    legacy_objects = [
+        {"location": "l_1 ", "collection": "c"},
+        {"location": "l_2", "collection": "c"},
+        {"location": "l_2", "collection": "c "},
+        {"location": "l_3"},
+    ]
+    with caplog.at_level(logging.INFO):
+        mapper.pre_resolve_ref_data_mappings(legacy_objects)
+    assert mapper.location_mapping.find_mapping.call_count == 2
+    assert "locations mapping: 2 distinct legacy values, 1 of them not in the map" in caplog.text
+    assert "['l_2 - c']" in caplog.text
+    assert mapper.location_mapping.resolved.get(("id", False, ("l_1 ", "c")))[1] == "l_1_id"
+    assert mapper.location_mapping.resolved.get(("id", False, ("l_2", "c ")))[1] == "main_id"
+    assert mapper.location_mapping.resolved.get(("name", False, ("l_2", "c")))[1] == "Main"
+    assert ("id", False, ("l_3", None)) not in mapper.location_mapping.resolved
 
 
 def test_map_string_first_level(mocked_folio_client: FolioClient):
@@ -4075,6 +4169,7 @@ def test_get_prop_same_as_get_legacy_value_mapped_value():
     )
     mock_self = Mock(spec=MappingFileMapperBase)
     mock_self.record_map = {"data": [mapping_file_entry]}
+    mock_self.mapping_plan = MappingPlan(mock_self.record_map["data"])
     mock_self.mapped_from_legacy_data = {"title": "title"}
     mock_self.migration_report = MigrationReport()
     mock_self.library_configuration = Mock(spec=LibraryConfiguration)
@@ -4102,6 +4197,7 @@ def test_get_prop_concatenated():
 
     mock_self = Mock(spec=MappingFileMapperBase)
     mock_self.record_map = {"data": mapping_file_entries}
+    mock_self.mapping_plan = MappingPlan(mock_self.record_map["data"])
     mock_self.mapped_from_legacy_data = {"title": ["firstname", "lastname"]}
     mock_self.migration_report = MigrationReport()
     mock_self.library_configuration = Mock(spec=LibraryConfiguration)
@@ -0,0 +1,41 @@
+from folio_migration_tools.mapping_file_transformation.mapping_plan import MappingPlan
+
+
+def get_data():
+    return [
+        {"folio_field": "legacyIdentifier", "legacy_field": "id", "value": ""},
+        {"folio_field": "title", "legacy_field": "first", "value": ""},
+        {"folio_field": "title", "legacy_field": "last", "value": ""},
+        {"folio_field": "notes[0].note", "legacy_field": "note", "value": ""},
+        {"folio_field": "notes[0].staffOnly", "legacy_field": "Not mapped", "value": True},
+        {"folio_field": "notes[1].note", "legacy_field": "", "value": ""},
+        {"folio_field": "notes[10].note", "legacy_field": "note10", "value": ""},
+    ]
+
+
+def test_map_entries_are_the_set_entries_in_map_order():
+    data = get_data()
+    plan = MappingPlan(data)
+    assert plan.get_map_entries("title") == (data[1], data[2])
+    assert plan.get_map_entries("notes[0].staffOnly") == (data[4],)
+    assert plan.get_map_entries("notes[1].note") == ()
+    assert plan.get_map_entries("barcode") == ()
+
+
+def test_folio_keys_and_legacy_fields():
+    plan = MappingPlan(get_data())
+    assert plan.folio_keys == [
+        "legacyIdentifier",
+        "title",
+        "title",
+        "notes[0].note",
+        "notes[0].staffOnly",
+        "notes[10].note",
+    ]
+    assert plan.get_folio_keys_starting_with("notes[1") == ("notes[10].note",)
+    assert plan.get_folio_keys_starting_with("notes[0") == (
+        "notes[0].note",
+        "notes[0].staffOnly",
+    )
+    assert plan.get_legacy_field("title") == "first"
+    assert plan.get_legacy_field("notes[1].note") == ""
@@ -13,6 +13,7 @@ from folio_migration_tools.marc_rules_transformation.rules_mapper_holdings impor
     RulesMapperHoldings,
 )
 from folio_migration_tools.migration_report import MigrationReport
+from folio_migration_tools.ref_data_index import RefDataIndex
 from folio_migration_tools.test_infrastructure import mocked_classes
 
 
@@ -22,6 +23,7 @@ def test_add_mapped_location_code_to_record_one_852_no_b():
     mock_mapper.migration_report = MigrationReport()
     mock_mapper.folio_client = mocked_classes.mocked_folio_client()
     mock_processor.mapper = mock_mapper
+    mock_processor.ref_data_index = RefDataIndex()
     record = Record()
     record.add_field(
         Field(
@@ -46,6 +48,7 @@ def test_add_mapped_location_code_to_record_one_852_two_b():
     mock_mapper.migration_report = MigrationReport()
     mock_mapper.folio_client = mocked_classes.mocked_folio_client()
     mock_processor.mapper = mock_mapper
+    mock_processor.ref_data_index = RefDataIndex()
     record = Record()
     record.add_field(
         Field(
@@ -71,6 +74,7 @@ def test_add_mapped_location_code_to_record_one_852_one_b():
     mock_mapper.migration_report = MigrationReport()
     mock_mapper.folio_client = mocked_classes.mocked_folio_client()
     mock_processor.mapper = mock_mapper
+    mock_processor.ref_data_index = RefDataIndex()
     record = Record()
     record.add_field(
         Field(
@@ -95,6 +99,7 @@ def test_add_mapped_location_code_to_record_two_852_one_b():
     mock_mapper.migration_report = MigrationReport()
     mock_mapper.folio_client = mocked_classes.mocked_folio_client()
     mock_processor.mapper = mock_mapper
+    mock_processor.ref_data_index = RefDataIndex()
     record = Record()
     record.add_field(
         Field(
@@ -126,6 +131,7 @@ def test_add_mapped_location_code_to_record_no_852():
     mock_mapper.migration_report = MigrationReport()
     mock_mapper.folio_client = mocked_classes.mocked_folio_client()
     mock_processor.mapper = mock_mapper
+    mock_processor.ref_data_index = RefDataIndex()
     record = Record()
     folio_rec = {"permanentLocationId": "new_loc"}
     with pytest.raises(TransformationRecordFailedError):
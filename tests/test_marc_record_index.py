@@ -0,0 +1,81 @@
+import io
+import os
+from unittest.mock import Mock
+
+import pytest
+from pymarc import Field
+from pymarc import MARCReader
+from pymarc import Record
+from pymarc import Subfield
+
+from folio_migration_tools.library_configuration import FileDefinition
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    MARCReaderWrapper,
+)
+from folio_migration_tools.marc_rules_transformation.marc_record_index import (
+    MarcRecordIndex,
+)
+from folio_migration_tools.marc_rules_transformation.marc_record_index import (
+    read_raw_records,
+)
+
+
+def make_record(number: int) -> bytes:
+    record = Record()
+    record.add_field(Field(tag="001", data=f"bib{number}"))
+    record.add_field(
+        Field(tag="245", indicators=["0", "0"], subfields=[Subfield("a", f"title {number}")])
+    )
+    raw_record = record.as_marc()
+    return raw_record[:9] + b" " + raw_record[10:]
+
+
+def records_file(tmp_path, ending=b""):
+    marc_path = tmp_path / "records.mrc"
+    marc_path.write_bytes(b"".join(make_record(number) for number in range(10)) + ending)
+    return marc_path
+
+
+@pytest.mark.parametrize(
+    "ending",
+    [b"", b"00100truncated", b"0002", b"abcde", b"00005", b"00003broken", b"00020notarecord!!!!"],
+)
+def test_index_frames_records_like_read_raw_records(tmp_path, ending):
+    marc_path = records_file(tmp_path, ending)
+    with open(marc_path, "rb") as marc_file:
+        index = MarcRecordIndex.build(marc_file)
+        raw_records = list(read_raw_records(io.BytesIO(marc_path.read_bytes())))
+        assert len(index) == len(raw_records)
+        assert list(index.read_records(marc_file)) == raw_records
+        assert index.read_record(marc_file, 7) == raw_records[7]
+        assert list(index.read_records(marc_file, 8, 9)) == raw_records[8:9]
+
+
+def test_index_is_saved_next_to_the_file_and_rebuilt_when_the_file_changes(tmp_path):
+    marc_path = records_file(tmp_path)
+    index = MarcRecordIndex.for_file(marc_path)
+    index_path = tmp_path / "records.mrc.idx"
+    assert index_path.is_file()
+    assert os.path.getsize(index_path) == 32 + 8 * 11
+    stat = marc_path.stat()
+    assert MarcRecordIndex.load(index_path, stat.st_size, stat.st_mtime_ns).offsets == (
+        index.offsets
+    )
+    with open(marc_path, "ab") as marc_file:
+        marc_file.write(make_record(10))
+    assert len(MarcRecordIndex.for_file(marc_path)) == 11
+
+
+def test_read_records_starts_at_a_record(tmp_path):
+    marc_path = records_file(tmp_path)
+    index = MarcRecordIndex.for_file(marc_path)
+    processor = Mock()
+    with open(marc_path, "rb") as marc_file:
+        index.seek(marc_file, 6)
+        reader = MARCReader(marc_file, to_unicode=True, permissive=True)
+        MARCReaderWrapper.read_records(
+            reader, FileDefinition(file_name="records.mrc"), io.BytesIO(), processor, 6
+        )
+    processed = [call.args for call in processor.process_record.call_args_list]
+    assert [idx for idx, _, _ in processed] == [6, 7, 8, 9]
+    assert processed[0][1]["001"].data == "bib6"
@@ -0,0 +1,185 @@
+import io
+import json
+from unittest.mock import Mock
+
+import pytest
+from folio_uuid.folio_namespaces import FOLIONamespaces
+from pymarc import Field
+from pymarc import MARCReader
+from pymarc import Record
+from pymarc import Subfield
+
+from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
+from folio_migration_tools.library_configuration import FileDefinition
+from folio_migration_tools.library_configuration import HridHandling
+from folio_migration_tools.marc_rules_transformation.hrid_handler import HRIDHandler
+from folio_migration_tools.marc_rules_transformation.marc_file_processor import (
+    MarcFileProcessor,
+)
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    MARCReaderWrapper,
+)
+from folio_migration_tools.marc_rules_transformation.marc_record_index import (
+    MarcRecordIndex,
+)
+from folio_migration_tools.marc_rules_transformation.marc_record_index import (
+    read_raw_records,
+)
+from folio_migration_tools.marc_rules_transformation.marc_worker_pool import (
+    MarcWorkerPool,
+)
+from folio_migration_tools.marc_rules_transformation.marc_worker_pool import (
+    get_raw_001,
+)
+from folio_migration_tools.migration_report import MigrationReport
+from folio_migration_tools.ref_data_index import RefDataIndex
+
+pytestmark = pytest.mark.skipif(
+    not MarcWorkerPool.is_available(), reason="Worker processes need fork"
+)
+
+
+class TitleMapper:
+    """Maps 245$a to title, with legacy ids from 090$a and HRIDs from a real HRIDHandler"""
+
+    def __init__(self, hrid_handling: HridHandling):
+        self.migration_report = MigrationReport()
+        self.ref_data_index = RefDataIndex()
+        self.mapped_folio_fields: dict = {}
+        self.mapped_legacy_fields: dict = {}
+        self.parsed_records = 0
+        self.id_map: dict = {}
+        self.extradata_writer = Mock(cache=[])
+        self.task_configuration = Mock(create_source_records=True)
+        self.library_configuration = Mock(
+            failed_percentage_threshold=20, failed_records_threshold=5000
+        )
+        self.folio_client = Mock()
+        self.folio_client.folio_get_single_object.return_value = {
+            "instances": {"prefix": "in", "startNumber": 1},
+            "holdings": {"prefix": "ho", "startNumber": 1},
+            "items": {"prefix": "it", "startNumber": 1},
+            "commonRetainLeadingZeroes": True,
+        }
+        self.hrid_handler = HRIDHandler(
+            self.folio_client, hrid_handling, self.migration_report, False
+        )
+
+    def get_legacy_ids(self, marc_record: Record, idx: int):
+        return marc_record.get_fields("090")[0].get_subfields("a") if "090" in marc_record else []
+
+    def parse_record(self, marc_record: Record, file_def: FileDefinition, legacy_ids):
+        self.parsed_records += 1
+        title = marc_record["245"]["a"]
+        folio_rec = {"id": f"id-{legacy_ids[0]}", "title": title}
+        self.hrid_handler.handle_hrid(
+            FOLIONamespaces.instances, folio_rec, marc_record, legacy_ids
+        )
+        self.migration_report.add("Trivia", title[:1])
+        self.mapped_folio_fields.setdefault("title", [0])[0] += 1
+        self.mapped_legacy_fields.setdefault("245", [0, 0])[0] += 1
+        if title == "fail":
+            raise TransformationRecordFailedError(legacy_ids, "Failing title", title)
+        return [folio_rec]
+
+    def get_id_map_tuple(self, legacy_id, folio_record, object_type):
+        return (legacy_id, folio_record["id"], folio_record["hrid"])
+
+    def remove_from_id_map(self, former_ids):
+        pass
+
+    @staticmethod
+    def save_source_record(
+        srs_records_file,
+        record_type,
+        folio_client,
+        marc_record,
+        folio_record,
+        legacy_ids,
+        suppress,
+    ):
+        srs_records_file.write(
+            json.dumps({"id": folio_record["id"], "marc": marc_record.as_json()}) + "\n"
+        )
+
+
+def make_marc_file():
+    records = []
+    for number, title in enumerate(
+        ["alpha", "beta", "fail", "gamma", "delta", "beta", "epsilon", "zeta", "eta", "theta"] * 3
+    ):
+        record = Record()
+        record.add_field(Field(tag="001", data=f"bib{number % 7}"))
+        legacy_id = f"L{number % 25}"
+        record.add_field(
+            Field(tag="090", indicators=[" ", " "], subfields=[Subfield("a", legacy_id)])
+        )
+        record.add_field(Field(tag="245", indicators=["0", "0"], subfields=[Subfield("a", title)]))
+        raw_record = record.as_marc()
+        records.append(raw_record[:9] + b" " + raw_record[10:])
+    records.insert(4, b"00021corrupt record\x1e\x1d")
+    return b"".join(records) + b"00100truncated"
+
+
+def run_transformation(tmp_path, hrid_handling, workers, use_index=False):
+    folder_structure = Mock(
+        object_type=FOLIONamespaces.instances,
+        srs_records_path=tmp_path / f"srs_{workers}.json",
+    )
+    mapper = TitleMapper(hrid_handling)
+    created_objects_file = io.StringIO()
+    failed_records_file = io.BytesIO()
+    processor = MarcFileProcessor(mapper, folder_structure, created_objects_file)
+    file_def = FileDefinition(file_name="test.mrc")
+    marc_file = io.BytesIO(make_marc_file())
+    if use_index:
+        marc_path = tmp_path / "test.mrc"
+        marc_path.write_bytes(marc_file.getvalue())
+        with open(marc_path, "rb") as marc_file:
+            MarcWorkerPool(processor, workers, chunk_size=3).process_file(
+                file_def, marc_file, failed_records_file, MarcRecordIndex.for_file(marc_path)
+            )
+    elif workers > 1:
+        MarcWorkerPool(processor, workers, chunk_size=3).process_file(
+            file_def, marc_file, failed_records_file
+        )
+    else:
+        reader = MARCReader(marc_file, to_unicode=True, permissive=True)
+        reader.hide_utf8_warnings = True
+        MARCReaderWrapper.read_records(reader, file_def, failed_records_file, processor)
+    processor.srs_records_file.close()
+    return (
+        created_objects_file.getvalue(),
+        folder_structure.srs_records_path.read_text(),
+        failed_records_file.getvalue(),
+        mapper.id_map,
+        mapper.migration_report.report,
+        mapper.mapped_folio_fields,
+        mapper.mapped_legacy_fields,
+        mapper.parsed_records,
+        mapper.hrid_handler.get_hrid_counters(),
+        processor.records_count,
+        processor.failed_records_count,
+    )
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+@pytest.mark.parametrize("hrid_handling", [HridHandling.default, HridHandling.preserve001])
+def test_worker_pool_output_is_the_same_as_in_a_single_process(tmp_path, hrid_handling, use_index):
+    single_process = run_transformation(tmp_path, hrid_handling, 1)
+    in_workers = run_transformation(tmp_path, hrid_handling, 3, use_index)
+    assert in_workers == single_process
+    created_records = [json.loads(line) for line in in_workers[0].splitlines()]
+    assert created_records
+    assert not any("deferred" in record["hrid"] for record in created_records)
+    assert b"corrupt" in in_workers[2]
+
+
+def test_read_raw_records_frames_records_like_marc_reader():
+    marc_file = make_marc_file()
+    raw_records = list(read_raw_records(io.BytesIO(marc_file)))
+    assert b"".join(raw_records) == marc_file
+    assert raw_records[-1] == b"00100truncated"
+    assert len(raw_records) == len(list(MARCReader(marc_file, permissive=True)))
+    assert get_raw_001(raw_records[0]) == b"bib0"
+    assert get_raw_001(raw_records[4]) == b""
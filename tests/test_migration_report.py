@@ -1,8 +1,82 @@
+import pickle
+
+import pytest
+
 from dateutil import parser
 
+from folio_migration_tools.custom_exceptions import TransformationFieldMappingError
+from folio_migration_tools.migration_report import MigrationReport
+
 
 def test_time_diff():
     start = parser.parse("2022-06-29T20:21:22")
     end = parser.parse("2022-06-30T21:22:23")
     nice_diff = str(end - start)
     assert nice_diff == "1 day, 1:01:01"
+
+
+def test_merge_adds_counts_and_sections():
+    migration_report = MigrationReport()
+    migration_report.add("GeneralStatistics", "Records", 2)
+    other = MigrationReport()
+    other.add("GeneralStatistics", "Records", 3)
+    other.add("LeaderManipulation", "Changed leader")
+    migration_report.merge(other)
+    migration_report.merge(other.snapshot())
+    assert migration_report.report == {
+        "GeneralStatistics": {"blurb_id": "GeneralStatistics", "Records": 8},
+        "LeaderManipulation": {"blurb_id": "LeaderManipulation", "Changed leader": 2},
+    }
+
+
+def test_merge_replaces_set_values():
+    migration_report = MigrationReport()
+    migration_report.set("GeneralStatistics", "Number of rows in items.tsv", 5)
+    migration_report.add("GeneralStatistics", "Records", 2)
+    other = MigrationReport()
+    other.set("GeneralStatistics", "Number of rows in items.tsv", 5)
+    other.add("GeneralStatistics", "Records", 3)
+    migration_report.merge(other)
+    assert migration_report.report["GeneralStatistics"] == {
+        "Number of rows in items.tsv": 5,
+        "Records": 5,
+    }
+    merged = MigrationReport()
+    merged.merge(other)
+    merged.merge(other)
+    assert merged.report["GeneralStatistics"]["Number of rows in items.tsv"] == 5
+    assert merged.report["GeneralStatistics"]["Records"] == 6
+
+
+def test_snapshots_round_trip(tmp_path):
+    migration_report = MigrationReport()
+    migration_report.add("GeneralStatistics", "Records", 2)
+    migration_report.set("GeneralStatistics", "Records left", 5)
+    snapshot_path = tmp_path / "report.json"
+    migration_report.write_snapshot(snapshot_path)
+    assert MigrationReport.read_snapshot(snapshot_path).report == migration_report.report
+    pickled = pickle.loads(pickle.dumps(migration_report))
+    assert pickled.report == migration_report.report
+    assert MigrationReport.from_snapshot(migration_report.snapshot()).report == (
+        migration_report.report
+    )
+
+
+def test_snapshots_save_error_measures_as_text(tmp_path):
+    migration_report = MigrationReport()
+    error = TransformationFieldMappingError("row 1", "Bad value", "x")
+    migration_report.add("FieldMappingErrors", error)
+    snapshot_path = tmp_path / "report.json"
+    migration_report.write_snapshot(snapshot_path)
+    assert MigrationReport.read_snapshot(snapshot_path).report == {
+        "FieldMappingErrors": {"blurb_id": "FieldMappingErrors", str(error): 1}
+    }
+    assert [p.name for p in tmp_path.iterdir()] == ["report.json"]
+
+
+def test_failed_snapshots_leave_no_temporary_file(tmp_path):
+    migration_report = MigrationReport()
+    migration_report.add("GeneralStatistics", "Records", object())
+    with pytest.raises(TypeError):
+        migration_report.write_snapshot(tmp_path / "report.json")
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+import time
+from unittest.mock import Mock
+
+from folio_migration_tools.migration_tasks.batch_poster import BatchPoster
+from folio_migration_tools.rate_limiter import RateLimiter
+from folio_migration_tools.rate_limiter import TokenBucket
+from folio_migration_tools.task_configuration import RateLimitedTaskConfiguration
+
+
+def test_token_bucket_without_rate_never_waits():
+    bucket = TokenBucket(0)
+    assert bucket.take(1000) == 0
+
+
+def test_token_bucket_goes_into_debt_for_large_takes():
+    bucket = TokenBucket(100)
+    assert bucket.take(50) == 0
+    wait = bucket.take(250)
+    assert 1.9 < wait <= 2.0
+
+
+def test_rate_limiter_uses_the_strictest_limit():
+    limiter = RateLimiter(requests_per_second=1, records_per_second=1000)
+    assert limiter.reserve(10) == 0
+    assert 0.9 < limiter.reserve(10) <= 1.0
+    limiter = RateLimiter(requests_per_second=100, records_per_second=10)
+    assert limiter.reserve(10) == 0
+    assert 0.9 < limiter.reserve(10) <= 1.0
+
+
+def test_rate_limiter_reads_control_file(tmp_path):
+    control_file = tmp_path / "rate_limits.json"
+    control_file.write_text(json.dumps({"requests_per_second": 2}))
+    limiter = RateLimiter(control_file_path=control_file, control_file_check_seconds=0)
+    assert limiter.requests.rate == 2
+    assert limiter.records.rate == 0
+    control_file.write_text(json.dumps({"records_per_second": 500}))
+    os.utime(control_file, (time.time() + 10, time.time() + 10))
+    limiter.reserve()
+    assert limiter.requests.rate == 0
+    assert limiter.records.rate == 500
+
+
+def test_rate_limiter_from_task_configuration(tmp_path):
+    folder_structure = Mock(base_folder=tmp_path)
+    (tmp_path / "rate_limits.json").write_text(json.dumps({"requests_per_second": 3}))
+    task_configuration = RateLimitedTaskConfiguration(
+        name="loans", requests_per_second=5, rate_limit_control_file="rate_limits.json"
+    )
+    limiter = RateLimiter.from_task_configuration(task_configuration, folder_structure)
+    assert limiter.control_file_path == tmp_path / "rate_limits.json"
+    assert (limiter.requests.rate, limiter.records.rate) == (3, 0)
+    task_configuration = BatchPoster.TaskConfiguration(
+        name="poster",
+        migration_task_type="BatchPoster",
+        object_type="Items",
+        files=[],
+        batch_size=10,
+        requests_per_second=5,
+        records_per_second=100,
+    )
+    limiter = RateLimiter.from_task_configuration(task_configuration, folder_structure)
+    assert limiter.control_file_path is None
+    assert (limiter.requests.rate, limiter.records.rate) == (5, 100)
+
+
+def test_rate_limiter_keeps_limits_on_broken_control_file(tmp_path):
+    control_file = tmp_path / "rate_limits.json"
+    control_file.write_text("{not json")
+    limiter = RateLimiter(requests_per_second=5, control_file_path=control_file)
+    assert limiter.requests.rate == 5
+
+
+def test_rate_limiter_acquire_async_waits():
+    limiter = RateLimiter(requests_per_second=20)
+    started = time.monotonic()
+
+    async def acquire_many():
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(22)))
+
+    asyncio.run(acquire_many())
+    assert time.monotonic() - started >= 0.09
+    assert limiter.seconds_waited > 0
+
+
+def test_rate_limiter_limits_every_call():
+    limiter = RateLimiter(records_per_second=100)
+    assert limiter.limit(lambda: "response", 100)() == "response"
+    assert limiter.seconds_waited == 0
+    send = limiter.limit(lambda: "response", 10)
+    send()
+    waited = limiter.seconds_waited
+    assert waited > 0
+
+    async def request():
+        return "response"
+
+    assert asyncio.run(limiter.limit_async(request, 10)()) == "response"
+    assert limiter.seconds_waited > waited
@@ -0,0 +1,49 @@
+from folio_migration_tools.ref_data_index import RefDataIndex
+
+
+def test_indexes_belong_to_the_ref_data_index():
+    ref_data = [{"id": "id1", "code": "a", "name": "A"}]
+    index = RefDataIndex()
+    by_code = index.get_index(ref_data, "code")
+    assert RefDataIndex().get_index(ref_data, "code") is not by_code
+    assert index.get_index(ref_data, "code") is by_code
+
+
+def test_get_ref_data_tuple_by_code_name_and_id_ignores_case():
+    ref_data = [
+        {"id": "id1", "code": "ctb", "name": "Contributor"},
+        {"id": "id2", "code": "AUT", "name": "Author"},
+    ]
+    index = RefDataIndex()
+    assert index.get_ref_data_tuple(ref_data, "code", "CTB") == ("id1", "Contributor")
+    assert index.get_ref_data_tuple(ref_data, "code", "aut") == ("id2", "Author")
+    assert index.get_ref_data_tuple(ref_data, "name", "author") == ("id2", "Author")
+    assert index.get_ref_data(ref_data, "id", "id1") is ref_data[0]
+    assert index.get_ref_data_tuple(ref_data, "code", "xyz") == ()
+    assert index.get_ref_data(ref_data, "id", "id3") is None
+
+
+def test_get_index_is_built_once_per_list():
+    ref_data = [{"id": "id1", "code": "a", "name": "A"}]
+    index = RefDataIndex()
+    by_code = index.get_index(ref_data, "code")
+    index.get_ref_data_tuple(ref_data, "code", "missing")
+    assert index.get_index(ref_data, "code") is by_code
+
+
+def test_get_index_is_rebuilt_when_the_list_changes():
+    ref_data = [{"id": "id1", "code": "a", "name": "A"}]
+    index = RefDataIndex()
+    assert index.get_ref_data_tuple(ref_data, "code", "b") == ()
+    ref_data.append({"id": "id2", "code": "b", "name": "B"})
+    assert index.get_ref_data_tuple(ref_data, "code", "b") == ("id2", "B")
+    other_ref_data = [{"id": "id3", "code": "b", "name": "Other B"}]
+    assert index.get_ref_data_tuple(other_ref_data, "code", "B") == ("id3", "Other B")
+
+
+def test_the_last_of_repeated_keys_is_indexed():
+    ref_data = [
+        {"id": "id1", "code": "a", "name": "A"},
+        {"id": "id2", "code": "A", "name": "Other A"},
+    ]
+    assert RefDataIndex().get_ref_data_tuple(ref_data, "code", "a") == ("id2", "Other A")
@@ -2,6 +2,8 @@ from unittest.mock import Mock
 
 import pytest
 
+from folio_migration_tools.mapping_file_transformation.ref_data_mapping import BoundedCache
+from folio_migration_tools.mapping_file_transformation.ref_data_mapping import MappingIndex
 from folio_migration_tools.mapping_file_transformation.ref_data_mapping import (
     RefDataMapping,
 )
@@ -26,6 +28,7 @@ def test_get_hybrid_mapping():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[1]
 
@@ -41,6 +44,7 @@ def test_get_hybrid_mapping2():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[0]
 
@@ -56,6 +60,7 @@ def test_get_hybrid_mapping3_4():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[1]
 
@@ -71,6 +76,7 @@ def test_get_hybrid_mapping3_5():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[2]
 
@@ -91,6 +97,7 @@ def test_get_hybrid_mapping_none():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res is None
 
@@ -106,6 +113,8 @@ def test_get_hybrid_mapping3():
     mock.hybrid_mappings = [{"location": "sprad", "loan_type": "* ", "material_type": "*"}]
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.regular_index = MappingIndex(mock.regular_mappings, mock.mapped_legacy_keys)
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res is None
 
@@ -121,6 +130,7 @@ def test_normal_refdata_mapping_strip():
     mock.regular_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.regular_index = MappingIndex(mock.regular_mappings, mock.mapped_legacy_keys)
     res = RefDataMapping.get_ref_data_mapping(mock, legacy_object)
     assert res == mappings[2]
 
@@ -161,6 +171,8 @@ def test_mapping_for_multiple_fields():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["email1_categories", "email2_categories"]
+    mock.regular_index = MappingIndex(mock.regular_mappings, mock.mapped_legacy_keys)
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[1]
 
@@ -230,11 +242,47 @@ def test_multiple_emails_array_objects_with_different_ref_data_mappings():
     mock.hybrid_mappings = mapping_a
     mock.cache = {}
     mock.mapped_legacy_keys = ["email1_categories", "email2_categories"]
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
     res_1 = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
 
     mock.hybrid_mappings = mapping_b
     mock.cache = {}
     mock.mapped_legacy_keys = ["email1_categories", "email2_categories"]
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
     res_2 = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
 
     assert res_1 == res_2
+
+
+def test_get_hybrid_mapping_prefers_fewest_wildcards_then_map_order():
+    mappings = [
+        {"location": "*", "loan_type": "lt_1", "material_type": "*"},
+        {"location": "l_1", "loan_type": "*", "material_type": "*"},
+        {"location": "*", "loan_type": "lt_1", "material_type": "mt_1"},
+        {"location": "l_1", "loan_type": "*", "material_type": "mt_1"},
+    ]
+    mock = Mock(spec=RefDataMapping)
+    mock.hybrid_mappings = mappings
+    mock.cache = BoundedCache(10)
+    mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_index = MappingIndex(mock.hybrid_mappings, mock.mapped_legacy_keys)
+    legacy_object = {"location": "l_1", "loan_type": "lt_1", "material_type": "mt_1"}
+    assert RefDataMapping.get_hybrid_mapping(mock, legacy_object) is mappings[2]
+    legacy_object = {"location": "l_1", "loan_type": "lt_1", "material_type": "mt_2"}
+    assert RefDataMapping.get_hybrid_mapping(mock, legacy_object) is mappings[0]
+    legacy_object = {"location": "l_1", "loan_type": "*", "material_type": "mt_2"}
+    assert RefDataMapping.get_hybrid_mapping(mock, legacy_object) is mappings[1]
+    assert RefDataMapping.get_hybrid_mapping(mock, legacy_object) is mappings[1]
+    assert (mock.cache.hits, mock.cache.misses) == (1, 3)
+
+
+def test_bounded_cache_evicts_least_recently_used():
+    cache = BoundedCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+    assert "b" not in cache
+    assert cache.get("b", "missing") == "missing"
+    assert len(cache) == 2 and cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
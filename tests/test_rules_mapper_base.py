@@ -1,5 +1,6 @@
 import datetime
 import json
+from unittest.mock import Mock
 from uuid import uuid4
 
 import pytest
@@ -190,6 +191,34 @@ def test_get_srs_string_bib():
             assert "snapshotId" not in record
 
 
+def test_get_srs_string_is_the_srs_record_serialized():
+    path = "./tests/test_data/two020a.mrc"
+    with open(path, "rb") as marc_file:
+        reader = MARCReader(marc_file, to_unicode=True, permissive=True)
+        reader.hide_utf8_warnings = True
+        for record in reader:
+            srs_id = str(uuid4())
+            instance = {"id": str(uuid4()), "hrid": 'in"1'}
+            srs_record = json.loads(
+                RulesMapperBase.get_srs_string(
+                    record, instance, srs_id, False, FOLIONamespaces.instances
+                )
+            )
+            assert srs_record == {
+                "id": srs_id,
+                "deleted": False,
+                "matchedId": srs_id,
+                "generation": 0,
+                "recordType": "MARC_BIB",
+                "rawRecord": {"id": srs_id, "content": record.as_json()},
+                "parsedRecord": {"id": srs_id, "content": json.loads(record.as_json())},
+                "additionalInfo": {"suppressDiscovery": False},
+                "externalIdsHolder": {"instanceId": instance["id"], "instanceHrid": 'in"1'},
+                "state": "ACTUAL",
+                "leaderRecordStatus": str(record.leader)[5],
+            }
+
+
 def test_get_srs_string_bad_leaders():
     path = "./tests/test_data/corrupt_leader.mrc"
     with open(path, "rb") as marc_file:
@@ -210,3 +239,48 @@ def test_create_srs_uuid():
     assert str(created_id) == "6734f228-cba2-54c7-b129-c6437375a864"
     created_id_2 = RulesMapperBase.create_srs_id(FOLIONamespaces.instances, "some_url", "id_1")
     assert str(created_id) != str(created_id_2)
+
+
+def test_add_value_to_target_resolves_each_target_once():
+    mapper = BibsRulesMapper.__new__(BibsRulesMapper)
+    mapper.schema = {
+        "properties": {
+            "title": {"type": "string"},
+            "editions": {"type": "array", "items": {"type": "string"}},
+            "publication": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"publisher": {"type": "string"}, "place": {"type": "string"}},
+                },
+            },
+        }
+    }
+    mapper.task_configuration = Mock(migration_task_type="BibsTransformer")
+    mapper.resolved_targets = {}
+    mapper.resolved_targets_schema = None
+    rec = {}
+    mapper.add_value_to_target(rec, "title", ["A title"])
+    mapper.add_value_to_target(rec, "editions", ["1st ed."])
+    mapper.add_value_to_target(rec, "editions", ["2nd ed."])
+    mapper.add_value_to_target(rec, "publication.publisher", ["Publisher 1"])
+    mapper.add_value_to_target(rec, "publication.place", ["Place 1"])
+    mapper.add_value_to_target(rec, "publication.publisher", ["Publisher 2"])
+    assert rec == {
+        "title": "A title",
+        "editions": ["1st ed.", "2nd ed."],
+        "publication": [
+            {"publisher": "Publisher 1", "place": "Place 1"},
+            {"publisher": "Publisher 2"},
+        ],
+    }
+    assert set(mapper.resolved_targets) == {
+        "title",
+        "editions",
+        "publication.publisher",
+        "publication.place",
+    }
+    publisher_steps = mapper.resolved_targets["publication.publisher"]
+    assert [step.name for step in publisher_steps] == ["publication", "publisher"]
+    assert publisher_steps[0].item_property_count == 2
+    assert publisher_steps[1].is_string_in_array_of_objects